@@ -0,0 +1,134 @@
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AcessoAssincrono:
+    """
+    Classe AcessoAssincrono que executa chamadas ao banco de dados fora da thread do Tkinter.
+
+    As chamadas rodam em um pool de threads e os resultados voltam à thread da interface por
+    `after()`, onde os callbacks podem atualizar os widgets com segurança. Chamadas identificadas
+    pela mesma chave substituem as anteriores: o resultado de uma chamada obsoleta é descartado.
+
+    Attributes:
+        max_workers (int): Número máximo de chamadas executadas ao mesmo tempo.
+        pendentes (int): Número de chamadas ainda não entregues à interface.
+    """
+
+    def __init__(self, root, max_workers=4, intervalo_ms=50, ao_mudar_carregamento=None):
+        """
+        Inicializa o pool de threads.
+
+        Args:
+            root (tk.Tk): Janela principal, usada para agendar a entrega dos resultados.
+            max_workers (int): Número máximo de chamadas executadas ao mesmo tempo.
+            intervalo_ms (int): Intervalo, em milissegundos, entre as verificações de resultados.
+            ao_mudar_carregamento (callable): Função chamada na thread da interface com True quando
+                a primeira chamada começa e com False quando não resta nenhuma pendente.
+        """
+        self.max_workers = max_workers
+        self.pendentes = 0
+        self._root = root
+        self._intervalo_ms = intervalo_ms
+        self._ao_mudar_carregamento = ao_mudar_carregamento
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="acesso-banco")
+        self._resultados = queue.Queue()
+        self._geracoes = {}
+        self._futuros = {}
+        self._agendado = False
+
+    @property
+    def carregando(self):
+        """bool: Retorna True se houver alguma chamada pendente."""
+        return self.pendentes > 0
+
+    def executar(self, funcao, *args, chave=None, ao_concluir=None, ao_falhar=None, **kwargs):
+        """
+        Agenda `funcao(*args, **kwargs)` no pool de threads. Deve ser chamado na thread da interface.
+
+        Args:
+            funcao (callable): Função a ser executada, normalmente um método de Database.
+            chave (str): Identifica a tela ou consulta. Uma nova chamada com a mesma chave cancela
+                a anterior, cujo resultado deixa de ser entregue.
+            ao_concluir (callable): Recebe o resultado, na thread da interface.
+            ao_falhar (callable): Recebe a exceção, na thread da interface.
+
+        Returns:
+            concurrent.futures.Future: Futuro da chamada agendada.
+        """
+        geracao = None
+        if chave is not None:
+            self.cancelar(chave)
+            geracao = self._geracoes.get(chave, 0) + 1
+            self._geracoes[chave] = geracao
+        futuro = self._executor.submit(funcao, *args, **kwargs)
+        if chave is not None:
+            self._futuros[chave] = futuro
+        self.pendentes += 1
+        if self.pendentes == 1:
+            self._notificar_carregamento(True)
+        futuro.add_done_callback(lambda f: self._resultados.put((f, chave, geracao, ao_concluir, ao_falhar)))
+        self._agendar()
+        return futuro
+
+    def cancelar(self, chave):
+        """
+        Cancela a chamada pendente com a chave informada. Se ela já estiver em execução, seu
+        resultado é descartado quando terminar.
+
+        Args:
+            chave (str): Chave usada em `executar`.
+        """
+        if chave in self._geracoes:
+            self._geracoes[chave] += 1
+        futuro = self._futuros.pop(chave, None)
+        if futuro is not None:
+            futuro.cancel()
+
+    def encerrar(self, aguardar=False):
+        """
+        Encerra o pool de threads, cancelando as chamadas que ainda não começaram.
+
+        Args:
+            aguardar (bool): Se True, aguarda as chamadas em execução terminarem.
+        """
+        self._executor.shutdown(wait=aguardar, cancel_futures=True)
+
+    def _agendar(self):
+        if not self._agendado:
+            self._agendado = True
+            self._root.after(self._intervalo_ms, self._processar)
+
+    def _processar(self):
+        self._agendado = False
+        while True:
+            try:
+                futuro, chave, geracao, ao_concluir, ao_falhar = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            self.pendentes -= 1
+            if chave is not None and self._futuros.get(chave) is futuro:
+                del self._futuros[chave]
+            if futuro.cancelled() or (chave is not None and self._geracoes.get(chave) != geracao):
+                continue
+            erro = futuro.exception()
+            try:
+                if erro is None:
+                    if ao_concluir is not None:
+                        ao_concluir(futuro.result())
+                    continue
+            except Exception as e:
+                erro = e
+            if ao_falhar is not None:
+                ao_falhar(erro)
+            else:
+                logging.error(f"Erro no acesso ao banco de dados: {erro}")
+        if self.pendentes > 0:
+            self._agendar()
+        else:
+            self._notificar_carregamento(False)
+
+    def _notificar_carregamento(self, carregando):
+        if self._ao_mudar_carregamento is not None:
+            self._ao_mudar_carregamento(carregando)
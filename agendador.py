@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from collections import deque
+
+
+class VarreduraPeriodica:
+    """
+    Classe VarreduraPeriodica que executa uma tarefa em intervalos regulares, em uma thread de fundo.
+
+    A tarefa nunca roda na thread do Tkinter, de modo que a interface não trava durante a varredura.
+    Cada execução registra quantas linhas foram alteradas e quanto tempo levou.
+
+    Attributes:
+        intervalo (float): Tempo, em segundos, entre o início de duas execuções.
+        historico (collections.deque): Últimas execuções, como dicionários com linhas, duração e horário.
+    """
+
+    def __init__(self, tarefa, intervalo=60.0, nome="varredura", ao_concluir=None, tamanho_historico=100):
+        """
+        Inicializa a varredura, sem iniciá-la.
+
+        Args:
+            tarefa (callable): Função sem argumentos que retorna o número de linhas alteradas.
+            intervalo (float): Tempo, em segundos, entre o início de duas execuções.
+            nome (str): Nome da varredura, usado na thread e nos logs.
+            ao_concluir (callable): Função chamada com (linhas, duracao) após cada execução,
+                a partir da thread de fundo.
+            tamanho_historico (int): Número de execuções mantidas no histórico.
+        """
+        self.intervalo = intervalo
+        self.nome = nome
+        self.historico = deque(maxlen=tamanho_historico)
+        self._tarefa = tarefa
+        self._ao_concluir = ao_concluir
+        self._parar = threading.Event()
+        self._thread = None
+
+    @property
+    def ativa(self):
+        """bool: Retorna True se a thread da varredura estiver em execução."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def ultima_execucao(self):
+        """dict: Retorna a última execução registrada, ou None se ainda não houve nenhuma."""
+        return self.historico[-1] if self.historico else None
+
+    def iniciar(self):
+        """
+        Inicia a thread de fundo. Não faz nada se a varredura já estiver ativa.
+        """
+        if self.ativa:
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._laco, name=self.nome, daemon=True)
+        self._thread.start()
+
+    def parar(self, timeout=None):
+        """
+        Sinaliza a parada e aguarda o término da execução em andamento.
+
+        Args:
+            timeout (float): Tempo máximo, em segundos, para aguardar a thread.
+        """
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def executar_agora(self):
+        """
+        Executa a tarefa uma vez, na thread atual, e registra o resultado.
+
+        Returns:
+            dict: Linhas alteradas, duração em segundos e horário da execução.
+        """
+        inicio = time.monotonic()
+        try:
+            linhas = self._tarefa() or 0
+        except Exception as e:
+            logging.error(f"Erro na {self.nome}: {e}")
+            linhas = 0
+        duracao = time.monotonic() - inicio
+        execucao = {"linhas": linhas, "duracao": duracao, "horario": time.time()}
+        self.historico.append(execucao)
+        logging.info(f"{self.nome}: {linhas} linha(s) atualizada(s) em {duracao * 1000:.1f} ms")
+        if self._ao_concluir is not None:
+            self._ao_concluir(linhas, duracao)
+        return execucao
+
+    def _laco(self):
+        while not self._parar.is_set():
+            inicio = time.monotonic()
+            self.executar_agora()
+            self._parar.wait(max(0.0, self.intervalo - (time.monotonic() - inicio)))
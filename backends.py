@@ -0,0 +1,431 @@
+import re
+import sqlite3
+from datetime import date, datetime
+
+try:
+    import mysql.connector
+except ImportError:  # Permite usar apenas o SQLite, sem o driver do MySQL instalado
+    mysql = None
+
+ERROS_SQL = (sqlite3.Error,) if mysql is None else (mysql.connector.Error, sqlite3.Error)
+
+# Erros de uma conexão que caiu no meio de uma operação (servidor inacessível, não erros do comando)
+ERROS_CONEXAO = () if mysql is None else (mysql.connector.errors.InterfaceError, mysql.connector.errors.OperationalError)
+
+def proximo_mes(mes):
+    """Retorna o mês (AAAAMM) seguinte ao informado."""
+    ano, numero = divmod(mes, 100)
+    return ano * 100 + numero + 1 if numero < 12 else (ano + 1) * 100 + 1
+
+
+class BackendMySQL:
+    """
+    Classe BackendMySQL com a conexão e o SQL específicos do servidor MySQL.
+
+    Attributes:
+        nome (str): Nome do backend.
+        max_conexoes (int): Limite de conexões simultâneas imposto pelo backend (None para ilimitado).
+        suporta_preparados (bool): Se o backend mantém comandos preparados no servidor.
+    """
+
+    nome = "mysql"
+    max_conexoes = None
+    suporta_preparados = True
+
+    def __init__(self, host, user, password, database):
+        """
+        Inicializa os parâmetros de conexão com o servidor MySQL.
+
+        Args:
+            host (str): Endereço do servidor do banco de dados.
+            user (str): Nome de usuário para autenticação no banco de dados.
+            password (str): Senha para autenticação no banco de dados.
+            database (str): Nome do banco de dados a ser utilizado.
+        """
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        self._ve_transacoes = None
+
+    def conectar(self):
+        """
+        Abre uma nova conexão com o servidor.
+
+        Returns:
+            mysql.connector.connection.MySQLConnection: Conexão em modo autocommit.
+        """
+        return mysql.connector.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            autocommit=True
+        )
+
+    def verificar(self, conexao):
+        """Retorna True se a conexão ainda estiver ativa."""
+        return conexao.is_connected()
+
+    def ordem_urgencia(self, coluna):
+        """Retorna a expressão SQL que ordena a coluna de urgência da mais para a menos urgente."""
+        # Os códigos de urgência (estados.Urgencia) já seguem a ordem e o MySQL põe os nulos antes dos
+        # demais: a coluna pura, sem expressão, deixa o índice (urgencia, id) atender à ordenação
+        return coluna
+
+    def tempo_excedido(self, coluna):
+        """Retorna a condição SQL, com um parâmetro em segundos, para datas mais antigas que o limite."""
+        return f"{coluna} < NOW() - INTERVAL %s SECOND"
+
+    def lacuna_encerrada(self, cursor, coluna, espera):
+        """
+        Retorna a condição SQL e os parâmetros que separam as linhas do registro de alterações depois
+        das quais uma lacuna na seq já não pode ser preenchida.
+
+        A seq reservada por uma transação ainda aberta é sempre anterior às reservadas depois dela, e
+        a transação começou antes de reservá-la: uma linha gravada antes do início da transação aberta
+        mais antiga (information_schema.innodb_trx) não tem mais lacunas pendentes antes de si. Sem o
+        privilégio PROCESS, necessário para ler essa tabela, a lacuna é considerada encerrada após
+        `espera` segundos.
+
+        Args:
+            cursor: Cursor de uma conexão com o primário.
+            coluna (str): Coluna com o momento em que a linha do registro foi gravada.
+            espera (int): Segundos de espera usados sem acesso às transações abertas.
+
+        Returns:
+            tuple: Condição SQL e tupla de parâmetros.
+        """
+        if self._ve_transacoes is None:
+            try:
+                cursor.execute("SELECT 1 FROM information_schema.innodb_trx LIMIT 1")
+                cursor.fetchall()
+                self._ve_transacoes = True
+            except mysql.connector.Error as e:
+                print(f"Sem acesso às transações abertas, as lacunas do registro de alterações esperam {espera} s: {e}")
+                self._ve_transacoes = False
+        if not self._ve_transacoes:
+            return self.tempo_excedido(coluna), (espera,)
+        # Um segundo de margem: os dois horários são truncados em segundos
+        return (f"{coluna} < COALESCE((SELECT MIN(trx_started) FROM information_schema.innodb_trx), NOW()) "
+                "- INTERVAL 1 SECOND", ())
+
+    def mes(self, coluna):
+        """Retorna a expressão SQL com o mês (AAAAMM, inteiro) da coluna de data."""
+        return f"EXTRACT(YEAR_MONTH FROM {coluna})"
+
+    def reservar_para_fila(self, apelido):
+        """
+        Retorna a cláusula que bloqueia as linhas lidas da tabela até o fim da transação, pulando as
+        já bloqueadas por outra transação: consumidores simultâneos recebem linhas diferentes sem se esperar.
+        """
+        return f" FOR UPDATE OF {apelido} SKIP LOCKED"
+
+    def garantir_particoes(self, cursor, tabela, desde, ate):
+        """
+        Cria as partições mensais de uma tabela de arquivo até o mês informado, dividindo a partição
+        `p_futuro`. O DDL confirma a transação em andamento, por isso deve ser chamado fora dela.
+
+        Args:
+            cursor: Cursor da conexão em uso.
+            tabela (str): Tabela particionada por RANGE (mes).
+            desde (int): Primeiro mês (AAAAMM) a criar, se a tabela ainda não tiver partições mensais.
+            ate (int): Último mês (AAAAMM) que deve ter partição própria.
+        """
+        cursor.execute(
+            "SELECT PARTITION_DESCRIPTION FROM information_schema.PARTITIONS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (tabela,)
+        )
+        limites = [int(row[0]) for row in cursor.fetchall() if row[0] and row[0] != 'MAXVALUE']
+        # O limite de uma partição é o mês seguinte ao último que ela guarda
+        mes = max(limites) if limites else desde
+        novas = []
+        while mes <= ate:
+            novas.append(f"PARTITION p{mes} VALUES LESS THAN ({proximo_mes(mes)})")
+            mes = proximo_mes(mes)
+        if novas:
+            cursor.execute(
+                f"ALTER TABLE {tabela} REORGANIZE PARTITION p_futuro INTO "
+                f"({', '.join(novas)}, PARTITION p_futuro VALUES LESS THAN MAXVALUE)"
+            )
+
+    def bloquear_migracoes(self, cursor):
+        """Impede que duas estações apliquem migrações ao mesmo tempo (bloqueio nomeado do MySQL)."""
+        cursor.execute("SELECT GET_LOCK('macas_migracoes', 60)")
+        cursor.fetchone()
+
+    def liberar_migracoes(self, cursor, sucesso):
+        """Libera o bloqueio obtido em `bloquear_migracoes` (o DDL do MySQL já é confirmado a cada comando)."""
+        cursor.execute("SELECT RELEASE_LOCK('macas_migracoes')")
+        cursor.fetchone()
+
+
+class BackendSQLite:
+    """
+    Classe BackendSQLite com um banco de dados SQLite embutido, em arquivo ou em memória.
+
+    Não exige servidor: indicado para setores pequenos, testes e benchmarks. Um banco em memória
+    (':memory:') usa uma única conexão compartilhada, que nunca é fechada pelo pool. O próprio
+    sqlite3 já guarda os comandos compilados de cada conexão, por isso não há cursores preparados.
+
+    Attributes:
+        nome (str): Nome do backend.
+        caminho (str): Caminho do arquivo do banco de dados, ou ':memory:'.
+        max_conexoes (int): Limite de conexões simultâneas (1 para o banco em memória).
+        suporta_preparados (bool): Sempre False.
+    """
+
+    nome = "sqlite"
+    suporta_preparados = False
+
+    def __init__(self, caminho=":memory:", timeout=5.0):
+        """
+        Inicializa o backend SQLite.
+
+        Args:
+            caminho (str): Caminho do arquivo do banco de dados, ou ':memory:'.
+            timeout (float): Tempo, em segundos, para aguardar um banco bloqueado por outra escrita.
+        """
+        self.caminho = caminho
+        self.timeout = timeout
+        self.max_conexoes = 1 if caminho == ":memory:" else None
+        self._memoria = None
+
+    def conectar(self):
+        """
+        Abre uma conexão com o banco de dados (ou retorna a conexão única do banco em memória).
+
+        Returns:
+            ConexaoSQLite: Conexão com a mesma interface usada pela classe Database.
+        """
+        if self.caminho == ":memory:":
+            if self._memoria is None:
+                self._memoria = ConexaoSQLite(self._abrir(), compartilhada=True)
+            return self._memoria
+        return ConexaoSQLite(self._abrir())
+
+    def verificar(self, conexao):
+        """Retorna True se a conexão ainda estiver aberta."""
+        return conexao.is_connected()
+
+    def ordem_urgencia(self, coluna):
+        """Retorna a expressão SQL que ordena a coluna de urgência da mais para a menos urgente."""
+        # Os códigos de urgência (estados.Urgencia) já seguem a ordem; o SQLite também põe os nulos primeiro
+        return coluna
+
+    def tempo_excedido(self, coluna):
+        """Retorna a condição SQL, com um parâmetro em segundos, para datas mais antigas que o limite."""
+        return f"{coluna} < datetime('now', 'localtime', '-' || %s || ' seconds')"
+
+    def lacuna_encerrada(self, cursor, coluna, espera):
+        """
+        Retorna a condição SQL e os parâmetros que separam as linhas do registro de alterações depois
+        das quais uma lacuna na seq já não pode ser preenchida.
+
+        O SQLite não expõe as transações abertas: a lacuna é considerada encerrada após `espera` segundos.
+        """
+        return self.tempo_excedido(coluna), (espera,)
+
+    def mes(self, coluna):
+        """Retorna a expressão SQL com o mês (AAAAMM, inteiro) da coluna de data."""
+        return f"CAST(strftime('%Y%m', {coluna}) AS INTEGER)"
+
+    def reservar_para_fila(self, apelido):
+        """O SQLite serializa as transações de escrita (BEGIN IMMEDIATE): a leitura dentro delas já é exclusiva."""
+        return ""
+
+    def garantir_particoes(self, cursor, tabela, desde, ate):
+        """O SQLite não tem particionamento: as tabelas de arquivo usam um índice pela coluna mes."""
+
+    def bloquear_migracoes(self, cursor):
+        """Abre uma transação de escrita: as migrações são aplicadas por inteiro ou não são aplicadas."""
+        cursor.execute("BEGIN IMMEDIATE")
+
+    def liberar_migracoes(self, cursor, sucesso):
+        """Confirma a transação aberta em `bloquear_migracoes`, ou a desfaz se uma migração falhou."""
+        cursor.execute("COMMIT" if sucesso else "ROLLBACK")
+
+    def _abrir(self):
+        conexao = sqlite3.connect(
+            self.caminho,
+            timeout=self.timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None,
+            check_same_thread=False
+        )
+        conexao.execute("PRAGMA foreign_keys = ON")
+        if self.caminho != ":memory:":
+            conexao.execute("PRAGMA journal_mode = WAL")
+        return conexao
+
+
+class CursorPreparado:
+    """
+    Classe CursorPreparado que mantém, para cada SQL já executado em uma conexão, um cursor com o
+    comando preparado no servidor. Execuções seguintes do mesmo SQL enviam apenas os parâmetros.
+    """
+
+    def __init__(self, conexao, cache):
+        """
+        Args:
+            conexao: Conexão com o servidor MySQL.
+            cache (dict): Cursores preparados da conexão, indexados pelo SQL.
+        """
+        self._conexao = conexao
+        self._cache = cache
+        self._atual = None
+
+    @property
+    def rowcount(self):
+        """int: Retorna o número de linhas afetadas pelo último comando."""
+        return self._atual.rowcount
+
+    @property
+    def lastrowid(self):
+        """int: Retorna o ID gerado pelo último INSERT."""
+        return self._atual.lastrowid
+
+    def execute(self, sql, params=()):
+        item = self._cache.get(sql)
+        if item is None:
+            item = (sql, self._conexao.cursor(prepared=True))
+            self._cache[sql] = item
+        texto, self._atual = item
+        # O conector só reaproveita o comando preparado se receber o mesmo objeto de texto
+        self._atual.execute(texto, params)
+
+    def fetchone(self):
+        linha = self._atual.fetchone()
+        # Descarta o restante do resultado, liberando o cursor para a próxima execução
+        self._atual.fetchall()
+        return linha
+
+    def fetchall(self):
+        return self._atual.fetchall()
+
+    def close(self):
+        """Mantém os cursores preparados abertos para as próximas operações da conexão."""
+
+
+class ConexaoSQLite:
+    """
+    Classe ConexaoSQLite que dá a uma conexão sqlite3 a mesma interface da conexão do MySQL
+    usada pela classe Database (cursor, start_transaction, commit, rollback e close).
+    """
+
+    def __init__(self, conexao, compartilhada=False):
+        """
+        Args:
+            conexao (sqlite3.Connection): Conexão em modo autocommit (isolation_level=None).
+            compartilhada (bool): Se True, `close` não fecha a conexão (banco em memória).
+        """
+        self._conexao = conexao
+        self._compartilhada = compartilhada
+        self._aberta = True
+
+    @property
+    def in_transaction(self):
+        """bool: Retorna True se houver uma transação aberta."""
+        return self._conexao.in_transaction
+
+    def cursor(self, buffered=True, prepared=False):
+        """Retorna um cursor que aceita os marcadores %s do MySQL."""
+        return CursorSQLite(self._conexao.cursor())
+
+    def start_transaction(self):
+        """Abre uma transação que já reserva a escrita, evitando bloqueios ao promover a leitura."""
+        self._conexao.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        """Confirma a transação aberta, se houver."""
+        self._conexao.commit()
+
+    def rollback(self):
+        """Desfaz a transação aberta, se houver."""
+        self._conexao.rollback()
+
+    def is_connected(self):
+        """Retorna True se a conexão estiver aberta."""
+        return self._aberta
+
+    def close(self):
+        """Fecha a conexão, exceto se ela for compartilhada."""
+        if self._compartilhada:
+            return
+        self._aberta = False
+        self._conexao.close()
+
+
+# INSERT ... VALUES (...) de uma linha, que pode ser repetido para várias linhas
+_INSERT_VALUES = re.compile(r"^(INSERT INTO .+? VALUES )(\(.*\))$", re.DOTALL)
+
+
+class CursorSQLite:
+    """
+    Classe CursorSQLite que traduz os marcadores %s para ? e envia `executemany` de INSERT
+    como um único INSERT de várias linhas, preenchendo `lastrowid` com o ID da primeira linha.
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.lastrowid = None
+
+    @property
+    def rowcount(self):
+        """int: Retorna o número de linhas afetadas pelo último comando."""
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        """tuple: Retorna a descrição das colunas do último SELECT."""
+        return self._cursor.description
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(sql.replace("%s", "?"), params)
+        self.lastrowid = self._cursor.lastrowid
+
+    def executemany(self, sql, seq_params):
+        seq_params = list(seq_params)
+        comando = _INSERT_VALUES.match(sql.strip())
+        if comando is None or not seq_params:
+            self._cursor.executemany(sql.replace("%s", "?"), seq_params)
+            return
+        valores = ", ".join([comando.group(2)] * len(seq_params))
+        self._cursor.execute((comando.group(1) + valores).replace("%s", "?"),
+                             [valor for linha in seq_params for valor in linha])
+        self.lastrowid = self._cursor.lastrowid - len(seq_params) + 1
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def close(self):
+        self._cursor.close()
+
+
+def _converter_data_hora(valor):
+    # Datas em formatos não ISO continuam como texto, como o MySQL exibiria o valor gravado
+    texto = valor.decode()
+    try:
+        return datetime.fromisoformat(texto)
+    except ValueError:
+        return texto
+
+
+def _converter_data(valor):
+    texto = valor.decode()
+    try:
+        return date.fromisoformat(texto)
+    except ValueError:
+        return texto
+
+
+sqlite3.register_adapter(datetime, lambda valor: valor.isoformat(" "))
+sqlite3.register_adapter(date, lambda valor: valor.isoformat())
+sqlite3.register_converter("DATETIME", _converter_data_hora)
+sqlite3.register_converter("DATE", _converter_data)
@@ -0,0 +1,139 @@
+"""
+Compara o tempo e a memória para montar pacientes e tarefas a partir de linhas do banco de dados
+com os modelos com __slots__ e `de_linha` e com a representação anterior (um __dict__ por objeto,
+montado pelo __init__ seguido de definir_id e atribuições).
+
+As linhas têm o formato devolvido pelo Database: pacientes com as colunas de COLUNAS_CENSO e
+tarefas com id, descricao, prioridade e localizacao, com urgência e transporte como códigos. Os dois
+lados convertem os códigos nos rótulos da mesma forma.
+
+O ganho de tempo é pequeno (cerca de 1,1x a 1,2x): nos dois lados, a maior parte do custo é alocar
+o objeto e chamar uma função Python por linha; de_linha economiza apenas as chamadas de definir_id
+e dos setters. O ganho principal dos __slots__ é a memória por objeto.
+
+Uso:
+    python benchmarks/bench_modelos.py --linhas 100000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import Paciente, Tarefa
+from estados import Urgencia, Transporte
+
+ROTULOS_URGENCIA = {int(membro): membro.rotulo for membro in Urgencia}
+ROTULOS_TRANSPORTE = {int(membro): membro.rotulo for membro in Transporte}
+
+
+class PacienteAnterior:
+    """Reproduz a representação anterior de Paciente: atributos em um __dict__ por objeto."""
+
+    def __init__(self, nome, cpf, localizacao, condicao, transporte, urgencia=None):
+        self._id = None
+        self._nome = nome
+        self._cpf = cpf
+        self._localizacao = localizacao
+        self._condicao = condicao
+        self._transporte = transporte
+        self._urgencia = urgencia
+
+    @property
+    def id(self):
+        return self._id
+
+    @id.setter
+    def id(self, id):
+        self._id = id
+
+    @property
+    def urgencia(self):
+        return self._urgencia
+
+    @urgencia.setter
+    def urgencia(self, urgencia):
+        self._urgencia = urgencia
+
+    def definir_id(self, id):
+        self.id = id
+
+
+class TarefaAnterior:
+    """Reproduz a representação anterior de Tarefa: atributos em um __dict__ por objeto."""
+
+    def __init__(self, id, descricao, prioridade, paciente, localizacao, maqueiro):
+        self._id = id
+        self._descricao = descricao
+        self._prioridade = prioridade
+        self._status = 'pendente'
+        self._paciente = paciente
+        self._localizacao = localizacao
+        self._maqueiro = maqueiro
+
+
+def montar_anterior(linhas):
+    resultado = []
+    for linha_paciente, linha_tarefa in linhas:
+        paciente = PacienteAnterior(linha_paciente[1], linha_paciente[2], linha_paciente[3], linha_paciente[4],
+                                    ROTULOS_TRANSPORTE[linha_paciente[5]])
+        paciente.definir_id(linha_paciente[0])
+        paciente.urgencia = ROTULOS_URGENCIA[linha_paciente[6]]
+        resultado.append(TarefaAnterior(linha_tarefa[0], linha_tarefa[1], ROTULOS_URGENCIA[linha_tarefa[2]],
+                                        paciente, linha_tarefa[3], None))
+    return resultado
+
+
+def montar_slots(linhas):
+    resultado = []
+    for linha_paciente, linha_tarefa in linhas:
+        paciente = Paciente.de_linha(linha_paciente)
+        resultado.append(Tarefa.de_linha(linha_tarefa, paciente, None))
+    return resultado
+
+
+def medir(montar, linhas, repeticoes):
+    """
+    Retorna o menor tempo de montagem, em segundos, e a memória alocada pelos objetos, em bytes.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        montar(linhas)
+        tempos.append(time.perf_counter() - inicio)
+    gc.collect()
+    tracemalloc.start()
+    objetos = montar(linhas)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objetos
+    return min(tempos), memoria
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, default=100000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    linhas = [((i, f"Paciente {i}", f"{i:011d}", f"Sala {i % 300}", "Estável", Transporte.AGUARDANDO.value,
+                Urgencia.ALTA.value, None),
+               (i, f"Transporte {i}", Urgencia.ALTA.value, f"Sala {i % 300}"))
+              for i in range(args.linhas)]
+    resultados = {}
+    for nome, montar in (("anterior", montar_anterior), ("slots", montar_slots)):
+        resultados[nome] = medir(montar, linhas, args.repeticoes)
+
+    for nome, rotulo in (("anterior", "__dict__ e __init__:"), ("slots", "__slots__ e de_linha:")):
+        tempo, memoria = resultados[nome]
+        print(f"{rotulo:24} {tempo * 1000:8.1f} ms  {memoria / args.linhas:6.0f} bytes/linha")
+    print(f"Ganho de tempo:          {resultados['anterior'][0] / resultados['slots'][0]:8.2f}x")
+    print(f"Redução de memória:      {1 - resultados['slots'][1] / resultados['anterior'][1]:8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Compara a vazão das buscas e atualizações mais frequentes com comandos preparados no servidor
+e com o protocolo de texto.
+
+Uso:
+    python benchmarks/bench_preparados.py --host localhost --user root --password "" --database projeto_macas
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import Database
+from models import Paciente
+
+
+def medir(db, paciente_id, repeticoes):
+    """
+    Executa buscas por ID e atualizações de localização e retorna as operações por segundo.
+    """
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        db.buscar_paciente_por_id(paciente_id)
+        db.atualizar_localizacao_paciente(paciente_id, "Sala de benchmark")
+    return (2 * repeticoes) / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--user", default="root")
+    parser.add_argument("--password", default="")
+    parser.add_argument("--database", default="projeto_macas")
+    parser.add_argument("--repeticoes", type=int, default=2000)
+    args = parser.parse_args()
+
+    resultados = {}
+    for usar_preparados in (False, True):
+        # Sem mapa de identidade, para que toda busca chegue ao servidor
+        db = Database(args.host, args.user, args.password, args.database, capacidade_cache=0, usar_preparados=usar_preparados)
+        db.create_tables()
+        pacientes, _ = db.listar_pacientes_pagina(limite=1)
+        if pacientes:
+            paciente_id = pacientes[0].id
+        else:
+            paciente_id = db.insert_paciente(Paciente("Benchmark", "00000000000", "Sala", "Estável", "Aguardando transporte", "Baixa"))
+        medir(db, paciente_id, min(100, args.repeticoes))  # Aquecimento
+        resultados[usar_preparados] = medir(db, paciente_id, args.repeticoes)
+        db.fechar()
+
+    print(f"Protocolo de texto:   {resultados[False]:10.0f} operações/s")
+    print(f"Comandos preparados:  {resultados[True]:10.0f} operações/s")
+    print(f"Ganho:                {resultados[True] / resultados[False]:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
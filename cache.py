@@ -0,0 +1,229 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class MapaIdentidade:
+    """
+    Classe MapaIdentidade que guarda os objetos já carregados do banco de dados.
+
+    Os objetos são indexados pelo ID e, opcionalmente, por chaves secundárias únicas
+    (por exemplo, CPF ou login). Quando a capacidade é atingida, o objeto usado há mais
+    tempo é descartado (LRU).
+
+    Attributes:
+        capacidade (int): Número máximo de objetos guardados.
+        ttl (float): Tempo de vida, em segundos, de cada objeto (None para não expirar).
+        acertos (int): Número de buscas atendidas pelo mapa.
+        falhas (int): Número de buscas que não encontraram o objeto no mapa.
+    """
+
+    def __init__(self, capacidade=1000, chaves=(), ttl=None):
+        """
+        Inicializa um mapa de identidade vazio.
+
+        Args:
+            capacidade (int): Número máximo de objetos guardados.
+            chaves (tuple): Nomes dos atributos usados como chaves secundárias.
+            ttl (float): Tempo de vida, em segundos, de cada objeto (None para não expirar).
+        """
+        self.capacidade = capacidade
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self._chaves = tuple(chaves)
+        self._objetos = OrderedDict()
+        self._indices = {chave: {} for chave in self._chaves}
+        self._lock = threading.Lock()
+
+    def obter(self, id):
+        """
+        Busca um objeto pelo ID.
+
+        Args:
+            id (int): ID do objeto.
+
+        Returns:
+            object: Objeto guardado, ou None se não estiver no mapa.
+        """
+        with self._lock:
+            return self._obter(id)
+
+    def obter_por(self, chave, valor):
+        """
+        Busca um objeto por uma chave secundária.
+
+        Args:
+            chave (str): Nome da chave secundária (por exemplo, 'cpf').
+            valor: Valor procurado.
+
+        Returns:
+            object: Objeto guardado, ou None se não estiver no mapa.
+        """
+        with self._lock:
+            id = self._indices[chave].get(valor)
+            if id is None:
+                self.falhas += 1
+                return None
+            return self._obter(id)
+
+    def guardar(self, objeto):
+        """
+        Guarda um objeto no mapa, substituindo a versão anterior com o mesmo ID.
+
+        Args:
+            objeto (object): Objeto com atributo `id` e as chaves secundárias do mapa.
+
+        Returns:
+            object: O próprio objeto guardado.
+        """
+        if objeto is None or objeto.id is None:
+            return objeto
+        with self._lock:
+            self._remover(objeto.id)
+            self._objetos[objeto.id] = (objeto, time.monotonic())
+            for chave in self._chaves:
+                valor = getattr(objeto, chave, None)
+                if valor is not None:
+                    self._indices[chave][valor] = objeto.id
+            while len(self._objetos) > self.capacidade:
+                self._remover(next(iter(self._objetos)))
+        return objeto
+
+    def invalidar(self, id):
+        """
+        Remove um objeto do mapa.
+
+        Args:
+            id (int): ID do objeto a ser removido.
+        """
+        with self._lock:
+            self._remover(id)
+
+    def limpar(self):
+        """
+        Remove todos os objetos do mapa.
+        """
+        with self._lock:
+            self._objetos.clear()
+            for indice in self._indices.values():
+                indice.clear()
+
+    def __len__(self):
+        return len(self._objetos)
+
+    def _obter(self, id):
+        item = self._objetos.get(id)
+        if item is None:
+            self.falhas += 1
+            return None
+        objeto, guardado_em = item
+        if self.ttl is not None and time.monotonic() - guardado_em > self.ttl:
+            self._remover(id)
+            self.falhas += 1
+            return None
+        self._objetos.move_to_end(id)
+        self.acertos += 1
+        return objeto
+
+    def _remover(self, id):
+        item = self._objetos.pop(id, None)
+        if item is None:
+            return
+        objeto = item[0]
+        for chave in self._chaves:
+            valor = getattr(objeto, chave, None)
+            if self._indices[chave].get(valor) == id:
+                del self._indices[chave][valor]
+
+
+class CacheDeResultados:
+    """
+    Classe CacheDeResultados que guarda, por alguns segundos, o resultado de consultas caras.
+
+    O cache é compartilhado por todas as threads da estação. Quando várias threads pedem a mesma
+    consulta ao mesmo tempo, apenas uma vai ao banco e as demais aguardam o resultado.
+
+    Attributes:
+        ttl (float): Tempo de vida, em segundos, de cada resultado.
+        acertos (int): Número de consultas atendidas pelo cache.
+        falhas (int): Número de consultas que precisaram ir ao banco.
+        invalidacoes (int): Número de vezes que o cache foi esvaziado por uma escrita.
+    """
+
+    def __init__(self, ttl=5.0):
+        """
+        Inicializa um cache vazio.
+
+        Args:
+            ttl (float): Tempo de vida, em segundos, de cada resultado (0 desativa o cache).
+        """
+        self.ttl = ttl
+        self.acertos = 0
+        self.falhas = 0
+        self.invalidacoes = 0
+        self._resultados = {}
+        self._geracao = 0
+        self._lock = threading.Lock()
+        self._calculando = {}
+
+    def obter_ou_calcular(self, chave, calcular):
+        """
+        Retorna o resultado guardado para a chave ou o calcula, guardando-o.
+
+        Args:
+            chave (tuple): Identifica a consulta e seus parâmetros.
+            calcular (callable): Função sem argumentos que executa a consulta.
+
+        Returns:
+            object: Resultado da consulta.
+        """
+        if not self.ttl:
+            return calcular()
+        while True:
+            with self._lock:
+                item = self._resultados.get(chave)
+                if item is not None and time.monotonic() - item[1] <= self.ttl:
+                    self.acertos += 1
+                    return item[0]
+                evento = self._calculando.get(chave)
+                if evento is None:
+                    evento = self._calculando[chave] = threading.Event()
+                    geracao = self._geracao
+                    self.falhas += 1
+                    break
+            # Outra thread já está calculando o mesmo resultado
+            evento.wait()
+        try:
+            resultado = calcular()
+            with self._lock:
+                # Uma escrita durante o cálculo torna o resultado possivelmente desatualizado
+                if geracao == self._geracao:
+                    self._resultados[chave] = (resultado, time.monotonic())
+            return resultado
+        finally:
+            with self._lock:
+                del self._calculando[chave]
+            evento.set()
+
+    def invalidar(self):
+        """
+        Descarta todos os resultados guardados.
+        """
+        with self._lock:
+            self._resultados.clear()
+            self._geracao += 1
+            self.invalidacoes += 1
+
+    def metricas(self):
+        """
+        Returns:
+            dict: Acertos, falhas, invalidações e número de resultados guardados.
+        """
+        with self._lock:
+            return {
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "invalidacoes": self.invalidacoes,
+                "guardados": len(self._resultados),
+            }
@@ -0,0 +1,182 @@
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # O censo colunar é opcional: o restante do sistema funciona sem o NumPy
+    np = None
+
+from estados import Urgencia, Transporte, URGENCIAS, TRANSPORTES
+
+
+def _codigos(valores, enum):
+    # Rótulo ou código de cada valor, menos 1 para indexar URGENCIAS e TRANSPORTES (-1 se desconhecido ou nulo)
+    codigos = []
+    for valor in valores:
+        try:
+            codigos.append(enum.codigo(valor) - 1 if valor is not None else -1)
+        except ValueError:
+            codigos.append(-1)
+    return codigos
+
+
+def _contar(codigos, rotulos):
+    # Códigos -1 (valor desconhecido ou nulo) ficam fora da contagem
+    contagens = np.bincount(codigos[codigos >= 0], minlength=len(rotulos))
+    return {rotulo: int(contagem) for rotulo, contagem in zip(rotulos, contagens) if contagem}
+
+
+class CensoColunar:
+    """
+    Classe CensoColunar com uma cópia dos pacientes em colunas (arrays do NumPy), para estatísticas vetorizadas.
+
+    Montado a partir do resultado de `Database.listar_pacientes`, guarda uma coluna por atributo
+    em vez de um objeto por paciente: filtros, agrupamentos e histogramas são operações sobre
+    arrays inteiros, sem laços em Python, e levam milissegundos mesmo com 100 mil pacientes.
+
+    Urgência e estado de transporte são os códigos de estados.Urgencia e estados.Transporte menos 1,
+    ou seja, índices de URGENCIAS e TRANSPORTES (-1 para valores fora dessas listas). A localização
+    é um código, índice de `localizacoes`.
+
+    Attributes:
+        ids (numpy.ndarray): IDs dos pacientes (int64).
+        urgencias (numpy.ndarray): Códigos de urgência (int8).
+        transportes (numpy.ndarray): Códigos do estado de transporte (int8).
+        codigos_localizacao (numpy.ndarray): Códigos de localização (int32).
+        localizacoes (tuple): Nomes das localizações, na ordem dos códigos.
+        inicio_transporte (numpy.ndarray): Início do transporte em andamento (datetime64[s], NaT se não houver).
+    """
+
+    def __init__(self, ids, urgencias, transportes, codigos_localizacao, localizacoes, inicio_transporte):
+        if np is None:
+            raise RuntimeError("O censo colunar requer o NumPy instalado.")
+        self.ids = ids
+        self.urgencias = urgencias
+        self.transportes = transportes
+        self.codigos_localizacao = codigos_localizacao
+        self.localizacoes = tuple(localizacoes)
+        self.inicio_transporte = inicio_transporte
+
+    @classmethod
+    def de_pacientes(cls, pacientes):
+        """
+        Monta o censo a partir de uma lista de pacientes.
+
+        Args:
+            pacientes (list): Objetos Paciente, como os retornados por `listar_pacientes`.
+
+        Returns:
+            CensoColunar: Censo com uma posição por paciente, na ordem da lista.
+        """
+        if np is None:
+            raise RuntimeError("O censo colunar requer o NumPy instalado.")
+        ids = np.fromiter((p.id for p in pacientes), dtype=np.int64, count=len(pacientes))
+        urgencias = np.array(_codigos((p.urgencia for p in pacientes), Urgencia), dtype=np.int8)
+        transportes = np.array(_codigos((p.transporte for p in pacientes), Transporte), dtype=np.int8)
+        localizacoes, codigos_localizacao = np.unique(np.array([p.localizacao or '' for p in pacientes], dtype=str),
+                                                      return_inverse=True)
+        # datetime64 aceita tanto objetos datetime quanto texto ISO (SQLite sem conversão de tipos)
+        inicio_transporte = np.array([p.inicio_transporte if p.inicio_transporte is not None else 'NaT'
+                                      for p in pacientes], dtype='datetime64[s]')
+        return cls(ids, urgencias, transportes, codigos_localizacao.astype(np.int32).reshape(-1),
+                   localizacoes.tolist(), inicio_transporte)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def filtrar(self, mascara):
+        """
+        Retorna um novo censo apenas com os pacientes selecionados.
+
+        Args:
+            mascara (numpy.ndarray): Array booleano com uma posição por paciente, como os
+                retornados pelos métodos `com_*`, combináveis com & e |.
+
+        Returns:
+            CensoColunar: Censo filtrado, com as mesmas localizações e códigos.
+        """
+        return CensoColunar(self.ids[mascara], self.urgencias[mascara], self.transportes[mascara],
+                            self.codigos_localizacao[mascara], self.localizacoes, self.inicio_transporte[mascara])
+
+    def com_urgencia(self, *urgencias):
+        """numpy.ndarray: Retorna a máscara dos pacientes com uma das urgências informadas."""
+        return np.isin(self.urgencias, _codigos(urgencias, Urgencia))
+
+    def com_transporte(self, *transportes):
+        """numpy.ndarray: Retorna a máscara dos pacientes em um dos estados de transporte informados."""
+        return np.isin(self.transportes, _codigos(transportes, Transporte))
+
+    def na_localizacao(self, *localizacoes):
+        """numpy.ndarray: Retorna a máscara dos pacientes em uma das localizações informadas."""
+        codigos = [self.localizacoes.index(localizacao) for localizacao in localizacoes if localizacao in self.localizacoes]
+        return np.isin(self.codigos_localizacao, codigos)
+
+    def contagem_por_urgencia(self):
+        """dict: Retorna o número de pacientes por nível de urgência."""
+        return _contar(self.urgencias, URGENCIAS)
+
+    def contagem_por_transporte(self):
+        """dict: Retorna o número de pacientes por estado de transporte."""
+        return _contar(self.transportes, TRANSPORTES)
+
+    def contagem_por_localizacao(self):
+        """dict: Retorna o número de pacientes por localização."""
+        return _contar(self.codigos_localizacao, self.localizacoes)
+
+    def urgencia_por_localizacao(self):
+        """
+        Conta os pacientes de cada urgência em cada localização, com um único bincount.
+
+        Returns:
+            numpy.ndarray: Matriz (localizações × URGENCIAS) com as contagens.
+        """
+        validos = self.urgencias >= 0
+        combinados = self.codigos_localizacao[validos] * len(URGENCIAS) + self.urgencias[validos]
+        contagens = np.bincount(combinados, minlength=len(self.localizacoes) * len(URGENCIAS))
+        return contagens.reshape(len(self.localizacoes), len(URGENCIAS))
+
+    def tempo_em_transporte(self, agora=None):
+        """
+        Calcula há quanto tempo cada paciente está em transporte.
+
+        Args:
+            agora (datetime): Instante de referência (padrão: agora).
+
+        Returns:
+            numpy.ndarray: Segundos desde o início do transporte (float64, NaN sem transporte em andamento).
+        """
+        agora = np.datetime64(agora or datetime.now(), 's')
+        segundos = (agora - self.inicio_transporte).astype(np.float64)
+        segundos[np.isnat(self.inicio_transporte)] = np.nan
+        return segundos
+
+    def histograma_tempo_transporte(self, limites, agora=None):
+        """
+        Distribui os transportes em andamento em faixas de duração.
+
+        Args:
+            limites (list): Limites das faixas, em segundos (como em numpy.histogram).
+            agora (datetime): Instante de referência (padrão: agora).
+
+        Returns:
+            tuple: Contagens por faixa e os limites das faixas.
+        """
+        segundos = self.tempo_em_transporte(agora)
+        return np.histogram(segundos[~np.isnan(segundos)], bins=limites)
+
+    def tempo_medio_por_localizacao(self, agora=None):
+        """
+        Calcula o tempo médio em transporte dos pacientes de cada localização.
+
+        Args:
+            agora (datetime): Instante de referência (padrão: agora).
+
+        Returns:
+            dict: Tempo médio, em segundos, por localização com algum transporte em andamento.
+        """
+        segundos = self.tempo_em_transporte(agora)
+        validos = ~np.isnan(segundos)
+        codigos = self.codigos_localizacao[validos]
+        somas = np.bincount(codigos, weights=segundos[validos], minlength=len(self.localizacoes))
+        contagens = np.bincount(codigos, minlength=len(self.localizacoes))
+        return {localizacao: float(somas[codigo] / contagens[codigo])
+                for codigo, localizacao in enumerate(self.localizacoes) if contagens[codigo]}
@@ -1,105 +1,858 @@
-import mysql.connector
-from mysql.connector import Error
+import functools
+import itertools
+import json
+import threading
+import time
+import weakref
+from contextlib import contextmanager
 from datetime import datetime
 from models import Paciente, Maqueiro, Tarefa, SolicitacaoTransporte, Incidente
+from pool import PoolDeConexoes, ErroPool, ErroConexao
+from cache import MapaIdentidade, CacheDeResultados
+from resumo import ResumoDespacho, SOLICITACOES, TRANSPORTE, TAREFAS
+from backends import BackendMySQL, CursorPreparado, ERROS_SQL, ERROS_CONEXAO
+from migracoes import VERSAO_ATUAL, aplicar_migracoes, versao_do_esquema
+from estados import Urgencia, Transporte, StatusTarefa, StatusSolicitacao, origens
+from metricas import Instrumentacao, CursorInstrumentado, instrumentar_metodos
+from escrita_adiada import EscritaAdiada
+from relacoes import CarregadorEmLote
 
+
+class ErroTransacao(Exception):
+    """
+    Erro levantado quando uma operação dentro de `Database.transaction()` falha e a transação é desfeita.
+    """
+
+
+ERROS_BANCO = ERROS_SQL + (ErroPool, ErroTransacao)
+
+# Colunas de pacientes e maqueiros lidas nas buscas e nas relações das listagens. A senha do
+# maqueiro fica de fora: apenas `autenticar` a lê.
+CAMPOS_PACIENTE = ("id", "nome", "cpf", "localizacao", "condicao", "transporte")
+CAMPOS_MAQUEIRO = ("id", "nome", "coren", "data_nascimento", "sexo", "login")
+
+# Colunas usadas para montar pacientes e maqueiros a partir de consultas com JOIN
+COLUNAS_PACIENTE = ", ".join(f"p.{campo}" for campo in CAMPOS_PACIENTE)
+COLUNAS_MAQUEIRO = ", ".join(f"m.{campo}" for campo in CAMPOS_MAQUEIRO)
+
+# Relações carregadas pelas listagens: tabela, apelido no JOIN, colunas e construtor do modelo
+RELACOES = {
+    "paciente": ("Pacientes", "p", CAMPOS_PACIENTE, Paciente.de_linha),
+    "maqueiro": ("Maqueiros", "m", CAMPOS_MAQUEIRO, Maqueiro.de_linha),
+}
+
+# Número máximo de IDs por consulta ao carregar em lote as relações de uma listagem preguiçosa
+TAMANHO_LOTE_RELACOES = 500
+
+
+_SELECT_INCIDENTES_DE = "SELECT i.id, i.descricao, i.data_hora, {colunas} FROM {origem} i{juncoes}"
+
+# Colunas comuns às tabelas ativas e às tabelas de arquivo
+COLUNAS_INCIDENTE = "id, descricao, maqueiro_id, paciente_id, data_hora"
+COLUNAS_SOLICITACAO = "id, descricao, paciente_id, status, maqueiro_id, data_hora"
+
+# Incidentes ativos e arquivados, para os relatórios que abrangem o arquivo
+ORIGEM_INCIDENTES_COM_ARQUIVO = (f"(SELECT {COLUNAS_INCIDENTE} FROM Incidentes "
+                                 f"UNION ALL SELECT {COLUNAS_INCIDENTE} FROM IncidentesArquivo)")
+
+# Colunas da listagem de pacientes, incluindo a urgência
+COLUNAS_CENSO = "id, nome, cpf, localizacao, condicao, transporte, urgencia, inicio_transporte"
+
+
+# Tabelas ativas copiadas para o instantâneo local do modo offline, das referenciadas para as que referenciam
+TABELAS_INSTANTANEO = (
+    ("Pacientes", "id, nome, cpf, localizacao, condicao, urgencia, transporte, inicio_transporte"),
+    # A senha é copiada para que o login funcione sem o servidor
+    ("Maqueiros", "id, nome, coren, data_nascimento, sexo, login, senha"),
+    ("Tarefas", "id, descricao, prioridade, status, paciente_id, localizacao, maqueiro_id"),
+    ("SolicitacoesTransporte", COLUNAS_SOLICITACAO),
+    ("Incidentes", COLUNAS_INCIDENTE),
+)
+
+# Consultas das linhas alteradas entre duas marcas da sequência de alterações, com a seq na primeira coluna
+CONSULTAS_ALTERACOES = {
+    "pacientes": f"SELECT seq, {COLUNAS_CENSO} FROM Pacientes WHERE seq > %s AND seq <= %s ORDER BY seq LIMIT %s",
+    "tarefas": (f"SELECT t.seq, t.id, t.descricao, t.prioridade, t.localizacao, t.status, {COLUNAS_PACIENTE}, {COLUNAS_MAQUEIRO} "
+                "FROM Tarefas t LEFT JOIN Pacientes p ON p.id = t.paciente_id LEFT JOIN Maqueiros m ON m.id = t.maqueiro_id "
+                "WHERE t.seq > %s AND t.seq <= %s ORDER BY t.seq LIMIT %s"),
+    "solicitacoes": (f"SELECT s.seq, s.id, s.descricao, s.status, s.data_hora, {COLUNAS_PACIENTE}, {COLUNAS_MAQUEIRO} "
+                     "FROM SolicitacoesTransporte s LEFT JOIN Pacientes p ON p.id = s.paciente_id "
+                     "LEFT JOIN Maqueiros m ON m.id = s.maqueiro_id "
+                     "WHERE s.seq > %s AND s.seq <= %s ORDER BY s.seq LIMIT %s"),
+}
+
+# Segundos após os quais uma lacuna no registro de alterações é tratada como transação desfeita,
+# quando o backend não informa as transações abertas (ver `lacuna_encerrada`). Uma transação pode
+# segurar uma seq por, no máximo, a sua própria duração mais as esperas por bloqueio
+# (innodb_lock_wait_timeout, 50 s por padrão). As transações da aplicação duram poucos segundos:
+# 120 s ficam bem acima desse limite.
+ESPERA_LACUNA = 120
+# Número de linhas recentes do registro examinadas por `marca_alteracoes`
+JANELA_REGISTRO = 1000
+
+
+def _seq_confirmada(linhas, marca):
+    # A seq vem do AUTO_INCREMENT, gerado fora da ordem dos commits: uma lacuna pode ser uma
+    # transação ainda aberta, cujas alterações apareceriam abaixo de uma marca já entregue.
+    # Só se avança até a primeira lacuna ainda pendente; as encerradas são transações desfeitas.
+    for seq, encerrada in linhas:
+        if seq != marca + 1 and not encerrada:
+            break
+        marca = seq
+    return marca
+
+
+class Alteracoes:
+    """
+    Classe Alteracoes com as linhas de pacientes, tarefas e solicitações alteradas desde uma marca.
+
+    Attributes:
+        pacientes (list): Pacientes inseridos ou alterados, na ordem das alterações.
+        tarefas (list): Tarefas inseridas ou alteradas, com o status atual.
+        solicitacoes (list): Solicitações de transporte inseridas ou alteradas, com o status atual.
+        marca (int): Marca a informar na próxima consulta.
+        completo (bool): False se o limite foi atingido e ainda há alterações a buscar a partir de `marca`.
+    """
+
+    def __init__(self, marca, pacientes=(), tarefas=(), solicitacoes=(), completo=True):
+        self.marca = marca
+        self.pacientes = list(pacientes)
+        self.tarefas = list(tarefas)
+        self.solicitacoes = list(solicitacoes)
+        self.completo = completo
+
+    def __len__(self):
+        return len(self.pacientes) + len(self.tarefas) + len(self.solicitacoes)
+
+
+class ResultadoLote:
+    """
+    Classe ResultadoLote com o resultado de uma inserção em lote.
+
+    Attributes:
+        ids (list): IDs gerados, na mesma ordem da entrada (None para as linhas que falharam).
+        falhas (list): Pares (índice, mensagem) das linhas que não foram inseridas.
+    """
+
+    def __init__(self, total):
+        self.ids = [None] * total
+        self.falhas = []
+
+    @property
+    def inseridos(self):
+        """int: Retorna o número de linhas inseridas."""
+        return sum(1 for id in self.ids if id is not None)
+
+    def falhar_todos(self, mensagem):
+        """Marca todas as linhas como não inseridas, com a mesma mensagem de erro."""
+        self.falhas = [(indice, mensagem) for indice in range(len(self.ids))]
+        self.ids = [None] * len(self.ids)
+
+
+def _paciente_de_linha(linha):
+    """
+    Monta um paciente a partir das colunas id, nome, cpf, localizacao, condicao e transporte.
+
+    Args:
+        linha (tuple): Valores das colunas, na ordem de COLUNAS_PACIENTE.
+
+    Returns:
+        Paciente: Objeto paciente, ou None se o id for nulo (JOIN sem correspondência).
+    """
+    if linha[0] is None:
+        return None
+    return Paciente.de_linha(linha)
+
+
+def _maqueiro_de_linha(linha):
+    """
+    Monta um maqueiro a partir das colunas id, nome, coren, data_nascimento, sexo e login.
+
+    Args:
+        linha (tuple): Valores das colunas, na ordem de COLUNAS_MAQUEIRO.
+
+    Returns:
+        Maqueiro: Objeto maqueiro, ou None se o id for nulo (JOIN sem correspondência).
+    """
+    if linha[0] is None:
+        return None
+    return Maqueiro.de_linha(linha)
+
+
+def _em_transporte(condicao, transporte):
+    """
+    Retorna True se a condição e o status de transporte (rótulo ou código) indicarem um paciente
+    em transporte, com a mesma comparação sem diferenciar maiúsculas usada pelo banco de dados.
+    """
+    return ((condicao or '').lower() == 'em transporte'
+            and transporte is not None and Transporte.codigo(transporte) != Transporte.CHEGOU)
+
+
+def _pendente(status):
+    # Tarefas e solicitações usam o mesmo código para 'pendente'
+    return status is not None and StatusSolicitacao.codigo(status) == StatusSolicitacao.PENDENTE
+
+
+def _campos_relacao(nome, pedidos):
+    """
+    Retorna as colunas a ler de uma relação: todas, ou o id seguido das colunas pedidas.
+
+    Raises:
+        ValueError: Se alguma coluna pedida não existir na relação.
+    """
+    todos = RELACOES[nome][2]
+    if pedidos is None:
+        return todos
+    desconhecidos = set(pedidos) - set(todos)
+    if desconhecidos:
+        raise ValueError(f"Colunas desconhecidas em {nome}: {', '.join(sorted(desconhecidos))}")
+    return tuple(campo for campo in todos if campo == "id" or campo in pedidos)
+
+
+class _PlanoRelacoes:
+    """
+    Define como uma listagem carrega o paciente e o maqueiro de cada linha.
+
+    Por padrão, as relações vêm na mesma consulta, por LEFT JOIN. Com `preguicoso`, a consulta lê
+    apenas as chaves estrangeiras e cada relação vira uma referência (relacoes.Referencia): no
+    primeiro acesso a qualquer uma delas, as de toda a listagem são carregadas juntas, com uma
+    consulta por tabela. Nos dois casos, `colunas` restringe as colunas lidas de cada relação.
+
+    Attributes:
+        base (str): Apelido da tabela principal na consulta.
+        nomes (tuple): Relações, na ordem das colunas da consulta ('paciente', 'maqueiro').
+        preguicoso (bool): Se True, as relações são carregadas no primeiro acesso.
+        campos (dict): Colunas lidas de cada relação.
+        carregadores (dict): CarregadorEmLote de cada relação, nas listagens preguiçosas.
+    """
+
+    def __init__(self, db, base, nomes, preguicoso=False, colunas=None):
+        colunas = dict(colunas or {})
+        desconhecidas = set(colunas) - set(nomes)
+        if desconhecidas:
+            raise ValueError(f"Relações desconhecidas: {', '.join(sorted(desconhecidas))}")
+        self.base = base
+        self.nomes = nomes
+        self.preguicoso = preguicoso
+        self.campos = {nome: _campos_relacao(nome, colunas.get(nome)) for nome in nomes}
+        self.carregadores = {}
+        if preguicoso:
+            self.carregadores = {nome: CarregadorEmLote(functools.partial(db._buscar_relacao, nome, self.campos[nome]))
+                                 for nome in nomes}
+        self._db = db
+
+    @property
+    def colunas(self):
+        """str: Colunas das relações, para a lista do SELECT."""
+        if self.preguicoso:
+            return ", ".join(f"{self.base}.{nome}_id" for nome in self.nomes)
+        return ", ".join(f"{RELACOES[nome][1]}.{campo}" for nome in self.nomes for campo in self.campos[nome])
+
+    @property
+    def juncoes(self):
+        """str: Cláusulas LEFT JOIN das relações (vazia nas listagens preguiçosas)."""
+        if self.preguicoso:
+            return ""
+        return "".join(f" LEFT JOIN {RELACOES[nome][0]} {RELACOES[nome][1]} "
+                       f"ON {RELACOES[nome][1]}.id = {self.base}.{nome}_id" for nome in self.nomes)
+
+    def montar(self, linha, inicio):
+        """
+        Monta as relações de uma linha do resultado.
+
+        Args:
+            linha (tuple): Linha da consulta.
+            inicio (int): Índice da primeira coluna das relações.
+
+        Returns:
+            dict: Objeto, referência ou None de cada relação, por nome.
+        """
+        relacoes = {}
+        for nome in self.nomes:
+            if self.preguicoso:
+                relacoes[nome] = self.carregadores[nome].referencia(linha[inicio])
+                inicio += 1
+            else:
+                fim = inicio + len(self.campos[nome])
+                relacoes[nome] = self._db._objeto_relacao(nome, self.campos[nome], linha[inicio:fim])
+                inicio = fim
+        return relacoes
+
+
+class CursorReplica:
+    """
+    Envolve o cursor de uma leitura feita em uma réplica.
+
+    Se a conexão com a réplica cair durante um comando, `trocar` tira a réplica do rodízio e
+    devolve um cursor no primário, onde o comando é repetido e o restante do bloco continua.
+    Os demais atributos são repassados ao cursor atual.
+    """
+
+    def __init__(self, cursor, trocar):
+        self._cursor = cursor
+        self._trocar = trocar
+
+    def execute(self, sql, *args, **kwargs):
+        try:
+            return self._cursor.execute(sql, *args, **kwargs)
+        except ERROS_CONEXAO as e:
+            self._cursor = self._trocar(e)
+            return self._cursor.execute(sql, *args, **kwargs)
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+@instrumentar_metodos(ignorar=('transaction', 'metricas_pool', 'metricas_consultas', 'exportar_metricas',
+                               'metricas_censo', 'resumo_despacho', 'limpar_cache', 'ativar_escrita_adiada', 'disponivel', 'fechar'))
 class Database:
     """
-    Classe Database para gerenciar a conexão e operações com o banco de dados MySQL.
+    Classe Database para gerenciar a conexão e operações com o banco de dados.
+
+    O SQL específico de cada banco fica no backend: MySQL (padrão) ou SQLite embutido,
+    em arquivo ou em memória, que dispensa servidor. Cada operação retira uma conexão do pool e a devolve ao terminar, de modo que
+    várias consultas podem ser executadas ao mesmo tempo.
+
+    Pacientes e maqueiros já carregados ficam guardados em mapas de identidade, de modo que
+    buscas repetidas não voltam ao banco. O censo de pacientes ordenado por urgência fica guardado
+    por alguns segundos, compartilhado entre as telas. Os métodos de atualização invalidam as
+    entradas afetadas e o censo.
+
+    Opcionalmente, as consultas de leitura (listagens, relatórios e buscas) são distribuídas entre
+    réplicas de leitura. Depois de uma escrita, as leituras voltam ao primário por alguns segundos,
+    para que a própria estação sempre veja o que acabou de gravar.
+
+    Com `manter_resumo`, os contadores do despacho (solicitações pendentes por urgência, pacientes
+    em transporte e tarefas abertas por maqueiro) ficam em memória e são ajustados a cada escrita.
+
+    Com `ativar_escrita_adiada`, os incidentes são gravados em lotes por uma thread de fundo, sem
+    que a interface espere pelo commit.
+
+    As listagens de tarefas, solicitações e incidentes aceitam `preguicoso`, para carregar o
+    paciente e o maqueiro de cada linha em lote só no primeiro acesso, e `colunas`, para ler
+    apenas as colunas que a tela usa. A senha dos maqueiros só é lida por `autenticar`.
+
+    Cada método público e cada comando SQL são medidos (chamadas, linhas lidas e latência); as
+    estatísticas ficam disponíveis em `metricas_consultas()` e `exportar_metricas()`.
 
     Attributes:
-        connection (mysql.connector.connection_cext.CMySQLConnection): Conexão com o banco de dados.
-        cursor (mysql.connector.cursor_cext.CMySQLCursor): Cursor para executar comandos SQL.
+        backend (BackendMySQL | BackendSQLite): Backend com a conexão e o SQL específicos do banco.
+        pool (PoolDeConexoes): Pool de conexões com o banco de dados (primário).
+        replicas (list): Pools de conexões com as réplicas de leitura.
+        resumo (ResumoDespacho): Contadores do despacho, ou None se `manter_resumo` for False.
+        escritas (EscritaAdiada): Fila de escritas adiadas, ou None se a escrita adiada não estiver ativa.
+        ao_perder_conexao (callable): Função chamada com a exceção quando uma operação falha porque o
+            servidor está inacessível, na thread da operação (usada pelo modo offline).
+        instrumentacao (Instrumentacao): Estatísticas de uso, ou None se a medição estiver desativada.
     """
 
-    def __init__(self, host, user, password, database):
+    def __init__(self, host=None, user=None, password=None, database=None, tamanho_pool=5, tempo_espera_pool=10.0,
+                 capacidade_cache=1000, ttl_cache=30.0, backend=None, usar_preparados=True,
+                 instrumentar=True, limite_consulta_lenta=0.5, replicas=(), janela_leitura_propria=5.0,
+                 ttl_censo=5.0, manter_resumo=False):
         """
-        Inicializa a conexão com o banco de dados.
+        Inicializa o pool de conexões com o banco de dados.
 
         Args:
-            host (str): Endereço do servidor do banco de dados.
+            host (str): Endereço do servidor MySQL.
             user (str): Nome de usuário para autenticação no banco de dados.
             password (str): Senha para autenticação no banco de dados.
             database (str): Nome do banco de dados a ser utilizado.
+            tamanho_pool (int): Número máximo de conexões abertas simultaneamente.
+            tempo_espera_pool (float): Tempo máximo, em segundos, para aguardar uma conexão livre.
+            capacidade_cache (int): Número máximo de pacientes e de maqueiros guardados em memória.
+            ttl_cache (float): Tempo, em segundos, que um objeto guardado continua válido.
+            backend (BackendMySQL | BackendSQLite): Backend a ser usado. Se omitido, conecta ao
+                MySQL com `host`, `user`, `password` e `database`.
+            usar_preparados (bool): Se True, as buscas e atualizações mais frequentes usam comandos
+                preparados no servidor; se False, todas usam o protocolo de texto.
+            instrumentar (bool): Se True, mede os métodos e os comandos SQL executados.
+            limite_consulta_lenta (float): Duração, em segundos, a partir da qual um método ou comando
+                é registrado no log como lento (None desativa o log).
+            replicas (list): Backends das réplicas de leitura, do mesmo tipo do backend principal.
+            janela_leitura_propria (float): Tempo, em segundos, após uma escrita durante o qual as
+                leituras continuam no primário, à espera de que as réplicas recebam a alteração.
+            ttl_censo (float): Tempo, em segundos, que o resultado de `listar_pacientes` e das páginas
+                do censo continua válido (0 desativa o cache).
+            manter_resumo (bool): Se True, mantém os contadores do despacho em memória. Cada mudança
+                de status passa a ler o estado anterior da linha, para calcular o ajuste.
         """
-        self.connection = None
+        self.instrumentacao = Instrumentacao(limite_consulta_lenta) if instrumentar else None
+        self.usar_preparados = usar_preparados
+        self._preparados = weakref.WeakKeyDictionary()
+        self._lock_preparados = threading.Lock()
+        self.backend = backend or BackendMySQL(host, user, password, database)
+        self._pacientes = MapaIdentidade(capacidade_cache, chaves=('cpf',), ttl=ttl_cache)
+        self._maqueiros = MapaIdentidade(capacidade_cache, chaves=('login',), ttl=ttl_cache)
+        self._censo = CacheDeResultados(ttl_censo)
+        self.resumo = ResumoDespacho() if manter_resumo else None
+        self.escritas = None
+        self.ao_perder_conexao = None
+        self._local = threading.local()
+        if self.backend.max_conexoes is not None:
+            tamanho_pool = min(tamanho_pool, self.backend.max_conexoes)
+        self.pool = PoolDeConexoes(
+            self.backend.conectar,
+            tamanho=tamanho_pool,
+            tempo_espera=tempo_espera_pool,
+            verificar=self.backend.verificar
+        )
+        self.replicas = [
+            PoolDeConexoes(replica.conectar, tamanho=tamanho_pool, tempo_espera=tempo_espera_pool,
+                           tentativas=1, verificar=replica.verificar)
+            for replica in replicas
+        ]
+        self.janela_leitura_propria = janela_leitura_propria
+        self._proxima_replica = itertools.count()
+        self._replica_indisponivel_ate = {}
+        self._ultima_escrita = None
         try:
-            self.connection = mysql.connector.connect(
-                host=host,
-                user=user,
-                password=password,
-                database=database
-            )
-            self.cursor = self.connection.cursor()
+            self.pool.preencher(1)
             print("Conexão com o banco de dados estabelecida.")
-        except Error as e:
+        except ErroPool as e:
             print(f"Erro ao conectar ao banco de dados: {e}")
-            return None
+
+    @contextmanager
+    def _cursor(self, commit=False, transacao=False, buffered=True, preparado=False, leitura=False):
+        """
+        Retira uma conexão do pool e fornece um cursor para executar comandos SQL.
+
+        Args:
+            commit (bool): Se True, confirma a transação ao final do bloco.
+            transacao (bool): Se True, abre uma transação explícita para que todos os comandos
+                do bloco sejam confirmados juntos.
+            buffered (bool): Se False, as linhas são lidas do servidor à medida que são buscadas.
+            preparado (bool): Se True, usa comandos preparados no servidor, reaproveitados entre
+                as operações da mesma conexão (quando `usar_preparados` estiver ativo).
+            leitura (bool): Se True, o bloco apenas lê dados e pode ser executado em uma réplica.
+
+        Dentro de `transaction()`, o cursor usa a conexão da transação e a confirmação fica
+        para o final da unidade de trabalho.
+
+        Yields:
+            mysql.connector.cursor.MySQLCursor: Cursor associado à conexão retirada.
+        """
+        conexao_transacao = getattr(self._local, 'conexao', None)
+        if conexao_transacao is not None:
+            cursor = self._novo_cursor(conexao_transacao, True, preparado)
+            try:
+                yield cursor
+            except BaseException:
+                self._local.falhou = True
+                raise
+            finally:
+                cursor.close()
+            return
+
+        try:
+            pool, conexao = self._obter_conexao(leitura and not commit and not transacao)
+        except ErroConexao as e:
+            self._conexao_perdida(e)
+            raise
+        cursor = None
+        descartar = False
+
+        def trocar_para_primario(erro):
+            # A réplica caiu no meio da leitura: ela sai do rodízio e o bloco continua no primário
+            nonlocal pool, conexao, cursor
+            self._replica_falhou(pool, erro)
+            try:
+                nova = self.pool.obter_conexao()
+            except ErroConexao as e:
+                self._conexao_perdida(e)
+                raise
+            try:
+                cursor.close()
+            except Exception:
+                pass
+            pool.devolver_conexao(conexao, descartar=True)
+            pool, conexao = self.pool, nova
+            cursor = self._novo_cursor(conexao, buffered, preparado)
+            return cursor
+
+        try:
+            if transacao:
+                conexao.start_transaction()
+            cursor = self._novo_cursor(conexao, buffered, preparado)
+            if pool is self.pool:
+                yield cursor
+            else:
+                yield CursorReplica(cursor, trocar_para_primario)
+            if commit:
+                conexao.commit()
+                self._ultima_escrita = time.monotonic()
+        except BaseException as e:
+            # Só a queda do primário coloca a estação offline; a de uma réplica apenas a tira do rodízio
+            if isinstance(e, ERROS_CONEXAO):
+                if pool is self.pool:
+                    self._conexao_perdida(e)
+                else:
+                    self._replica_falhou(pool, e)
+            try:
+                conexao.rollback()
+            except Exception:
+                descartar = True
+            # Os comandos preparados podem ter ficado em estado inconsistente
+            with self._lock_preparados:
+                self._preparados.pop(conexao, None)
+            raise
+        finally:
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except Exception:
+                    descartar = True
+            pool.devolver_conexao(conexao, descartar=descartar)
+
+    def _obter_conexao(self, leitura):
+        """
+        Escolhe o pool da operação e retira uma conexão dele.
+
+        Leituras vão para as réplicas, em rodízio, exceto logo após uma escrita desta instância.
+        Uma réplica que não responde fica fora do rodízio por 30 segundos e a leitura vai ao primário.
+
+        Returns:
+            tuple: O pool escolhido e a conexão retirada.
+        """
+        if leitura and self.replicas and not self._leitura_propria():
+            agora = time.monotonic()
+            for _ in range(len(self.replicas)):
+                indice = next(self._proxima_replica) % len(self.replicas)
+                if self._replica_indisponivel_ate.get(indice, 0) > agora:
+                    continue
+                replica = self.replicas[indice]
+                try:
+                    return replica, replica.obter_conexao()
+                except ErroPool as e:
+                    self._replica_falhou(replica, e)
+        return self.pool, self.pool.obter_conexao()
+
+    def _replica_falhou(self, replica, erro):
+        indice = self.replicas.index(replica)
+        print(f"Réplica de leitura {indice} indisponível, usando o primário: {erro}")
+        self._replica_indisponivel_ate[indice] = time.monotonic() + 30.0
+
+    def _conexao_perdida(self, erro):
+        if self.ao_perder_conexao is not None:
+            self.ao_perder_conexao(erro)
+
+    def disponivel(self):
+        """
+        Verifica se o servidor (primário) aceita conexões e responde.
+
+        Returns:
+            bool: True se uma consulta simples foi executada com sucesso.
+        """
+        try:
+            with self._cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            return True
+        except ERROS_BANCO:
+            return False
+
+    def _leitura_propria(self):
+        ultima_escrita = self._ultima_escrita
+        return ultima_escrita is not None and time.monotonic() - ultima_escrita < self.janela_leitura_propria
+
+    def _novo_cursor(self, conexao, buffered, preparado):
+        if preparado and self.usar_preparados and self.backend.suporta_preparados:
+            with self._lock_preparados:
+                cache = self._preparados.setdefault(conexao, {})
+            cursor = CursorPreparado(conexao, cache)
+        else:
+            cursor = conexao.cursor(buffered=buffered)
+        if self.instrumentacao is not None:
+            cursor = CursorInstrumentado(cursor, self.instrumentacao)
+        return cursor
+
+    @contextmanager
+    def transaction(self):
+        """
+        Executa várias operações do banco de dados como uma única transação.
+
+        Todos os métodos chamados dentro do bloco, na mesma thread, usam a mesma conexão e
+        são confirmados juntos, com um único commit. Se qualquer um deles falhar, tudo é desfeito.
+        Transações aninhadas fazem parte da transação externa.
+
+        Yields:
+            Database: A própria instância.
+
+        Raises:
+            ErroTransacao: Se alguma operação do bloco falhar.
+        """
+        if getattr(self._local, 'conexao', None) is not None:
+            yield self
+            return
+
+        try:
+            conexao = self.pool.obter_conexao()
+        except ErroConexao as e:
+            self._conexao_perdida(e)
+            raise
+        self._local.conexao = conexao
+        self._local.falhou = False
+        self._local.ajustes = []
+        descartar = False
+        try:
+            conexao.start_transaction()
+            yield self
+            if self._local.falhou:
+                raise ErroTransacao("Uma das operações da transação falhou.")
+            conexao.commit()
+            self._ultima_escrita = time.monotonic()
+            # Leituras feitas antes da confirmação podem ter guardado o censo anterior
+            self._censo.invalidar()
+            if self.resumo is not None:
+                self.resumo.aplicar(self._local.ajustes)
+        except BaseException:
+            try:
+                conexao.rollback()
+            except Exception:
+                descartar = True
+            # Objetos lidos dentro da transação desfeita podem estar desatualizados
+            self.limpar_cache()
+            raise
+        finally:
+            self._local.conexao = None
+            self._local.ajustes = []
+            self.pool.devolver_conexao(conexao, descartar=descartar)
+
+    def metricas_pool(self):
+        """
+        Retorna as métricas de uso do pool de conexões.
+
+        Returns:
+            dict: Métricas de tamanho, uso e espera do pool.
+        """
+        return self.pool.metricas()
+
+    def metricas_consultas(self):
+        """
+        Retorna as estatísticas dos métodos e dos comandos SQL executados.
+
+        Returns:
+            dict: Chamadas, erros, linhas lidas e histograma de latência por método e por comando,
+                além das últimas execuções lentas (vazio se a medição estiver desativada).
+        """
+        if self.instrumentacao is None:
+            return {}
+        return self.instrumentacao.relatorio()
+
+    def exportar_metricas(self, caminho):
+        """
+        Grava as estatísticas dos métodos, dos comandos SQL e do pool em um arquivo JSON.
+
+        Args:
+            caminho (str): Caminho do arquivo.
+        """
+        relatorio = self.metricas_consultas()
+        relatorio["pool"] = self.metricas_pool()
+        relatorio["replicas"] = [replica.metricas() for replica in self.replicas]
+        relatorio["censo"] = self.metricas_censo()
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2, default=str)
+
+    def metricas_censo(self):
+        """
+        Retorna os acertos e falhas do cache do censo de pacientes.
+
+        Returns:
+            dict: Acertos, falhas, invalidações e número de resultados guardados.
+        """
+        return self._censo.metricas()
+
+    def limpar_cache(self):
+        """
+        Descarta todos os pacientes e maqueiros guardados em memória e o censo de pacientes.
+        """
+        self._pacientes.limpar()
+        self._maqueiros.limpar()
+        self._censo.invalidar()
+
+    def _paciente_alterado(self, paciente_id=None):
+        """
+        Descarta o paciente alterado (ou todos, sem ID) do mapa de identidade e o censo guardado.
+        """
+        if paciente_id is None:
+            self._pacientes.limpar()
+        else:
+            self._pacientes.invalidar(paciente_id)
+        self._censo.invalidar()
+
+    def _ajustar_resumo(self, ajustes):
+        """
+        Aplica ajustes aos contadores do despacho. Dentro de `transaction()`, os ajustes só são
+        aplicados quando a transação for confirmada.
+
+        Args:
+            ajustes (list): Tuplas (tipo, chave, delta), como em ResumoDespacho.aplicar.
+        """
+        if self.resumo is None or not ajustes:
+            return
+        if getattr(self._local, 'conexao', None) is not None:
+            self._local.ajustes.extend(ajustes)
+        else:
+            self.resumo.aplicar(ajustes)
+
+    def recarregar_resumo(self):
+        """
+        Recalcula os contadores do despacho a partir do banco de dados, incluindo as escritas de
+        outras estações. Deve ser chamado periodicamente quando `manter_resumo` estiver ativo.
+        """
+        if self.resumo is not None:
+            self._carregar_resumo(self.resumo)
+
+    def _carregar_resumo(self, resumo):
+        with self._cursor() as cursor:
+            cursor.execute("SELECT p.urgencia, COUNT(*) FROM SolicitacoesTransporte s "
+                           "LEFT JOIN Pacientes p ON p.id = s.paciente_id "
+                           f"WHERE s.status = {StatusSolicitacao.PENDENTE:d} GROUP BY p.urgencia")
+            solicitacoes = {Urgencia.rotulo_de(urgencia): total for urgencia, total in cursor.fetchall()}
+            cursor.execute("SELECT COUNT(*) FROM Pacientes "
+                           f"WHERE condicao = 'Em transporte' AND transporte <> {Transporte.CHEGOU:d}")
+            em_transporte = cursor.fetchone()[0]
+            cursor.execute(f"SELECT maqueiro_id, COUNT(*) FROM Tarefas WHERE status = {StatusTarefa.PENDENTE:d} GROUP BY maqueiro_id")
+            tarefas = dict(cursor.fetchall())
+        resumo.carregar(solicitacoes, em_transporte, tarefas)
+        return resumo
+
+    def resumo_despacho(self):
+        """
+        Retorna os contadores do despacho: solicitações pendentes por urgência do paciente, pacientes
+        em transporte e tarefas abertas por maqueiro.
+
+        Com `manter_resumo`, os valores vêm da memória, sem acessar o banco (exceto na primeira
+        chamada); sem ele, são calculados a cada chamada.
+
+        Returns:
+            dict: Contadores do despacho.
+        """
+        if self.resumo is None:
+            return self._carregar_resumo(ResumoDespacho()).como_dict()
+        if not self.resumo.carregado:
+            self._carregar_resumo(self.resumo)
+        return self.resumo.como_dict()
+
+    def ativar_escrita_adiada(self, caminho_diario=None, tamanho_lote=50, intervalo=2.0, caminho_rejeitadas=None):
+        """
+        Passa a gravar os incidentes em lotes, em segundo plano, em vez de um commit por incidente.
+
+        As escritas pendentes de uma execução anterior, guardadas no diário, são gravadas no primeiro ciclo.
+        `fechar` grava o que restar na fila.
+
+        Args:
+            caminho_diario (str): Caminho do diário local das escritas ainda não gravadas, ou None.
+            tamanho_lote (int): Número de escritas na fila que dispara uma gravação imediata.
+            intervalo (float): Tempo máximo, em segundos, entre duas gravações.
+            caminho_rejeitadas (str): Caminho do arquivo das escritas recusadas pelo banco de dados
+                (padrão: `<diário>.rejeitadas`).
+
+        Returns:
+            EscritaAdiada: A fila de escritas adiadas.
+        """
+        if self.escritas is None:
+            self.escritas = EscritaAdiada(self._gravar_adiadas, caminho_diario, tamanho_lote, intervalo, caminho_rejeitadas)
+            self.escritas.iniciar()
+        return self.escritas
+
+    def _gravar_adiadas(self, escritas, tamanho_lote=500):
+        """
+        Grava as escritas adiadas em uma transação, isolando as linhas recusadas pelo banco de dados.
+
+        Erros de conexão e do pool interrompem a gravação, para que o lote inteiro seja tentado de novo.
+
+        Returns:
+            list: Pares (índice, mensagem) das escritas recusadas.
+        """
+        # Agrupa as escritas pelo SQL, mantendo a ordem, para enviá-las como INSERTs de várias linhas
+        grupos = {}
+        for indice, (sql, valores) in enumerate(escritas):
+            grupos.setdefault(sql, []).append((indice, valores))
+        resultado = ResultadoLote(len(escritas))
+        with self._cursor(commit=True, transacao=True) as cursor:
+            for sql, linhas in grupos.items():
+                self._inserir_lote(cursor, sql, linhas, tamanho_lote, resultado)
+        return resultado.falhas
+
+    def _descarregar_adiadas(self):
+        # Os relatórios incluem o que a própria estação acabou de registrar
+        if self.escritas is not None and self.escritas.pendentes:
+            self.escritas.descarregar()
+
+    def fechar(self):
+        """
+        Grava as escritas adiadas pendentes e fecha as conexões livres do pool e das réplicas.
+        """
+        if self.escritas is not None:
+            self.escritas.encerrar(timeout=5)
+            self.escritas = None
+        self.pool.fechar()
+        for replica in self.replicas:
+            replica.fechar()
+
+    def copiar_para(self, destino, tamanho_lote=1000):
+        """
+        Substitui o conteúdo das tabelas ativas de outro banco de dados por uma cópia das deste.
+
+        A leitura é feita em uma única transação, para que a cópia seja consistente; a escrita no
+        destino também, de modo que ele nunca fica com uma cópia pela metade.
+
+        Args:
+            destino (Database): Banco de dados que recebe a cópia (o instantâneo local do modo offline).
+            tamanho_lote (int): Número máximo de linhas por comando INSERT.
+
+        Returns:
+            int: Número de linhas copiadas.
+        """
+        dados = []
+        # commit=True apenas encerra a transação de leitura antes de a conexão voltar ao pool
+        with self._cursor(commit=True, transacao=True) as cursor:
+            for tabela, colunas in TABELAS_INSTANTANEO:
+                cursor.execute(f"SELECT {colunas} FROM {tabela}")
+                dados.append((tabela, colunas, cursor.fetchall()))
+        with destino._cursor(commit=True, transacao=True) as cursor:
+            for tabela, _ in reversed(TABELAS_INSTANTANEO):
+                cursor.execute(f"DELETE FROM {tabela}")
+            for tabela, colunas, linhas in dados:
+                marcadores = ", ".join(["%s"] * len(colunas.split(",")))
+                for inicio in range(0, len(linhas), tamanho_lote):
+                    cursor.executemany(f"INSERT INTO {tabela} ({colunas}) VALUES ({marcadores})",
+                                       linhas[inicio:inicio + tamanho_lote])
+        destino.limpar_cache()
+        return sum(len(linhas) for _, _, linhas in dados)
+
+    def valores_atuais(self, tabela, colunas, id):
+        """
+        Lê algumas colunas de uma linha, pelo ID.
+
+        Args:
+            tabela (str): Nome da tabela.
+            colunas (str): Colunas separadas por vírgula.
+            id (int): ID da linha.
+
+        Returns:
+            tuple: Valores das colunas, ou None se a linha não existir.
+        """
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT {colunas} FROM {tabela} WHERE id = %s", (id,))
+            return cursor.fetchone()
 
     def create_tables(self):
         """
-        Cria as tabelas do sistema no banco de dados, se ainda não existirem.
-        """
-        self.cursor.execute("""
-        CREATE TABLE IF NOT EXISTS Pacientes (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            nome VARCHAR(100),
-            cpf VARCHAR(11) UNIQUE,
-            localizacao VARCHAR(100),
-            condicao VARCHAR(100),
-            urgencia ENUM('Emergência', 'Alta', 'Média', 'Baixa'),
-            transporte ENUM('Aguardando transporte', 'Em transporte', 'Chegou ao destino') DEFAULT 'Aguardando transporte',
-            inicio_transporte DATETIME
-        )""")
-
-        self.cursor.execute("""
-        CREATE TABLE IF NOT EXISTS Maqueiros (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            nome VARCHAR(100),
-            coren VARCHAR(12) UNIQUE,
-            data_nascimento DATE,
-            sexo ENUM('M', 'F'),
-            login VARCHAR(50) UNIQUE,
-            senha VARCHAR(100)
-        )""")
-
-        self.cursor.execute("""
-        CREATE TABLE IF NOT EXISTS Tarefas (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            descricao VARCHAR(255),
-            prioridade VARCHAR(50),
-            status VARCHAR(50),
-            paciente_id INT,
-            localizacao VARCHAR(100),
-            maqueiro_id INT,
-            FOREIGN KEY (paciente_id) REFERENCES Pacientes(id),
-            FOREIGN KEY (maqueiro_id) REFERENCES Maqueiros(id)
-        )""")
-
-        self.cursor.execute("""
-        CREATE TABLE IF NOT EXISTS Incidentes (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            descricao VARCHAR(255),
-            maqueiro_id INT,
-            paciente_id INT,
-            data_hora DATETIME,
-            FOREIGN KEY (maqueiro_id) REFERENCES Maqueiros(id),
-            FOREIGN KEY (paciente_id) REFERENCES Pacientes(id)
-        )""")
-
-        self.cursor.execute("""
-        CREATE TABLE IF NOT EXISTS SolicitacoesTransporte (
-            id INT PRIMARY KEY AUTO_INCREMENT,
-            descricao VARCHAR(255),
-            paciente_id INT,
-            status VARCHAR(50),
-            maqueiro_id INT,
-            data_hora DATETIME,
-            FOREIGN KEY (paciente_id) REFERENCES Pacientes(id),
-            FOREIGN KEY (maqueiro_id) REFERENCES Maqueiros(id)
-        )""")
-
-        self.connection.commit()
+        Cria ou atualiza as tabelas do sistema aplicando as migrações pendentes (ver migracoes.py).
+
+        Quando o esquema já está na versão atual, basta uma consulta à tabela SchemaVersion e
+        nenhum comando DDL é enviado.
+
+        Returns:
+            int: Versão do esquema.
+        """
+        with self._cursor() as cursor:
+            versao = versao_do_esquema(cursor)
+        if versao >= VERSAO_ATUAL:
+            return versao
+        with self._cursor(commit=True) as cursor:
+            return aplicar_migracoes(self.backend, cursor)
 
     def insert_paciente(self, paciente):
         """
@@ -112,14 +865,18 @@ class Database:
             int: ID do paciente inserido, ou None se ocorrer um erro.
         """
         try:
-            self.cursor.execute(
-                "INSERT INTO Pacientes (nome, cpf, localizacao, condicao, urgencia, transporte) VALUES (%s, %s, %s, %s, %s, %s)",
-                (paciente.nome, paciente.cpf, paciente.localizacao, paciente.condicao, paciente.urgencia, paciente.transporte)
-            )
-            self.connection.commit()
-            paciente_id = self.cursor.lastrowid
+            with self._cursor(commit=True) as cursor:
+                cursor.execute(
+                    "INSERT INTO Pacientes (nome, cpf, localizacao, condicao, urgencia, transporte) VALUES (%s, %s, %s, %s, %s, %s)",
+                    (paciente.nome, paciente.cpf, paciente.localizacao, paciente.condicao,
+                     Urgencia.codigo(paciente.urgencia), Transporte.codigo(paciente.transporte))
+                )
+                paciente_id = cursor.lastrowid
+            self._censo.invalidar()
+            if _em_transporte(paciente.condicao, paciente.transporte):
+                self._ajustar_resumo([(TRANSPORTE, None, 1)])
             return paciente_id
-        except Error as e:
+        except ERROS_BANCO as e:
             print(f"Erro ao inserir paciente no banco de dados: {e}")
             return None
 
@@ -134,12 +891,15 @@ class Database:
             int: ID da tarefa inserida, ou None se ocorrer um erro.
         """
         try:
-            self.cursor.execute("INSERT INTO Tarefas (descricao, prioridade, status, paciente_id, localizacao, maqueiro_id) VALUES (%s, %s, %s, %s, %s, %s)",
-                                (tarefa.descricao, tarefa.prioridade, tarefa.status, tarefa.paciente.id, tarefa.localizacao, tarefa.maqueiro.id if tarefa.maqueiro else None))
-            self.connection.commit()
-            tarefa_id = self.cursor.lastrowid
+            with self._cursor(commit=True) as cursor:
+                cursor.execute("INSERT INTO Tarefas (descricao, prioridade, status, paciente_id, localizacao, maqueiro_id) VALUES (%s, %s, %s, %s, %s, %s)",
+                               (tarefa.descricao, Urgencia.codigo(tarefa.prioridade), StatusTarefa.codigo(tarefa.status), tarefa.paciente.id,
+                                tarefa.localizacao, tarefa.maqueiro.id if tarefa.maqueiro else None))
+                tarefa_id = cursor.lastrowid
+            if _pendente(tarefa.status):
+                self._ajustar_resumo([(TAREFAS, tarefa.maqueiro.id if tarefa.maqueiro else None, 1)])
             return tarefa_id
-        except Error as e:
+        except ERROS_BANCO as e:
             print(f"Erro ao inserir tarefa no banco de dados: {e}")
             return None
 
@@ -147,51 +907,402 @@ class Database:
         """
         Atualiza o status de uma tarefa na tabela de Tarefas.
 
+        A mudança segue a máquina de estados de estados.py: o UPDATE só altera a tarefa se o
+        status atual permitir a transição.
+
         Args:
             tarefa_id (int): ID da tarefa a ser atualizada.
             status (str): Novo status da tarefa.
+
+        Returns:
+            bool: True se a tarefa foi atualizada.
         """
         try:
-            self.cursor.execute("UPDATE Tarefas SET status = %s WHERE id = %s", (status, tarefa_id))
-            self.connection.commit()
-        except Error as e:
+            ajustes = []
+            with self._cursor(commit=True, preparado=True) as cursor:
+                novo = StatusTarefa.de(status)
+                if self.resumo is not None:
+                    cursor.execute("SELECT status, maqueiro_id FROM Tarefas WHERE id = %s", (tarefa_id,))
+                    anterior = cursor.fetchone()
+                    if anterior and _pendente(anterior[0]) != _pendente(novo):
+                        ajustes.append((TAREFAS, anterior[1], 1 if _pendente(novo) else -1))
+                cursor.execute(f"UPDATE Tarefas SET status = %s WHERE id = %s AND status IN ({origens(novo)})", (int(novo), tarefa_id))
+                atualizada = cursor.rowcount == 1
+            if not atualizada:
+                print(f"Tarefa {tarefa_id} não encontrada ou não pode passar para '{novo.rotulo}'.")
+                return False
+            self._ajustar_resumo(ajustes)
+            return True
+        except ERROS_BANCO + (ValueError,) as e:
             print(f"Erro ao atualizar status da tarefa no banco de dados: {e}")
+            return False
 
     def insert_incidente(self, incidente):
         """
         Insere um novo incidente na tabela de Incidentes.
 
+        Com a escrita adiada ativa, o incidente é registrado no diário e gravado no próximo lote.
+
         Args:
             incidente (Incidente): Objeto incidente a ser inserido no banco de dados.
         """
+        sql = "INSERT INTO Incidentes (descricao, maqueiro_id, paciente_id, data_hora) VALUES (%s, %s, %s, %s)"
+        valores = (incidente.descricao, incidente.maqueiro.id, incidente.paciente.id, incidente.data_hora)
+        if self.escritas is not None:
+            self.escritas.adicionar(sql, valores)
+            return
         try:
-            self.cursor.execute("INSERT INTO Incidentes (descricao, maqueiro_id, paciente_id, data_hora) VALUES (%s, %s, %s, %s)",
-                                (incidente.descricao, incidente.maqueiro.id, incidente.paciente.id, incidente.data_hora))
-            self.connection.commit()
-        except Error as e:
+            with self._cursor(commit=True) as cursor:
+                cursor.execute(sql, valores)
+        except ERROS_BANCO as e:
             print(f"Erro ao inserir incidente no banco de dados: {e}")
 
-    def listar_incidentes(self):
+    def listar_incidentes(self, incluir_arquivo=False, preguicoso=False, colunas=None):
         """
         Lista todos os incidentes no banco de dados, ordenados do mais recente para o mais antigo.
 
+        O maqueiro e o paciente de cada incidente são carregados na mesma consulta, por JOIN, ou,
+        com `preguicoso`, em lote no primeiro acesso.
+
+        Args:
+            incluir_arquivo (bool): Se True, inclui os incidentes movidos para o arquivo.
+            preguicoso (bool): Se True, lê só as chaves estrangeiras e carrega as relações no primeiro acesso.
+            colunas (dict): Colunas a ler de cada relação, por exemplo {'paciente': ('nome',)}
+                (padrão: todas, exceto a senha do maqueiro).
+
         Returns:
             list: Lista de objetos Incidente.
         """
+        plano = _PlanoRelacoes(self, "i", ("maqueiro", "paciente"), preguicoso, colunas)
+        select = self._select_incidentes(ORIGEM_INCIDENTES_COM_ARQUIVO if incluir_arquivo else "Incidentes", plano)
+        self._descarregar_adiadas()
         try:
-            self.cursor.execute("SELECT id, descricao, maqueiro_id, paciente_id, data_hora FROM Incidentes ORDER BY data_hora DESC")
-            result = self.cursor.fetchall()
-            incidentes = []
-            for row in result:
-                maqueiro = self.buscar_maqueiro_por_id(row[2])
-                paciente = self.buscar_paciente_por_id(row[3])
-                incidente = Incidente(row[0], row[1], maqueiro, paciente, row[4])
-                incidentes.append(incidente)
-            return incidentes
-        except Error as e:
+            with self._cursor(leitura=True) as cursor:
+                cursor.execute(f"{select} ORDER BY i.data_hora DESC")
+                result = cursor.fetchall()
+            return [self._incidente_de_linha(row, plano) for row in result]
+        except ERROS_BANCO as e:
             print(f"Erro ao listar incidentes no banco de dados: {e}")
             return []
 
+    def insert_pacientes_bulk(self, pacientes, tamanho_lote=500):
+        """
+        Insere vários pacientes em uma única transação, com INSERTs de várias linhas.
+
+        Linhas com CPF repetido no lote ou já cadastrado são recusadas sem interromper as demais.
+
+        Args:
+            pacientes (iterable): Objetos Paciente a serem inseridos.
+            tamanho_lote (int): Número máximo de linhas por comando INSERT.
+
+        Returns:
+            ResultadoLote: IDs gerados, na ordem da entrada, e as falhas por linha.
+        """
+        pacientes = list(pacientes)
+        resultado = ResultadoLote(len(pacientes))
+        candidatos = []
+        vistos = set()
+        for indice, paciente in enumerate(pacientes):
+            if paciente.cpf in vistos:
+                resultado.falhas.append((indice, "CPF duplicado no lote."))
+                continue
+            vistos.add(paciente.cpf)
+            candidatos.append((indice, paciente))
+        try:
+            with self._cursor(commit=True, transacao=True) as cursor:
+                existentes = self._cpfs_cadastrados(cursor, [paciente.cpf for _, paciente in candidatos], tamanho_lote)
+                linhas = []
+                for indice, paciente in candidatos:
+                    if paciente.cpf in existentes:
+                        resultado.falhas.append((indice, "CPF já cadastrado."))
+                        continue
+                    linhas.append((indice, (paciente.nome, paciente.cpf, paciente.localizacao, paciente.condicao,
+                                            Urgencia.codigo(paciente.urgencia), Transporte.codigo(paciente.transporte))))
+                self._inserir_lote(
+                    cursor,
+                    "INSERT INTO Pacientes (nome, cpf, localizacao, condicao, urgencia, transporte) VALUES (%s, %s, %s, %s, %s, %s)",
+                    linhas, tamanho_lote, resultado
+                )
+            self._censo.invalidar()
+            self._ajustar_resumo([(TRANSPORTE, None, 1) for indice, paciente in enumerate(pacientes)
+                                  if resultado.ids[indice] is not None and _em_transporte(paciente.condicao, paciente.transporte)])
+        except ERROS_BANCO as e:
+            print(f"Erro ao inserir pacientes em lote no banco de dados: {e}")
+            resultado.falhar_todos(str(e))
+        resultado.falhas.sort()
+        return resultado
+
+    def insert_tarefas_bulk(self, tarefas, tamanho_lote=500):
+        """
+        Insere várias tarefas em uma única transação, com INSERTs de várias linhas.
+
+        Args:
+            tarefas (iterable): Objetos Tarefa a serem inseridos.
+            tamanho_lote (int): Número máximo de linhas por comando INSERT.
+
+        Returns:
+            ResultadoLote: IDs gerados, na ordem da entrada, e as falhas por linha.
+        """
+        tarefas = list(tarefas)
+        resultado = ResultadoLote(len(tarefas))
+        linhas = []
+        for indice, tarefa in enumerate(tarefas):
+            if tarefa.paciente is None or tarefa.paciente.id is None:
+                resultado.falhas.append((indice, "Tarefa sem paciente cadastrado."))
+                continue
+            linhas.append((indice, (tarefa.descricao, Urgencia.codigo(tarefa.prioridade), StatusTarefa.codigo(tarefa.status), tarefa.paciente.id,
+                                    tarefa.localizacao, tarefa.maqueiro.id if tarefa.maqueiro else None)))
+        try:
+            with self._cursor(commit=True, transacao=True) as cursor:
+                self._inserir_lote(
+                    cursor,
+                    "INSERT INTO Tarefas (descricao, prioridade, status, paciente_id, localizacao, maqueiro_id) VALUES (%s, %s, %s, %s, %s, %s)",
+                    linhas, tamanho_lote, resultado
+                )
+            self._ajustar_resumo([(TAREFAS, tarefa.maqueiro.id if tarefa.maqueiro else None, 1)
+                                  for indice, tarefa in enumerate(tarefas)
+                                  if resultado.ids[indice] is not None and _pendente(tarefa.status)])
+        except ERROS_BANCO as e:
+            print(f"Erro ao inserir tarefas em lote no banco de dados: {e}")
+            resultado.falhar_todos(str(e))
+        resultado.falhas.sort()
+        return resultado
+
+    def insert_incidentes_bulk(self, incidentes, tamanho_lote=500):
+        """
+        Insere vários incidentes em uma única transação, com INSERTs de várias linhas.
+
+        Args:
+            incidentes (iterable): Objetos Incidente a serem inseridos.
+            tamanho_lote (int): Número máximo de linhas por comando INSERT.
+
+        Returns:
+            ResultadoLote: IDs gerados, na ordem da entrada, e as falhas por linha.
+        """
+        incidentes = list(incidentes)
+        resultado = ResultadoLote(len(incidentes))
+        linhas = []
+        for indice, incidente in enumerate(incidentes):
+            if incidente.paciente is None or incidente.paciente.id is None or incidente.maqueiro is None:
+                resultado.falhas.append((indice, "Incidente sem paciente ou maqueiro cadastrado."))
+                continue
+            linhas.append((indice, (incidente.descricao, incidente.maqueiro.id, incidente.paciente.id, incidente.data_hora)))
+        try:
+            with self._cursor(commit=True, transacao=True) as cursor:
+                self._inserir_lote(
+                    cursor,
+                    "INSERT INTO Incidentes (descricao, maqueiro_id, paciente_id, data_hora) VALUES (%s, %s, %s, %s)",
+                    linhas, tamanho_lote, resultado
+                )
+        except ERROS_BANCO as e:
+            print(f"Erro ao inserir incidentes em lote no banco de dados: {e}")
+            resultado.falhar_todos(str(e))
+        resultado.falhas.sort()
+        return resultado
+
+    def _cpfs_cadastrados(self, cursor, cpfs, tamanho_lote):
+        """
+        Retorna, dentre os CPFs informados, os que já estão cadastrados.
+        """
+        cadastrados = set()
+        for inicio in range(0, len(cpfs), tamanho_lote):
+            lote = cpfs[inicio:inicio + tamanho_lote]
+            marcadores = ", ".join(["%s"] * len(lote))
+            cursor.execute(f"SELECT cpf FROM Pacientes WHERE cpf IN ({marcadores})", tuple(lote))
+            cadastrados.update(row[0] for row in cursor.fetchall())
+        return cadastrados
+
+    def _inserir_lote(self, cursor, sql, linhas, tamanho_lote, resultado):
+        """
+        Insere as linhas em blocos de `tamanho_lote`, registrando os IDs em `resultado`.
+
+        Cada bloco é enviado como um único INSERT de várias linhas. Se o bloco falhar, ele é
+        desfeito até o savepoint e as linhas são reenviadas uma a uma, cada uma com seu savepoint,
+        para isolar as que falharam. Erros de conexão não são isolados: interrompem a inserção.
+
+        Args:
+            cursor: Cursor da transação em andamento.
+            sql (str): Comando INSERT de uma linha.
+            linhas (list): Pares (índice na entrada, valores da linha).
+            tamanho_lote (int): Número máximo de linhas por bloco.
+            resultado (ResultadoLote): Resultado a ser preenchido.
+        """
+        for inicio in range(0, len(linhas), tamanho_lote):
+            lote = linhas[inicio:inicio + tamanho_lote]
+            cursor.execute("SAVEPOINT lote")
+            try:
+                cursor.executemany(sql, [valores for _, valores in lote])
+                # Um INSERT de várias linhas recebe IDs consecutivos a partir do primeiro
+                primeiro_id = cursor.lastrowid
+                for deslocamento, (indice, _) in enumerate(lote):
+                    resultado.ids[indice] = primeiro_id + deslocamento
+            except ERROS_CONEXAO:
+                raise
+            except ERROS_SQL:
+                cursor.execute("ROLLBACK TO SAVEPOINT lote")
+                for indice, valores in lote:
+                    cursor.execute("SAVEPOINT linha")
+                    try:
+                        cursor.execute(sql, valores)
+                        resultado.ids[indice] = cursor.lastrowid
+                    except ERROS_CONEXAO:
+                        raise
+                    except ERROS_SQL as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT linha")
+                        resultado.falhas.append((indice, str(e)))
+                    cursor.execute("RELEASE SAVEPOINT linha")
+            cursor.execute("RELEASE SAVEPOINT lote")
+
+    def listar_incidentes_pagina(self, limite=100, apos=None, incluir_arquivo=False, preguicoso=False, colunas=None):
+        """
+        Lista uma página de incidentes, do mais recente para o mais antigo, usando paginação por chave.
+
+        Com o arquivo incluído, cada tabela contribui com no máximo `limite` linhas, buscadas pelo seu
+        próprio índice de data_hora, e só essas linhas são ordenadas juntas.
+
+        Args:
+            limite (int): Número máximo de incidentes na página.
+            apos (tuple): Chave (data_hora, ID) retornada pela página anterior, ou None para a
+                primeira página. Com data_hora None, a página continua entre os incidentes sem data.
+            incluir_arquivo (bool): Se True, inclui os incidentes movidos para o arquivo.
+            preguicoso (bool): Se True, lê só as chaves estrangeiras e carrega as relações no primeiro acesso.
+            colunas (dict): Colunas a ler de cada relação (padrão: todas, exceto a senha do maqueiro).
+
+        Returns:
+            tuple: Lista de objetos Incidente e a chave da próxima página (None se for a última).
+        """
+        plano = _PlanoRelacoes(self, "i", ("maqueiro", "paciente"), preguicoso, colunas)
+        self._descarregar_adiadas()
+        # Na ordem decrescente, os incidentes sem data_hora vêm por último; um nulo não se compara
+        # com `<`, por isso eles são paginados em uma consulta própria, pelo ID
+        if apos is None:
+            condicoes = [("", ())]
+        elif apos[0] is None:
+            condicoes = [("{0}data_hora IS NULL AND {0}id < %s", (apos[1],))]
+        else:
+            condicoes = [("({0}data_hora, {0}id) < (%s, %s)", tuple(apos)), ("{0}data_hora IS NULL", ())]
+        result = []
+        try:
+            with self._cursor(leitura=True) as cursor:
+                for condicao, valores in condicoes:
+                    restantes = limite - len(result)
+                    if incluir_arquivo:
+                        filtro = f" WHERE {condicao.format('')}" if condicao else ""
+                        ramos = " UNION ALL ".join(
+                            f"SELECT * FROM (SELECT {COLUNAS_INCIDENTE} FROM {tabela}{filtro} "
+                            f"ORDER BY data_hora DESC, id DESC LIMIT %s) {apelido}"
+                            for tabela, apelido in (("Incidentes", "ativos"), ("IncidentesArquivo", "arquivados"))
+                        )
+                        sql = self._select_incidentes(f"({ramos})", plano)
+                        valores = (valores + (restantes,)) * 2
+                    else:
+                        sql = self._select_incidentes("Incidentes", plano)
+                        if condicao:
+                            sql += f" WHERE {condicao.format('i.')}"
+                    cursor.execute(sql + " ORDER BY i.data_hora DESC, i.id DESC LIMIT %s", valores + (restantes,))
+                    result += cursor.fetchall()
+                    if len(result) == limite:
+                        break
+        except ERROS_BANCO as e:
+            print(f"Erro ao listar incidentes no banco de dados: {e}")
+            return [], None
+        proxima = (result[-1][2], result[-1][0]) if len(result) == limite else None
+        return [self._incidente_de_linha(row, plano) for row in result], proxima
+
+    def iterar_incidentes(self, tamanho_lote=500, incluir_arquivo=False):
+        """
+        Percorre todos os incidentes, do mais recente para o mais antigo, sem carregá-los todos na memória.
+
+        Args:
+            tamanho_lote (int): Número de linhas buscadas por vez.
+            incluir_arquivo (bool): Se True, inclui os incidentes movidos para o arquivo.
+
+        Yields:
+            Incidente: Cada incidente, do mais recente para o mais antigo.
+        """
+        plano = _PlanoRelacoes(self, "i", ("maqueiro", "paciente"))
+        select = self._select_incidentes(ORIGEM_INCIDENTES_COM_ARQUIVO if incluir_arquivo else "Incidentes", plano)
+        self._descarregar_adiadas()
+        with self._cursor(buffered=False, leitura=True) as cursor:
+            cursor.execute(f"{select} ORDER BY i.data_hora DESC, i.id DESC")
+            while True:
+                linhas = cursor.fetchmany(tamanho_lote)
+                if not linhas:
+                    break
+                for row in linhas:
+                    yield Incidente.de_linha(row, _maqueiro_de_linha(row[3:9]), _paciente_de_linha(row[9:15]))
+
+    @staticmethod
+    def _select_incidentes(origem, plano):
+        return _SELECT_INCIDENTES_DE.format(colunas=plano.colunas, origem=origem, juncoes=plano.juncoes)
+
+    def _incidente_de_linha(self, row, plano):
+        relacoes = plano.montar(row, 3)
+        return Incidente.de_linha(row, relacoes["maqueiro"], relacoes["paciente"])
+
+    def _mapa_relacao(self, nome):
+        return self._pacientes if nome == "paciente" else self._maqueiros
+
+    def _objeto_relacao(self, nome, campos, valores):
+        """
+        Monta o paciente ou maqueiro de uma relação a partir das colunas lidas.
+
+        Com todas as colunas, o objeto é guardado no mapa de identidade. Com apenas algumas, vale o
+        objeto completo já guardado, se houver; senão, o objeto montado tem só as colunas lidas (as
+        demais ficam None) e não é guardado, para que as buscas não o confundam com um completo.
+        """
+        if valores[0] is None:
+            return None
+        construtor = RELACOES[nome][3]
+        mapa = self._mapa_relacao(nome)
+        if campos == RELACOES[nome][2]:
+            return mapa.guardar(construtor(valores))
+        completo = mapa.obter(valores[0])
+        if completo is not None:
+            return completo
+        lidos = dict(zip(campos, valores))
+        return construtor(tuple(lidos.get(campo) for campo in RELACOES[nome][2]))
+
+    def _buscar_relacao(self, nome, campos, ids):
+        """
+        Carrega de uma vez os pacientes ou maqueiros referenciados por uma listagem preguiçosa.
+
+        Os objetos já guardados no mapa de identidade não voltam ao banco; os demais são lidos
+        com `WHERE id IN (...)`, em blocos de TAMANHO_LOTE_RELACOES.
+
+        Args:
+            nome (str): Relação ('paciente' ou 'maqueiro').
+            campos (tuple): Colunas a ler, começando pelo id.
+            ids (list): IDs a carregar.
+
+        Returns:
+            dict: Objetos encontrados, por ID.
+
+        Raises:
+            Erros de ERROS_BANCO, para que as referências continuem pendentes e sejam carregadas
+            no próximo acesso, em vez de ficarem vazias.
+        """
+        mapa = self._mapa_relacao(nome)
+        encontrados = {}
+        faltantes = []
+        for id in ids:
+            objeto = mapa.obter(id)
+            if objeto is not None:
+                encontrados[id] = objeto
+            else:
+                faltantes.append(id)
+        if not faltantes:
+            return encontrados
+        tabela = RELACOES[nome][0]
+        with self._cursor(leitura=True) as cursor:
+            for inicio in range(0, len(faltantes), TAMANHO_LOTE_RELACOES):
+                lote = faltantes[inicio:inicio + TAMANHO_LOTE_RELACOES]
+                marcadores = ", ".join(["%s"] * len(lote))
+                cursor.execute(f"SELECT {', '.join(campos)} FROM {tabela} WHERE id IN ({marcadores})", tuple(lote))
+                for linha in cursor.fetchall():
+                    encontrados[linha[0]] = self._objeto_relacao(nome, campos, linha)
+        return encontrados
+
     def insert_solicitacao_transporte(self, solicitacao):
         """
         Insere uma nova solicitação de transporte na tabela de SolicitacoesTransporte.
@@ -203,12 +1314,19 @@ class Database:
             int: ID da solicitação inserida, ou None se ocorrer um erro.
         """
         try:
-            self.cursor.execute("INSERT INTO SolicitacoesTransporte (descricao, paciente_id, status, maqueiro_id, data_hora) VALUES (%s, %s, %s, %s, %s)",
-                                (solicitacao.descricao, solicitacao.paciente.id, solicitacao.status, solicitacao.maqueiro.id if solicitacao.maqueiro else None, solicitacao.data_hora))
-            self.connection.commit()
-            solicitacao_id = self.cursor.lastrowid
+            ajustes = []
+            with self._cursor(commit=True) as cursor:
+                cursor.execute("INSERT INTO SolicitacoesTransporte (descricao, paciente_id, status, maqueiro_id, data_hora) VALUES (%s, %s, %s, %s, %s)",
+                               (solicitacao.descricao, solicitacao.paciente.id, StatusSolicitacao.codigo(solicitacao.status),
+                                solicitacao.maqueiro.id if solicitacao.maqueiro else None, solicitacao.data_hora))
+                solicitacao_id = cursor.lastrowid
+                if self.resumo is not None and _pendente(solicitacao.status):
+                    cursor.execute("SELECT urgencia FROM Pacientes WHERE id = %s", (solicitacao.paciente.id,))
+                    linha = cursor.fetchone()
+                    ajustes.append((SOLICITACOES, Urgencia.rotulo_de(linha[0]) if linha else None, 1))
+            self._ajustar_resumo(ajustes)
             return solicitacao_id
-        except Error as e:
+        except ERROS_BANCO as e:
             print(f"Erro ao inserir solicitação de transporte no banco de dados: {e}")
             return None
 
@@ -222,12 +1340,14 @@ class Database:
         Returns:
             Paciente: Objeto paciente encontrado, ou None se não encontrado.
         """
-        self.cursor.execute("SELECT id, nome, cpf, localizacao, condicao, transporte FROM Pacientes WHERE cpf = %s", (cpf,))
-        result = self.cursor.fetchone()
-        if result:
-            paciente = Paciente(result[1], result[2], result[3], result[4], result[5])
-            paciente.definir_id(result[0])
+        paciente = self._pacientes.obter_por('cpf', cpf)
+        if paciente is not None:
             return paciente
+        with self._cursor(preparado=True, leitura=True) as cursor:
+            cursor.execute("SELECT id, nome, cpf, localizacao, condicao, transporte FROM Pacientes WHERE cpf = %s", (cpf,))
+            result = cursor.fetchone()
+        if result:
+            return self._pacientes.guardar(_paciente_de_linha(result))
         return None
 
     def buscar_maqueiro_por_login(self, login):
@@ -240,30 +1360,61 @@ class Database:
         Returns:
             Maqueiro: Objeto maqueiro encontrado, ou None se não encontrado.
         """
-        self.cursor.execute("SELECT id, nome, coren, data_nascimento, sexo, login, senha FROM Maqueiros WHERE login = %s", (login,))
-        result = self.cursor.fetchone()
-        if result:
-            maqueiro = Maqueiro(result[0], result[1], result[2], result[3], result[4])
-            maqueiro.login = result[5]
-            maqueiro.senha = result[6]
+        maqueiro = self._maqueiros.obter_por('login', login)
+        if maqueiro is not None:
             return maqueiro
+        with self._cursor(preparado=True, leitura=True) as cursor:
+            cursor.execute("SELECT id, nome, coren, data_nascimento, sexo, login FROM Maqueiros WHERE login = %s", (login,))
+            result = cursor.fetchone()
+        if result:
+            return self._maqueiros.guardar(_maqueiro_de_linha(result))
         return None
 
-    def listar_tarefas_pendentes(self):
+    def autenticar(self, login, senha):
+        """
+        Verifica o login e a senha de um maqueiro.
+
+        É a única consulta que lê a coluna senha: os maqueiros das buscas e das listagens são
+        carregados sem ela.
+
+        Args:
+            login (str): Login informado.
+            senha (str): Senha informada.
+
+        Returns:
+            Maqueiro: Maqueiro autenticado, ou None se o login não existir ou a senha não conferir.
+        """
+        with self._cursor(preparado=True, leitura=True) as cursor:
+            cursor.execute("SELECT senha FROM Maqueiros WHERE login = %s", (login,))
+            result = cursor.fetchone()
+        if not result or result[0] != senha:
+            return None
+        return self.buscar_maqueiro_por_login(login)
+
+    def listar_tarefas_pendentes(self, preguicoso=False, colunas=None):
         """
         Lista todas as tarefas pendentes no banco de dados.
 
+        O paciente e o maqueiro de cada tarefa são carregados na mesma consulta, por JOIN, ou,
+        com `preguicoso`, em lote no primeiro acesso.
+
+        Args:
+            preguicoso (bool): Se True, lê só as chaves estrangeiras e carrega as relações no primeiro acesso.
+            colunas (dict): Colunas a ler de cada relação, por exemplo {'paciente': ('nome',)}
+                (padrão: todas, exceto a senha do maqueiro).
+
         Returns:
             list: Lista de objetos Tarefa com o status pendente.
         """
-        self.cursor.execute("SELECT id, descricao, prioridade, paciente_id, localizacao, maqueiro_id FROM Tarefas WHERE status = 'pendente'")
-        result = self.cursor.fetchall()
+        plano = _PlanoRelacoes(self, "t", ("paciente", "maqueiro"), preguicoso, colunas)
+        with self._cursor(leitura=True) as cursor:
+            cursor.execute(f"SELECT t.id, t.descricao, t.prioridade, t.localizacao, {plano.colunas} FROM Tarefas t{plano.juncoes} "
+                           f"WHERE t.status = {StatusTarefa.PENDENTE:d}")
+            result = cursor.fetchall()
         tarefas = []
         for row in result:
-            paciente = self.buscar_paciente_por_id(row[3])
-            maqueiro = self.buscar_maqueiro_por_id(row[5]) if row[5] else None
-            tarefa = Tarefa(row[0], row[1], row[2], paciente, row[4], maqueiro)
-            tarefas.append(tarefa)
+            relacoes = plano.montar(row, 4)
+            tarefas.append(Tarefa.de_linha(row, relacoes["paciente"], relacoes["maqueiro"]))
         return tarefas
 
     def buscar_paciente_por_id(self, paciente_id):
@@ -276,12 +1427,14 @@ class Database:
         Returns:
             Paciente: Objeto paciente encontrado, ou None se não encontrado.
         """
-        self.cursor.execute("SELECT id, nome, cpf, localizacao, condicao, transporte FROM Pacientes WHERE id = %s", (paciente_id,))
-        result = self.cursor.fetchone()
-        if result:
-            paciente = Paciente(result[1], result[2], result[3], result[4], result[5])
-            paciente.definir_id(result[0])
+        paciente = self._pacientes.obter(paciente_id)
+        if paciente is not None:
             return paciente
+        with self._cursor(preparado=True, leitura=True) as cursor:
+            cursor.execute("SELECT id, nome, cpf, localizacao, condicao, transporte FROM Pacientes WHERE id = %s", (paciente_id,))
+            result = cursor.fetchone()
+        if result:
+            return self._pacientes.guardar(_paciente_de_linha(result))
         return None
 
     def buscar_maqueiro_por_id(self, maqueiro_id):
@@ -294,69 +1447,352 @@ class Database:
         Returns:
             Maqueiro: Objeto maqueiro encontrado, ou None se não encontrado.
         """
-        self.cursor.execute("SELECT id, nome, coren, data_nascimento, sexo, login, senha FROM Maqueiros WHERE id = %s", (maqueiro_id,))
-        result = self.cursor.fetchone()
-        if result:
-            maqueiro = Maqueiro(result[0], result[1], result[2], result[3], result[4])
-            maqueiro.login = result[5]
-            maqueiro.senha = result[6]
+        maqueiro = self._maqueiros.obter(maqueiro_id)
+        if maqueiro is not None:
             return maqueiro
+        with self._cursor(preparado=True, leitura=True) as cursor:
+            cursor.execute("SELECT id, nome, coren, data_nascimento, sexo, login FROM Maqueiros WHERE id = %s", (maqueiro_id,))
+            result = cursor.fetchone()
+        if result:
+            return self._maqueiros.guardar(_maqueiro_de_linha(result))
         return None
 
-    def listar_solicitacoes_pendentes(self):
+    def listar_solicitacoes_pendentes(self, preguicoso=False, colunas=None):
         """
         Lista todas as solicitações de transporte pendentes ou recusadas no banco de dados.
 
+        O paciente e o maqueiro de cada solicitação são carregados na mesma consulta, por JOIN, ou,
+        com `preguicoso`, em lote no primeiro acesso.
+
+        Args:
+            preguicoso (bool): Se True, lê só as chaves estrangeiras e carrega as relações no primeiro acesso.
+            colunas (dict): Colunas a ler de cada relação (padrão: todas, exceto a senha do maqueiro).
+
         Returns:
             list: Lista de objetos SolicitacaoTransporte com o status pendente ou recusada.
         """
+        plano = _PlanoRelacoes(self, "s", ("paciente", "maqueiro"), preguicoso, colunas)
         try:
-            self.cursor.execute("SELECT id, descricao, paciente_id, status, maqueiro_id, data_hora FROM SolicitacoesTransporte WHERE status IN ('pendente', 'recusada')")
-            result = self.cursor.fetchall()
+            with self._cursor(leitura=True) as cursor:
+                cursor.execute(f"SELECT s.id, s.descricao, s.status, s.data_hora, {plano.colunas} FROM SolicitacoesTransporte s{plano.juncoes} "
+                               f"WHERE s.status IN ({StatusSolicitacao.PENDENTE:d}, {StatusSolicitacao.RECUSADA:d})")
+                result = cursor.fetchall()
             solicitacoes = []
             for row in result:
-                paciente = self.buscar_paciente_por_id(row[2])
-                maqueiro = self.buscar_maqueiro_por_id(row[4]) if row[4] else None
-                solicitacao = SolicitacaoTransporte(row[0], row[1], paciente, row[5], maqueiro)
-                solicitacao.status = row[3]  # Atribuir o status corretamente
-                solicitacoes.append(solicitacao)
+                relacoes = plano.montar(row, 4)
+                solicitacoes.append(SolicitacaoTransporte.de_linha(row, relacoes["paciente"], relacoes["maqueiro"]))
             return solicitacoes
-        except Error as e:
+        except ERROS_BANCO as e:
             print(f"Erro ao listar solicitações pendentes no banco de dados: {e}")
             return []
 
+    def historico_solicitacoes(self, paciente_id, incluir_arquivo=False, preguicoso=False, colunas=None):
+        """
+        Lista as solicitações de transporte de um paciente, da mais recente para a mais antiga.
+
+        Args:
+            paciente_id (int): ID do paciente.
+            incluir_arquivo (bool): Se True, inclui as solicitações concluídas movidas para o arquivo.
+            preguicoso (bool): Se True, lê só as chaves estrangeiras e carrega as relações no primeiro acesso.
+            colunas (dict): Colunas a ler de cada relação (padrão: todas, exceto a senha do maqueiro).
+
+        Returns:
+            list: Lista de objetos SolicitacaoTransporte.
+        """
+        plano = _PlanoRelacoes(self, "s", ("paciente", "maqueiro"), preguicoso, colunas)
+        origem = "SolicitacoesTransporte"
+        valores = ()
+        if incluir_arquivo:
+            origem = (f"(SELECT {COLUNAS_SOLICITACAO} FROM SolicitacoesTransporte WHERE paciente_id = %s "
+                      f"UNION ALL SELECT {COLUNAS_SOLICITACAO} FROM SolicitacoesTransporteArquivo WHERE paciente_id = %s)")
+            valores = (paciente_id, paciente_id)
+        try:
+            with self._cursor(leitura=True) as cursor:
+                cursor.execute(f"SELECT s.id, s.descricao, s.status, s.data_hora, {plano.colunas} FROM {origem} s{plano.juncoes} "
+                               "WHERE s.paciente_id = %s ORDER BY s.data_hora DESC, s.id DESC", valores + (paciente_id,))
+                result = cursor.fetchall()
+            solicitacoes = []
+            for row in result:
+                relacoes = plano.montar(row, 4)
+                solicitacoes.append(SolicitacaoTransporte.de_linha(row, relacoes["paciente"], relacoes["maqueiro"]))
+            return solicitacoes
+        except ERROS_BANCO as e:
+            print(f"Erro ao listar histórico de solicitações no banco de dados: {e}")
+            return []
+
     def update_solicitacao_status(self, solicitacao_id, status, maqueiro_id):
         """
         Atualiza o status de uma solicitação de transporte no banco de dados.
 
+        A mudança segue a máquina de estados de estados.py: o UPDATE só altera a solicitação se o
+        status atual permitir a transição.
+
         Args:
             solicitacao_id (int): ID da solicitação a ser atualizada.
             status (str): Novo status da solicitação.
             maqueiro_id (int): ID do maqueiro responsável.
+
+        Returns:
+            bool: True se a solicitação foi atualizada.
         """
         try:
-            self.cursor.execute("UPDATE SolicitacoesTransporte SET status = %s, maqueiro_id = %s WHERE id = %s", (status, maqueiro_id, solicitacao_id))
-            self.connection.commit()
-        except Error as e:
+            ajustes = []
+            with self._cursor(commit=True, preparado=True) as cursor:
+                novo = StatusSolicitacao.de(status)
+                if self.resumo is not None:
+                    cursor.execute("SELECT s.status, p.urgencia FROM SolicitacoesTransporte s "
+                                   "LEFT JOIN Pacientes p ON p.id = s.paciente_id WHERE s.id = %s", (solicitacao_id,))
+                    anterior = cursor.fetchone()
+                    if anterior and _pendente(anterior[0]) != _pendente(novo):
+                        ajustes.append((SOLICITACOES, Urgencia.rotulo_de(anterior[1]), 1 if _pendente(novo) else -1))
+                cursor.execute("UPDATE SolicitacoesTransporte SET status = %s, maqueiro_id = %s "
+                               f"WHERE id = %s AND status IN ({origens(novo)})", (int(novo), maqueiro_id, solicitacao_id))
+                atualizada = cursor.rowcount == 1
+            if not atualizada:
+                print(f"Solicitação {solicitacao_id} não encontrada ou não pode passar para '{novo.rotulo}'.")
+                return False
+            self._ajustar_resumo(ajustes)
+            return True
+        except ERROS_BANCO + (ValueError,) as e:
             print(f"Erro ao atualizar status da solicitação de transporte no banco de dados: {e}")
+            return False
+
+    def reivindicar_solicitacao(self, solicitacao_id, maqueiro_id):
+        """
+        Aceita uma solicitação de transporte para o maqueiro, somente se ela ainda estiver pendente ou recusada.
+
+        O UPDATE condicional é atômico: se vários maqueiros aceitarem a mesma solicitação ao mesmo
+        tempo, apenas um deles recebe True.
+
+        Args:
+            solicitacao_id (int): ID da solicitação.
+            maqueiro_id (int): ID do maqueiro que aceita a solicitação.
+
+        Returns:
+            bool: True se a solicitação foi entregue a este maqueiro.
+        """
+        try:
+            anterior = None
+            with self._cursor(commit=True, preparado=True) as cursor:
+                if self.resumo is not None:
+                    cursor.execute("SELECT s.status, p.urgencia FROM SolicitacoesTransporte s "
+                                   "LEFT JOIN Pacientes p ON p.id = s.paciente_id WHERE s.id = %s", (solicitacao_id,))
+                    anterior = cursor.fetchone()
+                cursor.execute(f"UPDATE SolicitacoesTransporte SET status = {StatusSolicitacao.ACEITA:d}, maqueiro_id = %s "
+                               f"WHERE id = %s AND status IN ({origens(StatusSolicitacao.ACEITA)})", (maqueiro_id, solicitacao_id))
+                reivindicada = cursor.rowcount == 1
+            if reivindicada and anterior and _pendente(anterior[0]):
+                self._ajustar_resumo([(SOLICITACOES, Urgencia.rotulo_de(anterior[1]), -1)])
+            return reivindicada
+        except ERROS_BANCO as e:
+            print(f"Erro ao aceitar solicitação de transporte no banco de dados: {e}")
+            return False
+
+    def reivindicar_proxima_solicitacao(self, maqueiro_id):
+        """
+        Entrega ao maqueiro a próxima solicitação pendente, a mais urgente e mais antiga, como em uma fila de trabalho.
+
+        No MySQL, a solicitação é lida com SKIP LOCKED: maqueiros simultâneos recebem solicitações
+        diferentes sem esperar uns pelos outros. Cada solicitação é entregue a um único maqueiro.
+
+        Args:
+            maqueiro_id (int): ID do maqueiro que aceita a solicitação.
+
+        Returns:
+            SolicitacaoTransporte: Solicitação aceita, ou None se não houver solicitação pendente.
+        """
+        try:
+            with self._cursor(commit=True, transacao=True) as cursor:
+                cursor.execute(f"SELECT s.id, s.descricao, s.data_hora, p.urgencia, {COLUNAS_PACIENTE} FROM SolicitacoesTransporte s "
+                               f"LEFT JOIN Pacientes p ON p.id = s.paciente_id WHERE s.status = {StatusSolicitacao.PENDENTE:d} "
+                               # Pacientes sem urgência definida vão para o fim da fila
+                               f"ORDER BY p.urgencia IS NULL, {self.backend.ordem_urgencia('p.urgencia')}, s.data_hora, s.id "
+                               f"LIMIT 1{self.backend.reservar_para_fila('s')}")
+                linha = cursor.fetchone()
+                if linha is not None:
+                    cursor.execute(f"UPDATE SolicitacoesTransporte SET status = {StatusSolicitacao.ACEITA:d}, maqueiro_id = %s WHERE id = %s",
+                                   (maqueiro_id, linha[0]))
+        except ERROS_BANCO as e:
+            print(f"Erro ao aceitar a próxima solicitação de transporte: {e}")
+            return None
+        if linha is None:
+            return None
+        self._ajustar_resumo([(SOLICITACOES, Urgencia.rotulo_de(linha[3]), -1)])
+        paciente = self._pacientes.guardar(_paciente_de_linha(linha[4:10]))
+        solicitacao = SolicitacaoTransporte(linha[0], linha[1], paciente, linha[2], self.buscar_maqueiro_por_id(maqueiro_id))
+        solicitacao.status = StatusSolicitacao.ACEITA.rotulo
+        return solicitacao
 
     def listar_pacientes(self):
         """
         Lista todos os pacientes no banco de dados, ordenados por urgência.
 
+        O resultado fica guardado por `ttl_censo` segundos ou até a próxima escrita em pacientes.
+
         Returns:
             list: Lista de objetos Paciente.
         """
-        self.cursor.execute("SELECT id, nome, cpf, localizacao, condicao, urgencia, transporte FROM Pacientes ORDER BY FIELD(urgencia, 'Emergência', 'Alta', 'Média', 'Baixa')")
-        result = self.cursor.fetchall()
-        pacientes = []
-        for row in result:
-            paciente = Paciente(row[1], row[2], row[3], row[4], row[6])
-            paciente.definir_id(row[0])
-            paciente.urgencia = row[5]
-            pacientes.append(paciente)
-        return pacientes
-    
+        def consultar():
+            with self._cursor(leitura=True) as cursor:
+                cursor.execute(f"SELECT {COLUNAS_CENSO} FROM Pacientes ORDER BY {self.backend.ordem_urgencia('urgencia')}")
+                return cursor.fetchall()
+        result = self._consultar_censo(("pacientes",), consultar)
+        return [Paciente.de_linha(row) for row in result]
+
+    def listar_pacientes_pagina(self, limite=100, apos=None):
+        """
+        Lista uma página de pacientes, ordenados por urgência e ID, usando paginação por chave.
+
+        Cada página continua a partir da última chave da anterior, sem OFFSET, de modo que o
+        custo de uma página não cresce com a posição na lista. A chave usa as colunas puras
+        (urgencia, id), servidas pelo índice idx_pacientes_urgencia. Os pacientes sem urgência vêm
+        primeiro e são paginados em uma consulta própria, já que um nulo não se compara com `>`.
+        As páginas ficam guardadas como em `listar_pacientes`.
+
+        Args:
+            limite (int): Número máximo de pacientes na página.
+            apos (tuple): Chave (urgência, ID) retornada pela página anterior, ou None para a
+                primeira página.
+
+        Returns:
+            tuple: Lista de objetos Paciente e a chave da próxima página (None se for a última).
+        """
+        consultas = []
+        if apos is None:
+            consultas.append(("", ()))
+        elif apos[0] is None:
+            consultas.append((" WHERE urgencia IS NULL AND id > %s", (apos[1],)))
+            consultas.append((" WHERE urgencia IS NOT NULL", ()))
+        else:
+            # O primeiro termo sozinho delimita a faixa do índice; o segundo desempata pelo ID
+            consultas.append((" WHERE urgencia >= %s AND (urgencia > %s OR id > %s)", (apos[0], apos[0], apos[1])))
+        def consultar():
+            linhas = []
+            with self._cursor(leitura=True) as cursor:
+                for condicao, valores in consultas:
+                    cursor.execute(f"SELECT {COLUNAS_CENSO} FROM Pacientes{condicao} ORDER BY urgencia, id LIMIT %s",
+                                   valores + (limite - len(linhas),))
+                    linhas += cursor.fetchall()
+                    if len(linhas) == limite:
+                        break
+            return linhas
+        result = self._consultar_censo(("pagina", limite, apos and tuple(apos)), consultar)
+        proxima = (result[-1][6], result[-1][0]) if len(result) == limite else None
+        return [Paciente.de_linha(row) for row in result], proxima
+
+    def _consultar_censo(self, chave, consultar):
+        """
+        Executa uma consulta do censo pelo cache de resultados, exceto dentro de uma transação,
+        que pode enxergar alterações ainda não confirmadas.
+
+        Returns:
+            list: Linhas retornadas pela consulta.
+        """
+        if getattr(self._local, 'conexao', None) is not None:
+            return consultar()
+        return self._censo.obter_ou_calcular(chave, consultar)
+
+    def iterar_pacientes(self, tamanho_lote=500):
+        """
+        Percorre todos os pacientes, ordenados por urgência, sem carregá-los todos na memória.
+
+        As linhas são lidas do servidor em blocos de `tamanho_lote` com `fetchmany`. A conexão
+        fica reservada até o fim da iteração (ou até o gerador ser fechado).
+
+        Args:
+            tamanho_lote (int): Número de linhas buscadas por vez.
+
+        Yields:
+            Paciente: Cada paciente, na ordem de urgência.
+        """
+        with self._cursor(buffered=False, leitura=True) as cursor:
+            cursor.execute(f"SELECT {COLUNAS_CENSO} FROM Pacientes ORDER BY {self.backend.ordem_urgencia('urgencia')}, id")
+            while True:
+                linhas = cursor.fetchmany(tamanho_lote)
+                if not linhas:
+                    break
+                for row in linhas:
+                    yield Paciente.de_linha(row)
+
+    def marca_alteracoes(self):
+        """
+        Retorna a marca atual da sequência de alterações.
+
+        Um cliente obtém a marca antes da carga inicial das listas e depois consulta apenas
+        `alteracoes_desde(marca)`; alterações feitas durante a carga aparecem nas duas, sem perda.
+
+        Returns:
+            int: Última sequência sem lacunas pendentes abaixo dela, ou 0 em caso de erro.
+        """
+        try:
+            # As transações abertas só são conhecidas pelo primário
+            with self._cursor() as cursor:
+                encerrada, parametros = self.backend.lacuna_encerrada(cursor, 'registrada_em', ESPERA_LACUNA)
+                cursor.execute(f"SELECT seq, {encerrada} FROM RegistroAlteracoes ORDER BY seq DESC LIMIT %s",
+                               parametros + (JANELA_REGISTRO,))
+                linhas = cursor.fetchall()[::-1]
+            return _seq_confirmada(linhas, linhas[0][0] - 1) if linhas else 0
+        except ERROS_BANCO as e:
+            print(f"Erro ao consultar a marca de alterações: {e}")
+            return 0
+
+    def alteracoes_desde(self, marca, limite=500):
+        """
+        Lista os pacientes, tarefas e solicitações de transporte inseridos ou alterados depois da marca.
+
+        As consultas vão só até a primeira lacuna pendente no registro de alterações: uma escrita
+        ainda não confirmada com seq menor que a de outra já confirmada fica para a próxima consulta,
+        que parte da marca retornada.
+
+        Args:
+            marca (int): Marca retornada pela consulta anterior ou por `marca_alteracoes`.
+            limite (int): Número máximo de linhas por tabela.
+
+        Returns:
+            Alteracoes: Linhas alteradas e a próxima marca (a mesma marca, sem linhas, em caso de erro).
+        """
+        try:
+            # No primário: as transações abertas só são conhecidas por ele, e uma réplica atrasada
+            # poderia não ter ainda as linhas até o teto
+            with self._cursor() as cursor:
+                encerrada, parametros = self.backend.lacuna_encerrada(cursor, 'registrada_em', ESPERA_LACUNA)
+                cursor.execute(f"SELECT seq, {encerrada} FROM RegistroAlteracoes WHERE seq > %s ORDER BY seq LIMIT %s",
+                               parametros + (marca, limite))
+                registro = cursor.fetchall()
+                teto = _seq_confirmada(registro, marca)
+                linhas = {}
+                for nome, sql in CONSULTAS_ALTERACOES.items():
+                    cursor.execute(sql, (marca, teto, limite))
+                    linhas[nome] = cursor.fetchall()
+        except ERROS_BANCO as e:
+            print(f"Erro ao consultar alterações no banco de dados: {e}")
+            return Alteracoes(marca)
+
+        # Uma tabela que atingiu o limite só garante as alterações até a última linha retornada
+        truncadas = [resultado[-1][0] for resultado in linhas.values() if len(resultado) == limite]
+        nova_marca = min(truncadas) if truncadas else teto
+        # O registro também tem limite: as alterações depois da última seq lida ficam para a próxima consulta
+        if len(registro) == limite:
+            truncadas.append(teto)
+
+        pacientes = [self._pacientes.guardar(Paciente.de_linha(row[1:]))
+                     for row in linhas["pacientes"] if row[0] <= nova_marca]
+        tarefas = []
+        for row in linhas["tarefas"]:
+            if row[0] > nova_marca:
+                break
+            paciente = self._pacientes.guardar(_paciente_de_linha(row[6:12]))
+            maqueiro = self._maqueiros.guardar(_maqueiro_de_linha(row[12:18]))
+            tarefas.append(Tarefa.de_linha(row[1:], paciente, maqueiro, row[5]))
+        solicitacoes = []
+        for row in linhas["solicitacoes"]:
+            if row[0] > nova_marca:
+                break
+            paciente = self._pacientes.guardar(_paciente_de_linha(row[5:11]))
+            maqueiro = self._maqueiros.guardar(_maqueiro_de_linha(row[11:17]))
+            solicitacoes.append(SolicitacaoTransporte.de_linha(row[1:5], paciente, maqueiro))
+        return Alteracoes(nova_marca, pacientes, tarefas, solicitacoes, completo=not truncadas)
+
     def iniciar_transporte_paciente(self, paciente_id):
         """
         Inicia o transporte de um paciente, atualizando a condição e registrando o início do transporte.
@@ -365,26 +1801,115 @@ class Database:
             paciente_id (int): ID do paciente a ser transportado.
         """
         try:
-            self.cursor.execute("UPDATE Pacientes SET condicao = 'Em transporte', inicio_transporte = %s WHERE id = %s",
-            (datetime.now(), paciente_id))
-            self.connection.commit()
-        except Error as e:
+            ajustes = []
+            with self._cursor(commit=True, preparado=True) as cursor:
+                if self.resumo is not None:
+                    cursor.execute("SELECT condicao, transporte FROM Pacientes WHERE id = %s", (paciente_id,))
+                    anterior = cursor.fetchone()
+                    if anterior and not _em_transporte(*anterior) and _em_transporte('Em transporte', anterior[1]):
+                        ajustes.append((TRANSPORTE, None, 1))
+                cursor.execute("UPDATE Pacientes SET condicao = 'Em transporte', inicio_transporte = %s WHERE id = %s",
+                               (datetime.now(), paciente_id))
+            self._paciente_alterado(paciente_id)
+            self._ajustar_resumo(ajustes)
+        except ERROS_BANCO as e:
             print(f"Erro ao iniciar transporte do paciente: {e}")
 
-    def atualizar_status_transporte(self):
+    def atualizar_status_transporte(self, limite_segundos=3600):
         """
         Atualiza o status de transporte dos pacientes em relação ao tempo de transporte.
+
+        Um único UPDATE marca como 'Chegou ao destino' todos os pacientes em transporte há mais
+        de `limite_segundos`, calculando o tempo decorrido no próprio servidor.
+
+        Args:
+            limite_segundos (int): Tempo máximo de transporte, em segundos.
+
+        Returns:
+            int: Número de pacientes atualizados.
         """
         try:
-            self.cursor.execute("SELECT id, inicio_transporte FROM Pacientes WHERE condicao = 'Em transporte'")
-            pacientes_em_transporte = self.cursor.fetchall()
-            for paciente_id, inicio_transporte in pacientes_em_transporte:
-                tempo_em_transporte = datetime.now() - inicio_transporte
-                if tempo_em_transporte.total_seconds() > 3600:  # Exemplo: 1 hora em segundos
-                    self.cursor.execute("UPDATE Pacientes SET transporte = 'Chegou ao destino' WHERE id = %s", (paciente_id,))
-            self.connection.commit()
-        except Error as e:
+            with self._cursor(commit=True) as cursor:
+                cursor.execute(f"UPDATE Pacientes SET transporte = {Transporte.CHEGOU:d} "
+                               f"WHERE condicao = 'Em transporte' AND transporte <> {Transporte.CHEGOU:d} "
+                               f"AND {self.backend.tempo_excedido('inicio_transporte')}", (limite_segundos,))
+                atualizados = cursor.rowcount
+            if atualizados:
+                self._paciente_alterado()
+                self._ajustar_resumo([(TRANSPORTE, None, -atualizados)])
+            return atualizados
+        except ERROS_BANCO as e:
             print(f"Erro ao atualizar status de transporte: {e}")
+            return 0
+
+    def arquivar(self, dias_incidentes=180, tamanho_lote=500, max_lotes=20, dias_registro=7):
+        """
+        Move para as tabelas de arquivo as solicitações de transporte concluídas e os incidentes com
+        mais de `dias_incidentes` dias, mantendo as tabelas ativas pequenas. Também apaga as linhas do
+        registro de alterações com mais de `dias_registro` dias.
+
+        As linhas são movidas em lotes de `tamanho_lote`, cada um em sua própria transação, para não
+        bloquear as tabelas ativas por muito tempo. Cada chamada move no máximo `max_lotes` lotes por
+        tabela; o restante fica para a próxima execução.
+
+        Args:
+            dias_incidentes (int): Idade, em dias, a partir da qual um incidente é arquivado.
+            tamanho_lote (int): Número máximo de linhas movidas por transação.
+            max_lotes (int): Número máximo de lotes por tabela nesta chamada.
+            dias_registro (int): Idade, em dias, a partir da qual uma linha do registro de alterações é apagada.
+
+        Returns:
+            int: Número de linhas arquivadas.
+        """
+        self._podar_registro_alteracoes(dias_registro)
+        return (self._arquivar_tabela("SolicitacoesTransporte", COLUNAS_SOLICITACAO, f"status = {StatusSolicitacao.CONCLUIDA:d}", (),
+                                      tamanho_lote, max_lotes)
+                + self._arquivar_tabela("Incidentes", COLUNAS_INCIDENTE, self.backend.tempo_excedido('data_hora'),
+                                        (dias_incidentes * 86400,), tamanho_lote, max_lotes))
+
+    def _podar_registro_alteracoes(self, dias):
+        try:
+            with self._cursor(commit=True) as cursor:
+                cursor.execute("SELECT MAX(seq) FROM RegistroAlteracoes")
+                linha = cursor.fetchone()
+                # A última linha fica, para que o AUTO_INCREMENT não recomece de um valor menor
+                if linha and linha[0] is not None:
+                    cursor.execute(f"DELETE FROM RegistroAlteracoes WHERE seq < %s AND {self.backend.tempo_excedido('registrada_em')}",
+                                   (linha[0], dias * 86400))
+        except ERROS_BANCO as e:
+            print(f"Erro ao apagar o registro de alterações antigo: {e}")
+
+    def _arquivar_tabela(self, tabela, colunas, condicao, valores, tamanho_lote, max_lotes):
+        arquivo = f"{tabela}Arquivo"
+        agora = datetime.now()
+        mes_atual = agora.year * 100 + agora.month
+        mes = self.backend.mes('data_hora')
+        arquivadas = 0
+        try:
+            # As partições são criadas antes dos lotes: o DDL do MySQL confirmaria a transação em andamento
+            with self._cursor(commit=True) as cursor:
+                cursor.execute(f"SELECT MIN({mes}) FROM {tabela} WHERE {condicao}", valores)
+                linha = cursor.fetchone()
+                self.backend.garantir_particoes(cursor, arquivo, (linha and linha[0]) or mes_atual, mes_atual)
+
+            for _ in range(max_lotes):
+                with self._cursor(commit=True, transacao=True) as cursor:
+                    cursor.execute(f"SELECT id FROM {tabela} WHERE {condicao} ORDER BY data_hora, id LIMIT %s",
+                                   valores + (tamanho_lote,))
+                    ids = [row[0] for row in cursor.fetchall()]
+                    if ids:
+                        marcadores = ", ".join(["%s"] * len(ids))
+                        # Datas nulas ou fora do formato ficam no mês do arquivamento
+                        cursor.execute(f"INSERT INTO {arquivo} ({colunas}, mes, arquivado_em) "
+                                       f"SELECT {colunas}, COALESCE({mes}, %s), %s FROM {tabela} WHERE id IN ({marcadores})",
+                                       (mes_atual, agora, *ids))
+                        cursor.execute(f"DELETE FROM {tabela} WHERE id IN ({marcadores})", tuple(ids))
+                arquivadas += len(ids)
+                if len(ids) < tamanho_lote:
+                    break
+        except ERROS_BANCO as e:
+            print(f"Erro ao arquivar {tabela}: {e}")
+        return arquivadas
 
     def concluir_transporte_paciente(self, paciente_id):
         """
@@ -394,31 +1919,62 @@ class Database:
             paciente_id (int): ID do paciente cujo transporte foi concluído.
         """
         try:
-            # Atualizar o status de transporte do paciente
-            self.cursor.execute("UPDATE Pacientes SET transporte = 'Chegou ao destino', inicio_transporte = NULL WHERE id = %s", (paciente_id,))
-            self.connection.commit()
-
-            # Atualizar o status das solicitações de transporte associadas para "concluído"
-            self.cursor.execute("UPDATE SolicitacoesTransporte SET status = 'concluído' WHERE paciente_id = %s", (paciente_id,))
-            self.connection.commit()
-        except Error as e:
+            ajustes = []
+            with self._cursor(commit=True, transacao=True) as cursor:
+                if self.resumo is not None:
+                    cursor.execute("SELECT p.condicao, p.transporte, p.urgencia, "
+                                   f"(SELECT COUNT(*) FROM SolicitacoesTransporte s WHERE s.paciente_id = p.id AND s.status = {StatusSolicitacao.PENDENTE:d}) "
+                                   "FROM Pacientes p WHERE p.id = %s", (paciente_id,))
+                    anterior = cursor.fetchone()
+                    if anterior and _em_transporte(anterior[0], anterior[1]):
+                        ajustes.append((TRANSPORTE, None, -1))
+                    if anterior and anterior[3]:
+                        ajustes.append((SOLICITACOES, Urgencia.rotulo_de(anterior[2]), -anterior[3]))
+
+                # Atualizar o status de transporte do paciente
+                cursor.execute(f"UPDATE Pacientes SET transporte = {Transporte.CHEGOU:d}, inicio_transporte = NULL WHERE id = %s", (paciente_id,))
+
+                # Atualizar o status das solicitações de transporte associadas para "concluída"
+                cursor.execute(f"UPDATE SolicitacoesTransporte SET status = {StatusSolicitacao.CONCLUIDA:d} "
+                               f"WHERE paciente_id = %s AND status IN ({origens(StatusSolicitacao.CONCLUIDA)})", (paciente_id,))
+            self._paciente_alterado(paciente_id)
+            self._ajustar_resumo(ajustes)
+        except ERROS_BANCO as e:
             print(f"Erro ao concluir transporte do paciente: {e}")
 
     def atualizar_transporte_paciente(self, paciente_id, status_transporte):
         """
-        Atualiza o status de transporte de um paciente.
+        Atualiza o status de transporte de um paciente, se a máquina de estados permitir a transição.
 
         Args:
             paciente_id (int): ID do paciente a ser atualizado.
             status_transporte (str): Novo status de transporte do paciente.
+
+        Returns:
+            bool: True se o paciente foi atualizado.
         """
         try:
-            sql = "UPDATE Pacientes SET transporte = %s WHERE id = %s"
-            values = (status_transporte, paciente_id)
-            self.cursor.execute(sql, values)
-            self.connection.commit()
-        except Error as e:
+            ajustes = []
+            with self._cursor(commit=True, preparado=True) as cursor:
+                # Um status desconhecido levanta ValueError aqui dentro, desfazendo a transação em andamento
+                novo = Transporte.de(status_transporte)
+                if self.resumo is not None:
+                    cursor.execute("SELECT condicao, transporte FROM Pacientes WHERE id = %s", (paciente_id,))
+                    anterior = cursor.fetchone()
+                    if anterior and _em_transporte(*anterior) != _em_transporte(anterior[0], novo):
+                        ajustes.append((TRANSPORTE, None, 1 if _em_transporte(anterior[0], novo) else -1))
+                cursor.execute(f"UPDATE Pacientes SET transporte = %s WHERE id = %s AND transporte IN ({origens(novo)})",
+                               (int(novo), paciente_id))
+                atualizado = cursor.rowcount == 1
+            self._paciente_alterado(paciente_id)
+            if not atualizado:
+                print(f"Paciente {paciente_id} não encontrado ou não pode passar para '{novo.rotulo}'.")
+                return False
+            self._ajustar_resumo(ajustes)
+            return True
+        except ERROS_BANCO + (ValueError,) as e:
             print(f"Erro ao atualizar transporte do paciente: {e}")
+            return False
 
     def atualizar_localizacao_paciente(self, paciente_id, nova_localizacao):
         """
@@ -429,7 +1985,8 @@ class Database:
             nova_localizacao (str): Nova localização do paciente.
         """
         try:
-            self.cursor.execute("UPDATE Pacientes SET localizacao = %s WHERE id = %s", (nova_localizacao, paciente_id))
-            self.connection.commit()
-        except Error as e:
+            with self._cursor(commit=True, preparado=True) as cursor:
+                cursor.execute("UPDATE Pacientes SET localizacao = %s WHERE id = %s", (nova_localizacao, paciente_id))
+            self._paciente_alterado(paciente_id)
+        except ERROS_BANCO as e:
             print(f"Erro ao atualizar localização do paciente: {e}")
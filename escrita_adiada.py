@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime
+
+
+def _serializar(valor):
+    # Datas vão para o diário no formato aceito pelas colunas DATETIME e DATE dos dois backends
+    if isinstance(valor, datetime):
+        return valor.isoformat(" ")
+    if isinstance(valor, date):
+        return valor.isoformat()
+    raise TypeError(f"Valor não serializável no diário: {valor!r}")
+
+
+class EscritaAdiada:
+    """
+    Classe EscritaAdiada com uma fila de escritas de baixa criticidade, gravadas em lotes em segundo plano.
+
+    `adicionar` apenas registra a escrita no diário local e a coloca na fila, sem esperar pelo banco
+    de dados. Uma thread de fundo grava a fila em uma única transação quando ela atinge `tamanho_lote`
+    escritas ou a cada `intervalo` segundos. Se a gravação falhar (conexão perdida, pool esgotado),
+    as escritas voltam para a fila e são tentadas de novo no próximo ciclo.
+
+    Escritas recusadas pelo próprio banco (chave estrangeira inexistente, valor inválido) não voltam
+    para a fila, onde impediriam a gravação das demais a cada ciclo: são registradas no log e movidas
+    para o arquivo de rejeitadas, uma por linha em JSON, com a mensagem de erro.
+
+    O diário guarda as escritas ainda não confirmadas no banco: as que sobrarem de uma execução
+    interrompida são carregadas e gravadas na próxima. Uma queda entre o commit e a limpeza do
+    diário faz o último lote ser gravado outra vez (entrega ao menos uma vez).
+
+    Attributes:
+        tamanho_lote (int): Número de escritas na fila que dispara uma gravação imediata.
+        intervalo (float): Tempo máximo, em segundos, entre duas gravações.
+        caminho_diario (str): Caminho do diário local, ou None para manter a fila apenas em memória.
+        caminho_rejeitadas (str): Caminho do arquivo de escritas recusadas, ou None para apenas registrá-las no log.
+        gravadas (int): Total de escritas confirmadas no banco de dados.
+        falhas (int): Número de gravações que falharam e foram adiadas.
+        rejeitadas (int): Total de escritas recusadas pelo banco de dados.
+    """
+
+    def __init__(self, gravar, caminho_diario=None, tamanho_lote=50, intervalo=2.0, caminho_rejeitadas=None):
+        """
+        Inicializa a fila, carregando as escritas pendentes do diário, sem iniciar a thread de fundo.
+
+        Args:
+            gravar (callable): Função que recebe a lista de pares (sql, valores) e os grava em uma
+                transação. Retorna os pares (índice, mensagem) das escritas recusadas pelo banco
+                (ou None se não houver) e levanta uma exceção se a transação inteira falhar.
+            caminho_diario (str): Caminho do diário local, ou None.
+            tamanho_lote (int): Número de escritas na fila que dispara uma gravação imediata.
+            intervalo (float): Tempo máximo, em segundos, entre duas gravações.
+            caminho_rejeitadas (str): Caminho do arquivo de escritas recusadas (padrão:
+                `<diário>.rejeitadas`, ou nenhum arquivo se não houver diário).
+        """
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.caminho_diario = caminho_diario
+        if caminho_rejeitadas is None and caminho_diario is not None:
+            caminho_rejeitadas = f"{caminho_diario}.rejeitadas"
+        self.caminho_rejeitadas = caminho_rejeitadas
+        self.gravadas = 0
+        self.falhas = 0
+        self.rejeitadas = 0
+        self._gravar = gravar
+        self._pendentes = []
+        self._lock = threading.Lock()
+        self._lock_gravacao = threading.Lock()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._thread = None
+        self._diario = None
+        if caminho_diario is not None:
+            self._pendentes = self._ler_diario()
+            self._diario = open(caminho_diario, "a", encoding="utf-8")
+
+    @property
+    def pendentes(self):
+        """int: Retorna o número de escritas ainda não gravadas no banco de dados."""
+        with self._lock:
+            return len(self._pendentes)
+
+    def adicionar(self, sql, valores):
+        """
+        Registra uma escrita no diário e a coloca na fila.
+
+        Args:
+            sql (str): Comando INSERT com marcadores %s.
+            valores (tuple): Valores do comando.
+        """
+        valores = tuple(valores)
+        with self._lock:
+            if self._diario is not None:
+                self._diario.write(json.dumps([sql, valores], default=_serializar) + "\n")
+                self._diario.flush()
+                os.fsync(self._diario.fileno())
+            self._pendentes.append((sql, valores))
+            cheia = len(self._pendentes) >= self.tamanho_lote
+        if cheia:
+            self._acordar.set()
+
+    def iniciar(self):
+        """
+        Inicia a thread de fundo. Não faz nada se ela já estiver ativa.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._laco, name="escrita adiada", daemon=True)
+        self._thread.start()
+
+    def descarregar(self):
+        """
+        Grava agora todas as escritas da fila, em uma única transação.
+
+        As escritas recusadas pelo banco de dados saem da fila e do diário e vão para o arquivo de
+        rejeitadas.
+
+        Returns:
+            int: Número de escritas gravadas (0 se a fila estava vazia ou a gravação falhou).
+        """
+        with self._lock_gravacao:
+            with self._lock:
+                lote, self._pendentes = self._pendentes, []
+            if not lote:
+                return 0
+            try:
+                recusadas = self._gravar(lote) or []
+            except Exception as e:
+                logging.error(f"Erro ao gravar {len(lote)} escritas adiadas; nova tentativa no próximo ciclo: {e}")
+                with self._lock:
+                    self._pendentes = lote + self._pendentes
+                    self.falhas += 1
+                return 0
+            # As recusadas vão para o arquivo antes de saírem do diário, para não se perderem em uma queda
+            if recusadas:
+                self._rejeitar([(lote[indice], mensagem) for indice, mensagem in recusadas])
+            with self._lock:
+                self._reescrever_diario()
+                self.gravadas += len(lote) - len(recusadas)
+            return len(lote) - len(recusadas)
+
+    def encerrar(self, timeout=None):
+        """
+        Para a thread de fundo e grava o que restar na fila. Escritas que não puderem ser gravadas
+        continuam no diário para a próxima execução.
+
+        Args:
+            timeout (float): Tempo máximo, em segundos, para aguardar a thread.
+        """
+        self._parar.set()
+        self._acordar.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.descarregar()
+        with self._lock:
+            if self._diario is not None:
+                self._diario.close()
+                self._diario = None
+
+    def _laco(self):
+        while not self._parar.is_set():
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+            if self._parar.is_set():
+                break
+            self.descarregar()
+
+    def _rejeitar(self, recusadas):
+        for (sql, valores), mensagem in recusadas:
+            logging.error(f"Escrita adiada recusada pelo banco de dados e descartada da fila: {mensagem} "
+                          f"({sql} {valores!r}; arquivo de rejeitadas: {self.caminho_rejeitadas})")
+        self.rejeitadas += len(recusadas)
+        if self.caminho_rejeitadas is None:
+            return
+        with open(self.caminho_rejeitadas, "a", encoding="utf-8") as arquivo:
+            for (sql, valores), mensagem in recusadas:
+                registro = {"sql": sql, "valores": valores, "erro": mensagem, "recusada_em": datetime.now()}
+                arquivo.write(json.dumps(registro, default=_serializar) + "\n")
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+    def _ler_diario(self):
+        if not os.path.exists(self.caminho_diario):
+            return []
+        pendentes = []
+        with open(self.caminho_diario, encoding="utf-8") as arquivo:
+            for numero, linha in enumerate(arquivo, 1):
+                try:
+                    sql, valores = json.loads(linha)
+                except ValueError:
+                    # Linha incompleta de uma execução interrompida durante a escrita no diário
+                    logging.warning(f"Linha {numero} do diário de escritas ignorada: {linha.strip()!r}")
+                    continue
+                pendentes.append((sql, tuple(valores)))
+        if pendentes:
+            logging.info(f"{len(pendentes)} escritas pendentes carregadas do diário {self.caminho_diario}")
+        return pendentes
+
+    def _reescrever_diario(self):
+        # Chamado com self._lock: o diário passa a conter apenas as escritas ainda na fila
+        if self._diario is None:
+            return
+        self._diario.close()
+        temporario = f"{self.caminho_diario}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            for sql, valores in self._pendentes:
+                arquivo.write(json.dumps([sql, valores], default=_serializar) + "\n")
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, self.caminho_diario)
+        self._diario = open(self.caminho_diario, "a", encoding="utf-8")
@@ -0,0 +1,167 @@
+from enum import IntEnum
+
+
+class TransicaoInvalida(ValueError):
+    """
+    Erro levantado quando uma mudança de estado não é permitida pela máquina de estados.
+    """
+
+
+class Estado(IntEnum):
+    """
+    Classe base dos estados codificados como inteiros.
+
+    Cada membro tem um código (o valor guardado no banco de dados, em uma coluna TINYINT) e um
+    rótulo, o texto exibido na interface e usado pelos modelos. Rótulos são reconhecidos sem
+    diferenciar maiúsculas, e cada enum pode aceitar grafias antigas em `APELIDOS`.
+
+    Attributes:
+        rotulo (str): Texto do estado.
+    """
+
+    def __new__(cls, codigo, rotulo):
+        membro = int.__new__(cls, codigo)
+        membro._value_ = codigo
+        membro.rotulo = rotulo
+        return membro
+
+    def __str__(self):
+        return self.rotulo
+
+    @classmethod
+    def de(cls, valor):
+        """
+        Converte um rótulo, um código ou um membro no membro correspondente.
+
+        Args:
+            valor (str | int | Estado): Valor a converter.
+
+        Returns:
+            Estado: Membro do enum.
+
+        Raises:
+            ValueError: Se o valor não corresponder a nenhum membro.
+        """
+        if isinstance(valor, cls):
+            return valor
+        if isinstance(valor, str):
+            membro = _POR_ROTULO[cls].get(valor.strip().lower())
+            if membro is None:
+                raise ValueError(f"{cls.__name__}: rótulo desconhecido {valor!r}")
+            return membro
+        return cls(valor)
+
+    @classmethod
+    def codigo(cls, valor):
+        """int: Retorna o código do valor (rótulo, código ou membro), ou None para None."""
+        return None if valor is None else int(cls.de(valor))
+
+    @classmethod
+    def rotulo_de(cls, valor):
+        """
+        Converte o valor lido do banco de dados no rótulo.
+
+        Códigos desconhecidos e valores que já são texto são devolvidos sem alteração.
+        """
+        return _ROTULO_POR_CODIGO[cls].get(valor, valor)
+
+
+class Urgencia(Estado):
+    """Nível de urgência do paciente e prioridade da tarefa, do mais para o menos urgente."""
+    EMERGENCIA = 1, 'Emergência'
+    ALTA = 2, 'Alta'
+    MEDIA = 3, 'Média'
+    BAIXA = 4, 'Baixa'
+
+
+class Transporte(Estado):
+    """Estado de transporte do paciente."""
+    AGUARDANDO = 1, 'Aguardando transporte'
+    EM_TRANSPORTE = 2, 'Em transporte'
+    CHEGOU = 3, 'Chegou ao destino'
+
+
+class StatusTarefa(Estado):
+    """Status da tarefa."""
+    PENDENTE = 0, 'pendente'
+    CONCLUIDA = 1, 'concluída'
+
+
+class StatusSolicitacao(Estado):
+    """Status da solicitação de transporte."""
+    PENDENTE = 0, 'pendente'
+    ACEITA = 1, 'aceita'
+    RECUSADA = 2, 'recusada'
+    CONCLUIDA = 3, 'concluída'
+
+
+# Grafias antigas ainda aceitas na leitura de rótulos (o esquema anterior usava 'concluído')
+APELIDOS = {
+    StatusSolicitacao: {'concluído': StatusSolicitacao.CONCLUIDA},
+}
+
+_POR_ROTULO = {
+    enum: {**{membro.rotulo.lower(): membro for membro in enum}, **APELIDOS.get(enum, {})}
+    for enum in (Urgencia, Transporte, StatusTarefa, StatusSolicitacao)
+}
+_ROTULO_POR_CODIGO = {enum: {int(membro): membro.rotulo for membro in enum} for enum in _POR_ROTULO}
+
+# Rótulos na ordem dos códigos, para listas de escolha na interface
+URGENCIAS = tuple(membro.rotulo for membro in Urgencia)
+TRANSPORTES = tuple(membro.rotulo for membro in Transporte)
+
+# Mudanças de estado permitidas: para cada estado, os estados que podem vir a seguir. Repetir o
+# estado de transporte é permitido (o paciente pode ser marcado de novo); tarefas e solicitações não.
+TRANSICOES = {
+    Transporte: {
+        Transporte.AGUARDANDO: {Transporte.AGUARDANDO, Transporte.EM_TRANSPORTE, Transporte.CHEGOU},
+        Transporte.EM_TRANSPORTE: {Transporte.EM_TRANSPORTE, Transporte.CHEGOU, Transporte.AGUARDANDO},
+        Transporte.CHEGOU: {Transporte.CHEGOU, Transporte.AGUARDANDO},
+    },
+    StatusTarefa: {
+        StatusTarefa.PENDENTE: {StatusTarefa.CONCLUIDA},
+        StatusTarefa.CONCLUIDA: set(),
+    },
+    StatusSolicitacao: {
+        StatusSolicitacao.PENDENTE: {StatusSolicitacao.ACEITA, StatusSolicitacao.RECUSADA, StatusSolicitacao.CONCLUIDA},
+        StatusSolicitacao.RECUSADA: {StatusSolicitacao.ACEITA, StatusSolicitacao.RECUSADA, StatusSolicitacao.CONCLUIDA},
+        StatusSolicitacao.ACEITA: {StatusSolicitacao.CONCLUIDA},
+        StatusSolicitacao.CONCLUIDA: set(),
+    },
+}
+
+
+def transicao_valida(atual, novo):
+    """
+    Verifica se a máquina de estados permite passar de `atual` para `novo`.
+
+    Args:
+        atual (Estado): Estado atual.
+        novo (Estado): Estado desejado, do mesmo enum.
+
+    Returns:
+        bool: True se a transição for permitida.
+    """
+    return novo in TRANSICOES[type(novo)][atual]
+
+
+def validar_transicao(atual, novo):
+    """
+    Levanta TransicaoInvalida se a máquina de estados não permitir passar de `atual` para `novo`.
+    """
+    if not transicao_valida(atual, novo):
+        raise TransicaoInvalida(f"{type(novo).__name__}: transição de {atual.rotulo!r} para {novo.rotulo!r} não permitida.")
+
+
+def origens(novo):
+    """
+    Retorna os estados a partir dos quais se pode chegar a `novo`, para o filtro de um UPDATE condicional.
+
+    Args:
+        novo (Estado): Estado desejado.
+
+    Returns:
+        str: Códigos separados por vírgula, prontos para uma cláusula IN, ou "NULL" se nenhum.
+    """
+    codigos = sorted(int(atual) for atual, seguintes in TRANSICOES[type(novo)].items() if novo in seguintes)
+    return ", ".join(map(str, codigos)) or "NULL"
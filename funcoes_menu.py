@@ -2,9 +2,16 @@ import tkinter as tk
 from tkinter import simpledialog, messagebox
 from models import Paciente, Tarefa, SolicitacaoTransporte, Incidente
 from validations import validar_cpf, obter_nivel_urgencia, obter_status_transporte
+from estados import StatusTarefa, StatusSolicitacao
 from datetime import datetime
 import logging
 
+# Número de itens carregados por vez nas telas de listagem
+TAMANHO_PAGINA = 100
+
+# Colunas das relações lidas pelas telas de listagem: apenas os nomes exibidos
+COLUNAS_LISTAGEM = {"paciente": ("nome",), "maqueiro": ()}
+COLUNAS_RELATORIO_INCIDENTES = {"paciente": ("nome",), "maqueiro": ("nome",)}
 
 # Funções de utilidade
 def obter_input(prompt, parent=None):
@@ -16,6 +23,30 @@ def obter_input(prompt, parent=None):
         return dialog.strip()
     return None
 
+def _consultar(acesso, chave, funcao, args, ao_concluir, ao_falhar):
+    """
+    Executa uma consulta ao banco de dados e entrega o resultado a `ao_concluir`.
+
+    Sem `acesso`, a consulta roda na própria thread da interface. Com `acesso`, roda no pool de
+    threads e o resultado volta à interface quando estiver pronto; uma nova consulta com a mesma
+    chave descarta o resultado da anterior.
+
+    Args:
+        acesso (AcessoAssincrono): Executor das consultas, ou None.
+        chave (str): Identifica a tela que fez a consulta.
+        funcao (callable): Método do banco de dados a ser chamado.
+        args (tuple): Argumentos da chamada.
+        ao_concluir (callable): Recebe o resultado da consulta.
+        ao_falhar (callable): Recebe a exceção, se a consulta ou a exibição falhar.
+    """
+    if acesso is not None:
+        acesso.executar(funcao, *args, chave=chave, ao_concluir=ao_concluir, ao_falhar=ao_falhar)
+        return
+    try:
+        ao_concluir(funcao(*args))
+    except Exception as e:
+        ao_falhar(e)
+
 # Funções de operações
 def cadastrar_paciente(db, pacientes, parent=None):
     """
@@ -59,13 +90,24 @@ def cadastrar_paciente(db, pacientes, parent=None):
         messagebox.showerror("Erro", "Ocorreu um erro ao cadastrar o paciente. Verifique os logs para mais detalhes.", parent=parent)
 
 
-def ver_status_pacientes(db, parent=None):
+def ver_status_pacientes(db, parent=None, acesso=None):
     """
     Exibe o status de todos os pacientes cadastrados na interface tkinter.
+
+    Os pacientes são carregados em páginas de TAMANHO_PAGINA; o botão "Carregar mais" busca a próxima.
+
+    Args:
+        db (Database): Instância do banco de dados.
+        parent (tk.Tk): Janela pai para as caixas de diálogo.
+        acesso (AcessoAssincrono): Se informado, as consultas rodam fora da thread da interface.
     """
-    try:
-        pacientes = db.listar_pacientes()
-        
+    def falhar(e):
+        logging.error(f"Erro ao exibir status dos pacientes: {e}")
+        messagebox.showerror("Erro", "Ocorreu um erro ao exibir o status dos pacientes. Verifique os logs para mais detalhes.", parent=parent)
+
+    def exibir(resultado):
+        pacientes, proxima = resultado
+
         if not pacientes:
             messagebox.showinfo("Informação", "Não há pacientes cadastrados.", parent=parent)
             return
@@ -87,18 +129,31 @@ def ver_status_pacientes(db, parent=None):
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
 
-        for paciente in pacientes:
-            paciente_info = f"ID: {paciente.id}\nNome: {paciente.nome}\nLocalização: {paciente.localizacao}\nCondição: {paciente.condicao}\nUrgência: {paciente.urgencia}\nStatus Transporte: {paciente.transporte}\n"
-            tk.Label(scrollable_frame, text=paciente_info, justify=tk.LEFT, anchor="w").pack(fill="x", padx=10, pady=5)
-            tk.Frame(scrollable_frame, height=2, bd=1, relief=tk.SUNKEN).pack(fill="x", padx=5, pady=5)
+        def mostrar(pacientes):
+            for paciente in pacientes:
+                paciente_info = f"ID: {paciente.id}\nNome: {paciente.nome}\nLocalização: {paciente.localizacao}\nCondição: {paciente.condicao}\nUrgência: {paciente.urgencia}\nStatus Transporte: {paciente.transporte}\n"
+                tk.Label(scrollable_frame, text=paciente_info, justify=tk.LEFT, anchor="w").pack(fill="x", padx=10, pady=5)
+                tk.Frame(scrollable_frame, height=2, bd=1, relief=tk.SUNKEN).pack(fill="x", padx=5, pady=5)
+
+        def anexar(resultado):
+            nonlocal proxima
+            pacientes, proxima = resultado
+            mostrar(pacientes)
+            if proxima is None:
+                botao_mais.pack_forget()
+
+        def carregar_mais():
+            _consultar(acesso, "status_pacientes", db.listar_pacientes_pagina, (TAMANHO_PAGINA, proxima), anexar, falhar)
+
+        mostrar(pacientes)
+        if proxima is not None:
+            botao_mais = tk.Button(root, text="Carregar mais", command=carregar_mais)
+            botao_mais.pack(side="bottom", fill="x")
 
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
-        root.mainloop()
-    except Exception as e:
-        logging.error(f"Erro ao exibir status dos pacientes: {e}")
-        messagebox.showerror("Erro", "Ocorreu um erro ao exibir o status dos pacientes. Verifique os logs para mais detalhes.", parent=parent)
+    _consultar(acesso, "status_pacientes", db.listar_pacientes_pagina, (TAMANHO_PAGINA,), exibir, falhar)
 
 def adicionar_tarefa(db, tarefas, maqueiro_logado, parent=None):
     """
@@ -112,7 +167,7 @@ def adicionar_tarefa(db, tarefas, maqueiro_logado, parent=None):
     """
     try:
         descricao = obter_input("Descrição da tarefa: ", parent=parent)
-        prioridade = obter_input("Prioridade da tarefa: ", parent=parent)
+        prioridade = obter_nivel_urgencia(parent)['nivel']
         cpf_paciente = obter_input("CPF do paciente: ", parent=parent)
         if not validar_cpf(cpf_paciente):
             messagebox.showerror("Erro", "CPF inválido. Tente novamente.", parent=parent)
@@ -146,20 +201,27 @@ def concluir_tarefa(db, tarefas, parent=None):
         if not tarefa:
             messagebox.showerror("Erro", "Tarefa não encontrada.", parent=parent)
             return
-        tarefa.status = 'concluída'
+        tarefa.status = StatusTarefa.CONCLUIDA.rotulo
         db.update_tarefa_status(tarefa.id, tarefa.status)
         messagebox.showinfo("Sucesso", f"Tarefa {tarefa.id} concluída com sucesso.", parent=parent)
     except Exception as e:
         logging.error(f"Erro ao concluir tarefa: {e}")
         messagebox.showerror("Erro", "Ocorreu um erro ao concluir a tarefa. Verifique os logs para mais detalhes.", parent=parent)
 
-def listar_tarefas_pendentes(db, parent=None):
+def listar_tarefas_pendentes(db, parent=None, acesso=None):
     """
     Lista todas as tarefas pendentes.
+
+    Args:
+        db (Database): Instância do banco de dados.
+        parent (tk.Tk): Janela pai para as caixas de diálogo.
+        acesso (AcessoAssincrono): Se informado, a consulta roda fora da thread da interface.
     """
-    try:
-        tarefas_pendentes = db.listar_tarefas_pendentes()
+    def falhar(e):
+        logging.error(f"Erro ao listar tarefas pendentes: {e}")
+        messagebox.showerror("Erro", "Ocorreu um erro ao listar as tarefas pendentes. Verifique os logs para mais detalhes.", parent=parent)
 
+    def exibir(tarefas_pendentes):
         if not tarefas_pendentes:
             messagebox.showinfo("Informação", "Não há tarefas pendentes, no momento.", parent=parent)
             return
@@ -169,9 +231,8 @@ def listar_tarefas_pendentes(db, parent=None):
             tarefas_text += f"ID: {tarefa.id}, Descrição: {tarefa.descricao}, Prioridade: {tarefa.prioridade}, Paciente: {tarefa.paciente.nome}, Localização: {tarefa.localizacao}\n"
 
         messagebox.showinfo("Tarefas Pendentes", tarefas_text, parent=parent)
-    except Exception as e:
-        logging.error(f"Erro ao listar tarefas pendentes: {e}")
-        messagebox.showerror("Erro", "Ocorreu um erro ao listar as tarefas pendentes. Verifique os logs para mais detalhes.", parent=parent)
+
+    _consultar(acesso, "tarefas_pendentes", db.listar_tarefas_pendentes, (False, COLUNAS_LISTAGEM), exibir, falhar)
 
 
 def relatar_incidente(db, maqueiro_logado, parent=None):
@@ -197,16 +258,24 @@ def relatar_incidente(db, maqueiro_logado, parent=None):
     db.insert_incidente(incidente)
     messagebox.showinfo("Sucesso", "Incidente registrado com sucesso.", parent=parent)
 
-def relatorio_de_incidentes(db, parent=None):
+def relatorio_de_incidentes(db, parent=None, acesso=None, incluir_arquivo=False):
     """
     Exibe um relatório de todos os incidentes registrados, ordenados do mais recente para o mais antigo.
 
+    Os incidentes são carregados em páginas de TAMANHO_PAGINA; o botão "Carregar mais" busca a próxima.
+
     Args:
         db (Database): Instância do banco de dados.
         parent (tk.Tk): Janela pai para as caixas de diálogo.
+        acesso (AcessoAssincrono): Se informado, as consultas rodam fora da thread da interface.
+        incluir_arquivo (bool): Se True, inclui os incidentes antigos movidos para o arquivo.
     """
-    try:
-        incidentes = db.listar_incidentes()
+    def falhar(e):
+        logging.error(f"Erro ao exibir relatório de incidentes: {e}")
+        messagebox.showerror("Erro", "Ocorreu um erro ao exibir o relatório de incidentes. Verifique os logs para mais detalhes.", parent=parent)
+
+    def exibir(resultado):
+        incidentes, proxima = resultado
 
         if not incidentes:
             messagebox.showinfo("Informação", "Não há incidentes registrados.", parent=parent)
@@ -229,23 +298,36 @@ def relatorio_de_incidentes(db, parent=None):
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
         canvas.configure(yscrollcommand=scrollbar.set)
 
-        for incidente in incidentes:
-            maqueiro = db.buscar_maqueiro_por_id(incidente.maqueiro.id)
-            paciente = db.buscar_paciente_por_id(incidente.paciente.id)
-            incidente_info = (f"Descrição: {incidente.descricao}\n"
-                              f"Maqueiro: {maqueiro.nome}\n"
-                              f"Paciente: {paciente.nome}\n"
-                              f"Data/Hora: {incidente.data_hora}\n")
-            tk.Label(scrollable_frame, text=incidente_info, justify=tk.LEFT, anchor="w").pack(fill="x", padx=10, pady=5)
-            tk.Frame(scrollable_frame, height=2, bd=1, relief=tk.SUNKEN).pack(fill="x", padx=5, pady=5)
+        def mostrar(incidentes):
+            for incidente in incidentes:
+                incidente_info = (f"Descrição: {incidente.descricao}\n"
+                                  f"Maqueiro: {incidente.maqueiro.nome}\n"
+                                  f"Paciente: {incidente.paciente.nome}\n"
+                                  f"Data/Hora: {incidente.data_hora}\n")
+                tk.Label(scrollable_frame, text=incidente_info, justify=tk.LEFT, anchor="w").pack(fill="x", padx=10, pady=5)
+                tk.Frame(scrollable_frame, height=2, bd=1, relief=tk.SUNKEN).pack(fill="x", padx=5, pady=5)
+
+        def anexar(resultado):
+            nonlocal proxima
+            incidentes, proxima = resultado
+            mostrar(incidentes)
+            if proxima is None:
+                botao_mais.pack_forget()
+
+        def carregar_mais():
+            _consultar(acesso, "relatorio_incidentes", db.listar_incidentes_pagina,
+                       (TAMANHO_PAGINA, proxima, incluir_arquivo, False, COLUNAS_RELATORIO_INCIDENTES), anexar, falhar)
+
+        mostrar(incidentes)
+        if proxima is not None:
+            botao_mais = tk.Button(root, text="Carregar mais", command=carregar_mais)
+            botao_mais.pack(side="bottom", fill="x")
 
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
 
-        root.mainloop()
-    except Exception as e:
-        logging.error(f"Erro ao exibir relatório de incidentes: {e}")
-        messagebox.showerror("Erro", "Ocorreu um erro ao exibir o relatório de incidentes. Verifique os logs para mais detalhes.", parent=parent)
+    _consultar(acesso, "relatorio_incidentes", db.listar_incidentes_pagina,
+               (TAMANHO_PAGINA, None, incluir_arquivo, False, COLUNAS_RELATORIO_INCIDENTES), exibir, falhar)
 
 
 def solicitar_transporte(db, maqueiro_logado, solicitacoes_transporte, parent=None):
@@ -278,17 +360,20 @@ def solicitar_transporte(db, maqueiro_logado, solicitacoes_transporte, parent=No
         logging.error(f"Erro ao solicitar transporte: {e}")
         messagebox.showerror("Erro", "Ocorreu um erro ao solicitar transporte. Verifique os logs para mais detalhes.", parent=parent)
 
-def ver_solicitacoes_transporte(db, parent=None):
+def ver_solicitacoes_transporte(db, parent=None, acesso=None):
     """
     Exibe todas as solicitações de transporte pendentes ou recusadas.
 
     Args:
         db (Database): Instância do banco de dados.
         parent (tk.Tk): Janela pai para as caixas de diálogo.
+        acesso (AcessoAssincrono): Se informado, a consulta roda fora da thread da interface.
     """
-    try:
-        solicitacoes_transporte = db.listar_solicitacoes_pendentes()
+    def falhar(e):
+        logging.error(f"Erro ao exibir solicitações de transporte: {e}")
+        messagebox.showerror("Erro", "Ocorreu um erro ao exibir as solicitações de transporte. Verifique os logs para mais detalhes.", parent=parent)
 
+    def exibir(solicitacoes_transporte):
         if not solicitacoes_transporte:
             messagebox.showinfo("Informação", "Não há solicitações de transporte pendentes ou recusadas, no momento.", parent=parent)
             return
@@ -298,9 +383,31 @@ def ver_solicitacoes_transporte(db, parent=None):
             solicitacoes_text += f"ID: {solicitacao.id}, Descrição: {solicitacao.descricao}, Paciente: {solicitacao.paciente.nome}, Status: {solicitacao.status}\n"
 
         messagebox.showinfo("Solicitações de Transporte", solicitacoes_text, parent=parent)
-    except Exception as e:
-        logging.error(f"Erro ao exibir solicitações de transporte: {e}")
-        messagebox.showerror("Erro", "Ocorreu um erro ao exibir as solicitações de transporte. Verifique os logs para mais detalhes.", parent=parent)
+
+    _consultar(acesso, "solicitacoes_transporte", db.listar_solicitacoes_pendentes, (False, COLUNAS_LISTAGEM), exibir, falhar)
+
+def sincronizar_solicitacoes(db, solicitacoes_transporte, marca):
+    """
+    Atualiza a lista de solicitações pendentes com as alterações feitas desde a marca, sem recarregá-la.
+
+    Args:
+        db (Database): Instância do banco de dados.
+        solicitacoes_transporte (list): Lista de solicitações pendentes ou recusadas, alterada no lugar.
+        marca (int): Marca da última sincronização (ou da carga da lista).
+
+    Returns:
+        int: Marca a informar na próxima sincronização.
+    """
+    while True:
+        alteracoes = db.alteracoes_desde(marca)
+        alteradas = {s.id: s for s in alteracoes.solicitacoes}
+        if alteradas:
+            solicitacoes_transporte[:] = [s for s in solicitacoes_transporte if s.id not in alteradas]
+            solicitacoes_transporte.extend(s for s in alteradas.values()
+                                           if StatusSolicitacao.de(s.status) in (StatusSolicitacao.PENDENTE, StatusSolicitacao.RECUSADA))
+        marca = alteracoes.marca
+        if alteracoes.completo:
+            return marca
 
 def aceitar_ou_recusar_solicitacao(db, solicitacoes_transporte, maqueiro_logado, parent=None):
     """
@@ -319,14 +426,28 @@ def aceitar_ou_recusar_solicitacao(db, solicitacoes_transporte, maqueiro_logado,
         return
     acao = obter_input("Deseja aceitar (A) ou recusar (R) a solicitação? ", parent)
     if acao.upper() == 'A':
-        solicitacao.status = 'aceita'
-        db.update_solicitacao_status(solicitacao.id, solicitacao.status, maqueiro_logado.id)
-        db.iniciar_transporte_paciente(solicitacao.paciente.id)
+        try:
+            with db.transaction():
+                # Outro maqueiro pode ter aceitado a solicitação depois que a lista foi carregada
+                aceita = db.reivindicar_solicitacao(solicitacao.id, maqueiro_logado.id)
+                if aceita:
+                    db.iniciar_transporte_paciente(solicitacao.paciente.id)
+        except Exception as e:
+            logging.error(f"Erro ao aceitar a solicitação {solicitacao.id}: {e}")
+            messagebox.showerror("Erro", "Não foi possível aceitar a solicitação. Tente novamente.", parent=parent)
+            return
+        if not aceita:
+            solicitacoes_transporte.remove(solicitacao)
+            messagebox.showerror("Erro", f"A solicitação {solicitacao.id} já foi aceita por outro maqueiro.", parent=parent)
+            return
+        solicitacao.status = StatusSolicitacao.ACEITA.rotulo
         exibir_detalhes_transporte(db, solicitacao, maqueiro_logado, parent)
         messagebox.showinfo("Sucesso", f"Solicitação {solicitacao.id} aceita com sucesso.", parent=parent)
     elif acao.upper() == 'R':
-        solicitacao.status = 'recusada'
-        db.update_solicitacao_status(solicitacao.id, solicitacao.status, maqueiro_logado.id)
+        if not db.update_solicitacao_status(solicitacao.id, StatusSolicitacao.RECUSADA.rotulo, maqueiro_logado.id):
+            messagebox.showerror("Erro", "Não foi possível recusar a solicitação. Tente novamente.", parent=parent)
+            return
+        solicitacao.status = StatusSolicitacao.RECUSADA.rotulo
         messagebox.showinfo("Sucesso", f"Solicitação {solicitacao.id} recusada com sucesso.", parent=parent)
     else:
         messagebox.showerror("Erro", "Ação inválida.", parent=parent)
@@ -343,8 +464,14 @@ def exibir_detalhes_transporte(db, solicitacao, maqueiro_logado, parent=None):
     """
     def finalizar_transporte():
         paciente_id = solicitacao.paciente.id
-        db.concluir_transporte_paciente(paciente_id)
-        db.atualizar_localizacao_paciente(paciente_id, nova_localizacao_entry.get())
+        try:
+            with db.transaction():
+                db.concluir_transporte_paciente(paciente_id)
+                db.atualizar_localizacao_paciente(paciente_id, nova_localizacao_entry.get())
+        except Exception as e:
+            logging.error(f"Erro ao finalizar transporte: {e}")
+            messagebox.showerror("Erro", "Não foi possível finalizar o transporte. Tente novamente.", parent=details_window)
+            return
         messagebox.showinfo("Sucesso", f"Transporte do paciente {solicitacao.paciente.nome} concluído com sucesso.", parent=details_window)
         details_window.destroy()
 
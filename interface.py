@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import messagebox, simpledialog
 from PIL import Image, ImageTk
 import funcoes_menu
+from acesso_assincrono import AcessoAssincrono
 import logging
 
 def exibir_menu(sistema_notificacoes, maqueiro_logado, pacientes, maqueiros, tarefas, db, root):
@@ -17,29 +18,39 @@ def exibir_menu(sistema_notificacoes, maqueiro_logado, pacientes, maqueiros, tar
         db (Database): Instância do banco de dados.
         root (tk.Tk): Instância da janela principal do Tkinter.
     """
+    # A marca é obtida antes da carga: o que mudar durante a carga chega na próxima sincronização
+    marca_solicitacoes = db.marca_alteracoes()
     solicitacoes_transporte = db.listar_solicitacoes_pendentes()
 
+    def mostrar_carregamento(carregando):
+        rotulo_carregando.config(text="Carregando..." if carregando else "")
+
+    # Consultas das telas de listagem rodam fora da thread da interface
+    acesso = AcessoAssincrono(root, max_workers=4, ao_mudar_carregamento=mostrar_carregamento)
+
     def chamar_funcao(opcao):
+        nonlocal marca_solicitacoes
         try:
             if opcao == 1:
                 funcoes_menu.cadastrar_paciente(db, pacientes, parent=root)
             elif opcao == 2:
-                funcoes_menu.ver_status_pacientes(db, parent=root)
+                funcoes_menu.ver_status_pacientes(db, parent=root, acesso=acesso)
             elif opcao == 3:
                 funcoes_menu.adicionar_tarefa(db, tarefas, maqueiro_logado, parent=root)
             elif opcao == 4:
                 funcoes_menu.concluir_tarefa(db, tarefas, parent=root)
             elif opcao == 5:
-                funcoes_menu.listar_tarefas_pendentes(db, parent=root)
+                funcoes_menu.listar_tarefas_pendentes(db, parent=root, acesso=acesso)
             elif opcao == 6:
                 funcoes_menu.relatar_incidente(db, maqueiro_logado, parent=root)
             elif opcao == 7:
-                funcoes_menu.relatorio_de_incidentes(db, parent=root)
+                funcoes_menu.relatorio_de_incidentes(db, parent=root, acesso=acesso, incluir_arquivo=True)
             elif opcao == 8:
                 funcoes_menu.solicitar_transporte(db, maqueiro_logado, solicitacoes_transporte, parent=root)
             elif opcao == 9:
-                funcoes_menu.ver_solicitacoes_transporte(db, parent=root)
+                funcoes_menu.ver_solicitacoes_transporte(db, parent=root, acesso=acesso)
             elif opcao == 10:
+                marca_solicitacoes = funcoes_menu.sincronizar_solicitacoes(db, solicitacoes_transporte, marca_solicitacoes)
                 funcoes_menu.aceitar_ou_recusar_solicitacao(db, solicitacoes_transporte, maqueiro_logado, parent=root)
             elif opcao == 0:
                 root.destroy()
@@ -111,11 +122,16 @@ def exibir_menu(sistema_notificacoes, maqueiro_logado, pacientes, maqueiros, tar
     for i, (text, opcao) in enumerate(botoes):
         tk.Button(frame_menu, text=text, command=lambda opcao=opcao: chamar_funcao(opcao)).grid(row=i+1, column=0, columnspan=2, sticky="ew", pady=5)
 
+    # Indicador exibido enquanto alguma consulta estiver em andamento
+    rotulo_carregando = tk.Label(frame_menu, text="", fg="gray", bg="white")
+    rotulo_carregando.grid(row=len(botoes) + 1, column=0, columnspan=2)
+
     # Configurar colunas para expandir igualmente
     frame_menu.grid_columnconfigure(0, weight=1)
     frame_menu.grid_columnconfigure(1, weight=1)
 
     root.mainloop()
+    acesso.encerrar()
 
 def input_senha(prompt):
     """
@@ -1,8 +1,14 @@
+import atexit
+import os
+import signal
 import tkinter as tk
 from tkinter import messagebox
 from PIL import Image, ImageTk
 from database import Database
+from modo_offline import ModoOffline
+from backends import BackendMySQL, BackendSQLite
 from notifications import SistemaDeNotificacoes
+from agendador import VarreduraPeriodica
 from interface import exibir_menu
 
 def realizar_login(db, root, frame_login):
@@ -20,8 +26,8 @@ def realizar_login(db, root, frame_login):
     login = login_entry.get()
     senha = senha_entry.get()
 
-    maqueiro = db.buscar_maqueiro_por_login(login)
-    if maqueiro and maqueiro.senha == senha:
+    maqueiro = db.autenticar(login, senha)
+    if maqueiro:
         messagebox.showinfo("Login", f"Bem-vindo, {maqueiro.nome}!")
         # Remove login frame
         frame_login.pack_forget()
@@ -38,8 +44,39 @@ def main():
     """
     global sistema_notificacoes, pacientes, maqueiros, tarefas, login_entry, senha_entry
     
-    db = Database('localhost', 'root', '', 'projeto_macas')
-    db.create_tables()
+    # Setores sem servidor MySQL podem usar um arquivo SQLite local (variável MACAS_SQLITE)
+    caminho_sqlite = os.environ.get('MACAS_SQLITE')
+    if caminho_sqlite:
+        db = Database(backend=BackendSQLite(caminho_sqlite), manter_resumo=True)
+    else:
+        # Réplicas de leitura opcionais, separadas por vírgula (variável MACAS_REPLICAS)
+        replicas = [BackendMySQL(host.strip(), 'root', '', 'projeto_macas')
+                    for host in os.environ.get('MACAS_REPLICAS', '').split(',') if host.strip()]
+        db = Database('localhost', 'root', '', 'projeto_macas', replicas=replicas, manter_resumo=True)
+    # Sem o servidor, as leituras vêm de uma cópia local e as escritas vão para um diário reaplicado na volta
+    modo_offline = ModoOffline(db, os.environ.get('MACAS_INSTANTANEO', 'instantaneo_macas.db'),
+                               os.environ.get('MACAS_DIARIO_OFFLINE', 'diario_offline.jsonl'))
+    modo_offline.create_tables()
+    # Estatísticas das consultas: gravadas ao sair e, no Linux, sob demanda com `kill -USR1 <pid>`
+    caminho_metricas = os.environ.get('MACAS_METRICAS', 'metricas_macas.json')
+    atexit.register(db.exportar_metricas, caminho_metricas)
+    if hasattr(signal, 'SIGUSR1'):
+        signal.signal(signal.SIGUSR1, lambda sinal, quadro: db.exportar_metricas(caminho_metricas))
+    # Incidentes são gravados em lotes; o diário local guarda os que ainda não chegaram ao banco
+    escritas = db.ativar_escrita_adiada(os.environ.get('MACAS_DIARIO', 'escritas_pendentes.jsonl'))
+    atexit.register(escritas.encerrar, 5)
+    # Atualiza o status dos transportes em segundo plano, sem bloquear a interface
+    varredura_transporte = VarreduraPeriodica(db.atualizar_status_transporte, intervalo=60.0, nome="varredura de transporte")
+    varredura_transporte.iniciar()
+    # Os contadores do despacho são ajustados a cada escrita; a recarga traz as escritas das outras estações
+    recarga_resumo = VarreduraPeriodica(db.recarregar_resumo, intervalo=30.0, nome="recarga do resumo do despacho")
+    recarga_resumo.iniciar()
+    # Move as solicitações concluídas e os incidentes antigos para as tabelas de arquivo
+    arquivamento = VarreduraPeriodica(db.arquivar, intervalo=3600.0, nome="arquivamento")
+    arquivamento.iniciar()
+    # Reaplica o diário offline quando o servidor volta e renova a cópia local
+    sincronizacao = VarreduraPeriodica(modo_offline.sincronizar, intervalo=60.0, nome="sincronização offline")
+    sincronizacao.iniciar()
     sistema_notificacoes = SistemaDeNotificacoes()
     pacientes = []
     maqueiros = []
@@ -77,10 +114,14 @@ def main():
     senha_entry = tk.Entry(frame_login, show="*")
     senha_entry.grid(row=1, column=1, padx=5, pady=5)
 
-    login_button = tk.Button(frame_login, text="Login", command=lambda: realizar_login(db, root, frame_login))
+    login_button = tk.Button(frame_login, text="Login", command=lambda: realizar_login(modo_offline, root, frame_login))
     login_button.grid(row=2, columnspan=2, pady=10)
 
     root.mainloop()
+    varredura_transporte.parar(timeout=5)
+    recarga_resumo.parar(timeout=5)
+    arquivamento.parar(timeout=5)
+    sincronizacao.parar(timeout=5)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,363 @@
+import functools
+import inspect
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+
+# Limites superiores, em segundos, das faixas do histograma de latência
+FAIXAS_LATENCIA = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+# Listas de parâmetros de tamanho variável, como IN (%s, %s, ...) ou VALUES (...), (...)
+_PARAMETROS_REPETIDOS = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)(?:\s*,\s*\(\s*%s(?:\s*,\s*%s)*\s*\))*")
+_ESPACOS = re.compile(r"\s+")
+
+
+def _rotulo_faixa(limite):
+    return f"<={limite * 1000:g}ms" if limite < 1 else f"<={limite:g}s"
+
+
+@functools.lru_cache(maxsize=1024)
+def normalizar_sql(sql):
+    """
+    Reduz um comando SQL a uma forma canônica, para agrupar execuções do mesmo comando.
+
+    Espaços repetidos são unidos e listas de parâmetros de tamanho variável viram `(%s, ...)`.
+
+    Args:
+        sql (str): Comando SQL.
+
+    Returns:
+        str: Comando normalizado.
+    """
+    sql = _ESPACOS.sub(" ", sql).strip()
+    return _PARAMETROS_REPETIDOS.sub("(%s, ...)", sql)
+
+
+class Estatistica:
+    """
+    Classe Estatistica com os contadores de um método ou comando SQL.
+
+    Attributes:
+        chamadas (int): Número de execuções.
+        erros (int): Número de execuções que falharam.
+        linhas (int): Total de linhas lidas do banco de dados.
+        tempo_total (float): Soma das durações, em segundos.
+        tempo_maximo (float): Maior duração, em segundos.
+        histograma (list): Número de execuções em cada faixa de FAIXAS_LATENCIA, mais uma faixa final
+            para as que passaram do último limite.
+    """
+
+    def __init__(self):
+        self.chamadas = 0
+        self.erros = 0
+        self.linhas = 0
+        self.tempo_total = 0.0
+        self.tempo_maximo = 0.0
+        self.histograma = [0] * (len(FAIXAS_LATENCIA) + 1)
+
+    def registrar(self, duracao, linhas=0, erros=0):
+        self.chamadas += 1
+        self.erros += erros
+        self.linhas += linhas
+        self.tempo_total += duracao
+        self.tempo_maximo = max(self.tempo_maximo, duracao)
+        for indice, limite in enumerate(FAIXAS_LATENCIA):
+            if duracao <= limite:
+                break
+        else:
+            indice = len(FAIXAS_LATENCIA)
+        self.histograma[indice] += 1
+
+    def como_dict(self):
+        """
+        Returns:
+            dict: Contadores, tempo médio e histograma com as faixas rotuladas.
+        """
+        histograma = {_rotulo_faixa(limite): n for limite, n in zip(FAIXAS_LATENCIA, self.histograma)}
+        histograma[f">{FAIXAS_LATENCIA[-1]:g}s"] = self.histograma[-1]
+        return {
+            "chamadas": self.chamadas,
+            "erros": self.erros,
+            "linhas": self.linhas,
+            "tempo_total": self.tempo_total,
+            "tempo_medio": self.tempo_total / self.chamadas if self.chamadas else 0.0,
+            "tempo_maximo": self.tempo_maximo,
+            "histograma": histograma,
+        }
+
+
+class Instrumentacao:
+    """
+    Classe Instrumentacao que mede as chamadas aos métodos de Database e os comandos SQL executados.
+
+    Para cada método e cada comando são registrados o número de chamadas, de erros e de linhas lidas,
+    além de um histograma de latência. Execuções que demoram pelo menos `limite_lento` segundos são
+    registradas no log como lentas.
+
+    Attributes:
+        limite_lento (float): Duração, em segundos, a partir da qual uma execução é considerada lenta
+            (None desativa o log de consultas lentas).
+        consultas_lentas (deque): Últimas execuções lentas registradas.
+    """
+
+    def __init__(self, limite_lento=0.5, tamanho_historico=100):
+        """
+        Inicializa os contadores vazios.
+
+        Args:
+            limite_lento (float): Duração, em segundos, a partir da qual uma execução é considerada lenta.
+            tamanho_historico (int): Número de execuções lentas mantidas em memória.
+        """
+        self.limite_lento = limite_lento
+        self.consultas_lentas = deque(maxlen=tamanho_historico)
+        self._metodos = {}
+        self._comandos = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def medir(self, nome, funcao, *args, **kwargs):
+        """
+        Executa `funcao(*args, **kwargs)` registrando a duração em nome do método informado.
+
+        As linhas lidas e os erros dos comandos SQL executados durante a chamada são somados ao método.
+
+        Args:
+            nome (str): Nome do método.
+            funcao (callable): Função a ser executada.
+
+        Returns:
+            object: Retorno da função.
+        """
+        pilha = self._pilha()
+        pilha.append([0, 0])
+        inicio = time.perf_counter()
+        falhou = False
+        try:
+            return funcao(*args, **kwargs)
+        except BaseException:
+            falhou = True
+            raise
+        finally:
+            duracao = time.perf_counter() - inicio
+            linhas, erros = pilha.pop()
+            erros = max(erros, int(falhou))
+            if pilha:
+                pilha[-1][0] += linhas
+                pilha[-1][1] += erros
+            self._registrar(self._metodos, nome, duracao, linhas, erros)
+            self._verificar_lentidao("método", nome, duracao)
+
+    def medir_gerador(self, nome, gerador):
+        """
+        Percorre um gerador registrando, em nome do método, a duração total e os itens produzidos.
+
+        Args:
+            nome (str): Nome do método.
+            gerador (generator): Gerador retornado pelo método.
+
+        Yields:
+            object: Os itens do gerador.
+        """
+        inicio = time.perf_counter()
+        itens = 0
+        erros = 0
+        try:
+            for item in gerador:
+                itens += 1
+                yield item
+        except BaseException:
+            erros = 1
+            raise
+        finally:
+            duracao = time.perf_counter() - inicio
+            self._registrar(self._metodos, nome, duracao, itens, erros)
+            self._verificar_lentidao("método", nome, duracao)
+
+    def registrar_comando(self, sql, duracao, erro=False):
+        """
+        Registra a execução de um comando SQL.
+
+        Args:
+            sql (str): Comando executado.
+            duracao (float): Duração, em segundos.
+            erro (bool): Se True, o comando falhou.
+        """
+        sql = normalizar_sql(sql)
+        self._registrar(self._comandos, sql, duracao, 0, int(erro))
+        pilha = self._pilha()
+        if pilha and erro:
+            pilha[-1][1] += 1
+        self._verificar_lentidao("consulta", sql, duracao)
+
+    def registrar_linhas(self, sql, linhas):
+        """
+        Soma as linhas lidas de um comando SQL já registrado.
+
+        Args:
+            sql (str): Comando que produziu as linhas.
+            linhas (int): Número de linhas lidas.
+        """
+        if not linhas:
+            return
+        sql = normalizar_sql(sql)
+        with self._lock:
+            estatistica = self._comandos.get(sql)
+            if estatistica is not None:
+                estatistica.linhas += linhas
+        pilha = self._pilha()
+        if pilha:
+            pilha[-1][0] += linhas
+
+    def relatorio(self):
+        """
+        Retorna as estatísticas acumuladas.
+
+        Returns:
+            dict: Estatísticas por método e por comando SQL, ordenadas pelo tempo total, e as
+                últimas execuções lentas.
+        """
+        with self._lock:
+            def ordenar(estatisticas):
+                itens = sorted(estatisticas.items(), key=lambda item: item[1].tempo_total, reverse=True)
+                return {nome: estatistica.como_dict() for nome, estatistica in itens}
+            return {
+                "gerado_em": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "limite_lento": self.limite_lento,
+                "metodos": ordenar(self._metodos),
+                "comandos": ordenar(self._comandos),
+                "consultas_lentas": list(self.consultas_lentas),
+            }
+
+    def exportar(self, caminho):
+        """
+        Grava as estatísticas acumuladas em um arquivo JSON.
+
+        Args:
+            caminho (str): Caminho do arquivo.
+        """
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            json.dump(self.relatorio(), arquivo, ensure_ascii=False, indent=2)
+
+    def zerar(self):
+        """
+        Descarta todas as estatísticas acumuladas.
+        """
+        with self._lock:
+            self._metodos.clear()
+            self._comandos.clear()
+            self.consultas_lentas.clear()
+
+    def _pilha(self):
+        pilha = getattr(self._local, "pilha", None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def _registrar(self, estatisticas, nome, duracao, linhas, erros):
+        with self._lock:
+            estatistica = estatisticas.get(nome)
+            if estatistica is None:
+                estatistica = estatisticas[nome] = Estatistica()
+            estatistica.registrar(duracao, linhas, erros)
+
+    def _verificar_lentidao(self, tipo, nome, duracao):
+        if self.limite_lento is None or duracao < self.limite_lento:
+            return
+        logging.warning(f"{tipo.capitalize()} lento ({duracao * 1000:.1f} ms): {nome}")
+        self.consultas_lentas.append({
+            "tipo": tipo,
+            "nome": nome,
+            "duracao": duracao,
+            "horario": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+
+
+class CursorInstrumentado:
+    """
+    Envolve um cursor, registrando na instrumentação a duração de cada comando e as linhas lidas.
+
+    Os demais atributos (lastrowid, rowcount, description...) são repassados ao cursor original.
+    """
+
+    def __init__(self, cursor, instrumentacao):
+        self._cursor = cursor
+        self._instrumentacao = instrumentacao
+        self._sql = None
+
+    def execute(self, sql, *args, **kwargs):
+        return self._executar(self._cursor.execute, sql, args, kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._executar(self._cursor.executemany, sql, args, kwargs)
+
+    def fetchone(self):
+        linha = self._cursor.fetchone()
+        if linha is not None:
+            self._instrumentacao.registrar_linhas(self._sql, 1)
+        return linha
+
+    def fetchmany(self, size=1):
+        linhas = self._cursor.fetchmany(size)
+        self._instrumentacao.registrar_linhas(self._sql, len(linhas))
+        return linhas
+
+    def fetchall(self):
+        linhas = self._cursor.fetchall()
+        self._instrumentacao.registrar_linhas(self._sql, len(linhas))
+        return linhas
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+    def _executar(self, executar, sql, args, kwargs):
+        self._sql = sql
+        inicio = time.perf_counter()
+        erro = False
+        try:
+            return executar(sql, *args, **kwargs)
+        except BaseException:
+            erro = True
+            raise
+        finally:
+            self._instrumentacao.registrar_comando(sql, time.perf_counter() - inicio, erro)
+
+
+def _instrumentado(nome, funcao):
+    if inspect.isgeneratorfunction(funcao):
+        @functools.wraps(funcao)
+        def gerador(self, *args, **kwargs):
+            instrumentacao = getattr(self, "instrumentacao", None)
+            if instrumentacao is None:
+                return funcao(self, *args, **kwargs)
+            return instrumentacao.medir_gerador(nome, funcao(self, *args, **kwargs))
+        return gerador
+
+    @functools.wraps(funcao)
+    def metodo(self, *args, **kwargs):
+        instrumentacao = getattr(self, "instrumentacao", None)
+        if instrumentacao is None:
+            return funcao(self, *args, **kwargs)
+        return instrumentacao.medir(nome, funcao, self, *args, **kwargs)
+    return metodo
+
+
+def instrumentar_metodos(ignorar=()):
+    """
+    Decorador de classe que mede os métodos públicos com a instrumentação do objeto (`self.instrumentacao`).
+
+    Args:
+        ignorar (tuple): Nomes dos métodos que não devem ser medidos.
+
+    Returns:
+        callable: Decorador que recebe e retorna a classe.
+    """
+    def decorar(classe):
+        for nome, funcao in list(vars(classe).items()):
+            if nome.startswith("_") or nome in ignorar or not inspect.isfunction(funcao):
+                continue
+            setattr(classe, nome, _instrumentado(nome, funcao))
+        return classe
+    return decorar
@@ -0,0 +1,578 @@
+import unicodedata
+from datetime import datetime
+
+from backends import ERROS_SQL
+from estados import Urgencia, Transporte, StatusTarefa, StatusSolicitacao, APELIDOS
+
+
+class ErroMigracao(Exception):
+    """
+    Erro levantado quando uma migração encontra dados que não consegue converter sem perdê-los.
+    """
+
+
+# Índices secundários que acompanham os filtros e ordenações mais usados
+INDICES = {
+    "Pacientes": {
+        "idx_pacientes_condicao": "(condicao, inicio_transporte)",
+        "idx_pacientes_urgencia": "(urgencia, id)",
+    },
+    "Tarefas": {
+        "idx_tarefas_status": "(status, maqueiro_id)",
+    },
+    "Incidentes": {
+        "idx_incidentes_data_hora": "(data_hora)",
+    },
+    "SolicitacoesTransporte": {
+        "idx_solicitacoes_status": "(status, data_hora)",
+        "idx_solicitacoes_paciente": "(paciente_id, status)",
+    },
+}
+
+# Colunas que deixaram de ser VARCHAR e passaram a ENUM
+COLUNAS_ENUM = {
+    ("Tarefas", "prioridade"): "ENUM('Emergência', 'Alta', 'Média', 'Baixa')",
+    ("Tarefas", "status"): "ENUM('pendente', 'concluída') DEFAULT 'pendente'",
+    ("SolicitacoesTransporte", "status"): "ENUM('pendente', 'aceita', 'recusada', 'concluído') DEFAULT 'pendente'",
+}
+
+# Grafias livres de bancos antigos, além dos rótulos e dos apelidos de estados.py; as versões sem
+# acento de todas elas também são reconhecidas (ver `_grafias`)
+GRAFIAS_ANTIGAS = {
+    StatusTarefa: {'concluído': StatusTarefa.CONCLUIDA, 'concluido': StatusTarefa.CONCLUIDA},
+    StatusSolicitacao: {'aceito': StatusSolicitacao.ACEITA, 'recusado': StatusSolicitacao.RECUSADA},
+}
+
+
+class Migracao:
+    """
+    Classe Migracao com uma alteração do esquema, identificada por um número de versão.
+
+    Attributes:
+        versao (int): Número da versão do esquema após a migração.
+        descricao (str): Descrição da alteração.
+        passos (dict): Para cada backend ('mysql', 'sqlite'), uma lista de comandos SQL ou uma função
+            que recebe o cursor e aplica a alteração.
+    """
+
+    def __init__(self, versao, descricao, **passos):
+        self.versao = versao
+        self.descricao = descricao
+        self.passos = passos
+
+    def aplicar(self, backend, cursor):
+        """
+        Aplica a migração com o SQL do backend informado.
+
+        Args:
+            backend (BackendMySQL | BackendSQLite): Backend em uso.
+            cursor: Cursor da conexão em uso.
+        """
+        passos = self.passos[backend.nome]
+        if callable(passos):
+            passos(cursor)
+            return
+        for sql in passos:
+            cursor.execute(sql)
+
+
+def _indices_mysql(cursor):
+    """
+    Cria os índices secundários que ainda não existem, consultando o information_schema.
+    """
+    for tabela, indices in INDICES.items():
+        cursor.execute(
+            "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (tabela,)
+        )
+        existentes = {row[0] for row in cursor.fetchall()}
+        for nome, colunas in indices.items():
+            if nome not in existentes:
+                cursor.execute(f"CREATE INDEX {nome} ON {tabela} {colunas}")
+
+
+def _sem_acentos(texto):
+    return "".join(c for c in unicodedata.normalize("NFKD", texto) if not unicodedata.combining(c))
+
+
+def _grafias(enum):
+    """
+    Retorna as grafias reconhecidas de cada membro do enum, em minúsculas: rótulos, apelidos,
+    grafias antigas e as versões sem acento de todas elas.
+    """
+    grafias = {membro.rotulo.lower(): membro for membro in enum}
+    grafias.update(APELIDOS.get(enum, {}))
+    grafias.update(GRAFIAS_ANTIGAS.get(enum, {}))
+    for grafia, membro in list(grafias.items()):
+        grafias.setdefault(_sem_acentos(grafia), membro)
+    return grafias
+
+
+def _traduzir(coluna, valores):
+    """
+    Retorna a expressão SQL que troca cada grafia da coluna pelo valor SQL correspondente.
+
+    As grafias são comparadas sem diferenciar maiúsculas e sem espaços nas pontas; as demais
+    ficam nulas (ver `_verificar_conversao`).
+    """
+    casos = " ".join(f"WHEN '{grafia}' THEN {valor}" for grafia, valor in valores.items())
+    return f"CASE LOWER(TRIM({coluna})) {casos} ELSE NULL END"
+
+
+def _verificar_conversao(cursor, tabela, coluna, expressao):
+    """
+    Levanta ErroMigracao se a coluna tiver valores que a expressão de conversão não reconhece.
+
+    A mensagem lista cada valor e os IDs das linhas em que ele aparece, para que sejam corrigidos
+    antes de a migração ser tentada de novo: nenhum valor é descartado em silêncio.
+    """
+    cursor.execute(f"SELECT id, {coluna} FROM {tabela} WHERE {coluna} IS NOT NULL AND ({expressao}) IS NULL ORDER BY id")
+    linhas = cursor.fetchall()
+    if not linhas:
+        return
+    ids_por_valor = {}
+    for id, valor in linhas:
+        ids_por_valor.setdefault(valor, []).append(id)
+    detalhes = "; ".join(f"{valor!r} nos IDs {', '.join(map(str, ids[:20]))}{' e outros' if len(ids) > 20 else ''}"
+                         for valor, ids in ids_por_valor.items())
+    raise ErroMigracao(f"{tabela}.{coluna} tem {len(linhas)} valor(es) sem correspondência: {detalhes}. "
+                       "Corrija-os e reinicie a aplicação para concluir a migração.")
+
+
+def _enums_mysql(cursor):
+    """
+    Converte para ENUM as colunas de status e prioridade de bancos criados como VARCHAR.
+
+    As grafias conhecidas de cada estado passam para o rótulo do ENUM. Se sobrar algum valor
+    desconhecido, a migração é interrompida antes de alterar qualquer coluna (ver `_verificar_conversao`).
+    """
+    conversoes = []
+    for (tabela, coluna), tipo in COLUNAS_ENUM.items():
+        cursor.execute(
+            "SELECT DATA_TYPE FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+            (tabela, coluna)
+        )
+        linha = cursor.fetchone()
+        if linha and linha[0].lower() != 'enum':
+            grafias = _grafias(COLUNAS_CODIFICADAS[(tabela, coluna)][0])
+            rotulos = {grafias[rotulo.lower()]: rotulo
+                       for rotulo in tipo[tipo.index('(') + 2:tipo.index(')') - 1].split("', '")}
+            expressao = _traduzir(coluna, {grafia: f"'{rotulos[membro]}'" for grafia, membro in grafias.items()})
+            _verificar_conversao(cursor, tabela, coluna, expressao)
+            conversoes.append((tabela, coluna, tipo, expressao))
+    for tabela, coluna, tipo, expressao in conversoes:
+        cursor.execute(f"UPDATE {tabela} SET {coluna} = {expressao} WHERE {coluna} IS NOT NULL")
+        cursor.execute(f"ALTER TABLE {tabela} MODIFY {coluna} {tipo}")
+
+
+TABELAS_MYSQL = [
+    """
+    CREATE TABLE IF NOT EXISTS Pacientes (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        nome VARCHAR(100),
+        cpf VARCHAR(11) UNIQUE,
+        localizacao VARCHAR(100),
+        condicao VARCHAR(100),
+        urgencia ENUM('Emergência', 'Alta', 'Média', 'Baixa'),
+        transporte ENUM('Aguardando transporte', 'Em transporte', 'Chegou ao destino') DEFAULT 'Aguardando transporte',
+        inicio_transporte DATETIME
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS Maqueiros (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        nome VARCHAR(100),
+        coren VARCHAR(12) UNIQUE,
+        data_nascimento DATE,
+        sexo ENUM('M', 'F'),
+        login VARCHAR(50) UNIQUE,
+        senha VARCHAR(100)
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS Tarefas (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        descricao VARCHAR(255),
+        prioridade ENUM('Emergência', 'Alta', 'Média', 'Baixa'),
+        status ENUM('pendente', 'concluída') DEFAULT 'pendente',
+        paciente_id INT,
+        localizacao VARCHAR(100),
+        maqueiro_id INT,
+        FOREIGN KEY (paciente_id) REFERENCES Pacientes(id),
+        FOREIGN KEY (maqueiro_id) REFERENCES Maqueiros(id)
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS Incidentes (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        descricao VARCHAR(255),
+        maqueiro_id INT,
+        paciente_id INT,
+        data_hora DATETIME,
+        FOREIGN KEY (maqueiro_id) REFERENCES Maqueiros(id),
+        FOREIGN KEY (paciente_id) REFERENCES Pacientes(id)
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS SolicitacoesTransporte (
+        id INT PRIMARY KEY AUTO_INCREMENT,
+        descricao VARCHAR(255),
+        paciente_id INT,
+        status ENUM('pendente', 'aceita', 'recusada', 'concluído') DEFAULT 'pendente',
+        maqueiro_id INT,
+        data_hora DATETIME,
+        FOREIGN KEY (paciente_id) REFERENCES Pacientes(id),
+        FOREIGN KEY (maqueiro_id) REFERENCES Maqueiros(id)
+    )""",
+]
+
+# Os ENUMs do MySQL viram colunas de texto com CHECK e comparação sem diferenciar maiúsculas
+TABELAS_SQLITE = [
+    """
+    CREATE TABLE IF NOT EXISTS Pacientes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome VARCHAR(100),
+        cpf VARCHAR(11) UNIQUE,
+        localizacao VARCHAR(100),
+        condicao VARCHAR(100) COLLATE NOCASE,
+        urgencia TEXT COLLATE NOCASE CHECK (urgencia IN ('Emergência', 'Alta', 'Média', 'Baixa')),
+        transporte TEXT COLLATE NOCASE DEFAULT 'Aguardando transporte'
+            CHECK (transporte IN ('Aguardando transporte', 'Em transporte', 'Chegou ao destino')),
+        inicio_transporte DATETIME
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS Maqueiros (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nome VARCHAR(100),
+        coren VARCHAR(12) UNIQUE,
+        data_nascimento DATE,
+        sexo TEXT CHECK (sexo IN ('M', 'F')),
+        login VARCHAR(50) UNIQUE,
+        senha VARCHAR(100)
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS Tarefas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        descricao VARCHAR(255),
+        prioridade TEXT COLLATE NOCASE CHECK (prioridade IN ('Emergência', 'Alta', 'Média', 'Baixa')),
+        status TEXT COLLATE NOCASE DEFAULT 'pendente' CHECK (status IN ('pendente', 'concluída')),
+        paciente_id INTEGER REFERENCES Pacientes(id),
+        localizacao VARCHAR(100),
+        maqueiro_id INTEGER REFERENCES Maqueiros(id)
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS Incidentes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        descricao VARCHAR(255),
+        maqueiro_id INTEGER REFERENCES Maqueiros(id),
+        paciente_id INTEGER REFERENCES Pacientes(id),
+        data_hora DATETIME
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS SolicitacoesTransporte (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        descricao VARCHAR(255),
+        paciente_id INTEGER REFERENCES Pacientes(id),
+        status TEXT COLLATE NOCASE DEFAULT 'pendente' CHECK (status IN ('pendente', 'aceita', 'recusada', 'concluído')),
+        maqueiro_id INTEGER REFERENCES Maqueiros(id),
+        data_hora DATETIME
+    )""",
+]
+
+# Tabelas de arquivo com as solicitações concluídas e os incidentes antigos. A coluna mes (AAAAMM)
+# particiona o arquivo do MySQL por mês; os IDs são os mesmos das tabelas de origem.
+TABELAS_ARQUIVO_MYSQL = [
+    """
+    CREATE TABLE IF NOT EXISTS SolicitacoesTransporteArquivo (
+        id INT NOT NULL,
+        descricao VARCHAR(255),
+        paciente_id INT,
+        status VARCHAR(20),
+        maqueiro_id INT,
+        data_hora DATETIME,
+        mes INT NOT NULL,
+        arquivado_em DATETIME,
+        PRIMARY KEY (id, mes),
+        INDEX idx_solicitacoes_arquivo_paciente (paciente_id)
+    ) PARTITION BY RANGE (mes) (PARTITION p_futuro VALUES LESS THAN MAXVALUE)""",
+    """
+    CREATE TABLE IF NOT EXISTS IncidentesArquivo (
+        id INT NOT NULL,
+        descricao VARCHAR(255),
+        maqueiro_id INT,
+        paciente_id INT,
+        data_hora DATETIME,
+        mes INT NOT NULL,
+        arquivado_em DATETIME,
+        PRIMARY KEY (id, mes),
+        INDEX idx_incidentes_arquivo_data_hora (data_hora)
+    ) PARTITION BY RANGE (mes) (PARTITION p_futuro VALUES LESS THAN MAXVALUE)""",
+]
+
+TABELAS_ARQUIVO_SQLITE = [
+    """
+    CREATE TABLE IF NOT EXISTS SolicitacoesTransporteArquivo (
+        id INTEGER PRIMARY KEY,
+        descricao VARCHAR(255),
+        paciente_id INTEGER,
+        status TEXT COLLATE NOCASE,
+        maqueiro_id INTEGER,
+        data_hora DATETIME,
+        mes INTEGER NOT NULL,
+        arquivado_em DATETIME
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS IncidentesArquivo (
+        id INTEGER PRIMARY KEY,
+        descricao VARCHAR(255),
+        maqueiro_id INTEGER,
+        paciente_id INTEGER,
+        data_hora DATETIME,
+        mes INTEGER NOT NULL,
+        arquivado_em DATETIME
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_solicitacoes_arquivo_mes ON SolicitacoesTransporteArquivo (mes)",
+    "CREATE INDEX IF NOT EXISTS idx_solicitacoes_arquivo_paciente ON SolicitacoesTransporteArquivo (paciente_id)",
+    "CREATE INDEX IF NOT EXISTS idx_incidentes_arquivo_mes ON IncidentesArquivo (mes)",
+    "CREATE INDEX IF NOT EXISTS idx_incidentes_arquivo_data_hora ON IncidentesArquivo (data_hora)",
+]
+
+# Colunas cuja alteração avança a sequência de alterações de cada tabela acompanhada
+COLUNAS_RASTREADAS = {
+    "Pacientes": "nome, cpf, localizacao, condicao, urgencia, transporte, inicio_transporte",
+    "Tarefas": "descricao, prioridade, status, paciente_id, localizacao, maqueiro_id",
+    "SolicitacoesTransporte": "descricao, paciente_id, status, maqueiro_id, data_hora",
+}
+
+
+def _gatilhos_mysql(tabela):
+    # O LAST_INSERT_ID() do gatilho volta ao valor anterior quando ele termina. O registro guarda
+    # SYSDATE(), o momento em que a seq é gerada, e não o início do comando (NOW()), que pode ser
+    # anterior ao de uma transação que reservou uma seq menor
+    return [
+        f"CREATE TRIGGER trg_{tabela.lower()}_seq_{evento.lower()} BEFORE {evento} ON {tabela} FOR EACH ROW BEGIN "
+        f"INSERT INTO RegistroAlteracoes (tabela, registrada_em) VALUES ('{tabela}', SYSDATE()); "
+        "SET NEW.seq = LAST_INSERT_ID(), NEW.atualizado_em = NOW(); "
+        "END"
+        for evento in ("INSERT", "UPDATE")
+    ]
+
+
+def _sequencia_mysql(cursor):
+    """
+    Cria o registro de alterações, as colunas seq e atualizado_em e os gatilhos que as preenchem.
+
+    Cada escrita insere uma linha no registro e copia a seq gerada pelo AUTO_INCREMENT para a linha
+    alterada. O AUTO_INCREMENT não bloqueia nenhuma linha compartilhada até o commit, ao contrário de
+    um contador atualizado pelo gatilho, que serializaria todas as escritas e causaria deadlocks entre
+    transações que alteram pacientes e solicitações em ordens diferentes. As seqs podem ficar visíveis
+    fora de ordem; as lacunas são tratadas por quem lê (ver `Database.alteracoes_desde`).
+    """
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS RegistroAlteracoes ("
+        "seq BIGINT AUTO_INCREMENT PRIMARY KEY, tabela VARCHAR(40) NOT NULL, registrada_em DATETIME NOT NULL)"
+    )
+    for tabela in COLUNAS_RASTREADAS:
+        cursor.execute(
+            "SELECT COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = 'seq'",
+            (tabela,)
+        )
+        if cursor.fetchone() is None:
+            cursor.execute(f"ALTER TABLE {tabela} ADD COLUMN seq BIGINT NOT NULL DEFAULT 0, "
+                           f"ADD COLUMN atualizado_em DATETIME, ADD INDEX idx_{tabela.lower()}_seq (seq)")
+        for evento in ("insert", "update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{tabela.lower()}_seq_{evento}")
+        for sql in _gatilhos_mysql(tabela):
+            cursor.execute(sql)
+
+
+def _gatilhos_sqlite(tabela):
+    # O gatilho de UPDATE só observa as colunas rastreadas, por isso não dispara com o próprio UPDATE
+    # de seq. Dentro do gatilho, last_insert_rowid() é a linha inserida no registro
+    atualizar = (
+        f"BEGIN INSERT INTO RegistroAlteracoes (tabela, registrada_em) VALUES ('{tabela}', datetime('now', 'localtime')); "
+        f"UPDATE {tabela} SET seq = last_insert_rowid(), "
+        "atualizado_em = datetime('now', 'localtime') WHERE id = NEW.id; END"
+    )
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS trg_{tabela.lower()}_seq_insert AFTER INSERT ON {tabela} {atualizar}",
+        f"CREATE TRIGGER IF NOT EXISTS trg_{tabela.lower()}_seq_update AFTER UPDATE OF {COLUNAS_RASTREADAS[tabela]} ON {tabela} {atualizar}",
+    ]
+
+
+def _sequencia_sqlite():
+    comandos = [
+        "CREATE TABLE IF NOT EXISTS RegistroAlteracoes ("
+        "seq INTEGER PRIMARY KEY AUTOINCREMENT, tabela TEXT NOT NULL, registrada_em DATETIME NOT NULL)",
+    ]
+    for tabela in COLUNAS_RASTREADAS:
+        comandos += [
+            f"ALTER TABLE {tabela} ADD COLUMN seq INTEGER NOT NULL DEFAULT 0",
+            f"ALTER TABLE {tabela} ADD COLUMN atualizado_em DATETIME",
+            f"CREATE INDEX IF NOT EXISTS idx_{tabela.lower()}_seq ON {tabela} (seq)",
+        ] + _gatilhos_sqlite(tabela)
+    return comandos
+
+
+# Colunas de estado guardadas como códigos inteiros (ver estados.py), com o enum e o valor padrão
+COLUNAS_CODIFICADAS = {
+    ("Pacientes", "urgencia"): (Urgencia, None),
+    ("Pacientes", "transporte"): (Transporte, Transporte.AGUARDANDO),
+    ("Tarefas", "prioridade"): (Urgencia, None),
+    ("Tarefas", "status"): (StatusTarefa, StatusTarefa.PENDENTE),
+    ("SolicitacoesTransporte", "status"): (StatusSolicitacao, StatusSolicitacao.PENDENTE),
+    ("SolicitacoesTransporteArquivo", "status"): (StatusSolicitacao, None),
+}
+
+
+def _codificar(coluna, enum):
+    """
+    Retorna a expressão SQL que converte o rótulo guardado na coluna no código do enum.
+
+    Rótulos são reconhecidos como em `_grafias` e códigos já convertidos são mantidos; os valores
+    desconhecidos são verificados antes (ver `_verificar_conversao`).
+    """
+    grafias = _grafias(enum)
+    grafias.update({f"{membro:d}": membro for membro in enum})
+    return _traduzir(coluna, {grafia: f"{membro:d}" for grafia, membro in grafias.items()})
+
+
+def _codigos_mysql(cursor):
+    """
+    Converte as colunas de estado de ENUM ou VARCHAR para TINYINT, preservando os índices.
+
+    Se alguma coluna tiver um valor desconhecido, a migração é interrompida antes de qualquer
+    alteração, com os valores e os IDs das linhas na mensagem de ErroMigracao. Os gatilhos da
+    sequência de alterações ficam desligados durante a conversão.
+    """
+    pendentes = []
+    for (tabela, coluna), (enum, padrao) in COLUNAS_CODIFICADAS.items():
+        cursor.execute(
+            "SELECT DATA_TYPE FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+            (tabela, coluna)
+        )
+        linha = cursor.fetchone()
+        if not linha or linha[0].lower() == 'tinyint':
+            continue
+        _verificar_conversao(cursor, tabela, coluna, _codificar(coluna, enum))
+        pendentes.append((tabela, coluna, enum, padrao))
+    # Sem os gatilhos, o UPDATE da conversão não gera uma alteração para cada linha convertida. Eles
+    # são recriados mesmo sem colunas pendentes, caso uma tentativa anterior tenha parado no meio
+    for tabela in COLUNAS_RASTREADAS:
+        for evento in ("insert", "update"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_{tabela.lower()}_seq_{evento}")
+    for tabela, coluna, enum, padrao in pendentes:
+        tipo = "TINYINT" if padrao is None else f"TINYINT DEFAULT {padrao:d}"
+        # Texto livre primeiro, para que o ENUM aceite os códigos durante a conversão
+        cursor.execute(f"ALTER TABLE {tabela} MODIFY {coluna} VARCHAR(40)")
+        cursor.execute(f"UPDATE {tabela} SET {coluna} = {_codificar(coluna, enum)}")
+        cursor.execute(f"ALTER TABLE {tabela} MODIFY {coluna} {tipo}")
+    for tabela in COLUNAS_RASTREADAS:
+        for sql in _gatilhos_mysql(tabela):
+            cursor.execute(sql)
+
+
+def _codigos_sqlite(cursor):
+    """
+    Recria as colunas de estado como INTEGER, depois de verificar que todos os valores são conhecidos.
+    """
+    for (tabela, coluna), (enum, _) in COLUNAS_CODIFICADAS.items():
+        _verificar_conversao(cursor, tabela, coluna, _codificar(coluna, enum))
+    for sql in _comandos_codigos_sqlite():
+        cursor.execute(sql)
+
+
+def _comandos_codigos_sqlite():
+    # O SQLite não altera o tipo de uma coluna: cada uma é recriada como INTEGER. Os índices e
+    # gatilhos que citam as colunas são removidos antes e recriados depois.
+    indices = {nome: (tabela, colunas) for tabela, nomes in INDICES.items() for nome, colunas in nomes.items()
+               if any((tabela, coluna) in COLUNAS_CODIFICADAS for coluna in colunas.strip("()").split(", "))}
+    comandos = [f"DROP INDEX IF EXISTS {nome}" for nome in indices]
+    for tabela in COLUNAS_RASTREADAS:
+        comandos += [f"DROP TRIGGER IF EXISTS trg_{tabela.lower()}_seq_insert",
+                     f"DROP TRIGGER IF EXISTS trg_{tabela.lower()}_seq_update"]
+    for (tabela, coluna), (enum, padrao) in COLUNAS_CODIFICADAS.items():
+        padrao = "" if padrao is None else f" DEFAULT {padrao:d}"
+        comandos += [
+            f"ALTER TABLE {tabela} ADD COLUMN {coluna}_codigo INTEGER{padrao}",
+            f"UPDATE {tabela} SET {coluna}_codigo = {_codificar(coluna, enum)}",
+            f"ALTER TABLE {tabela} DROP COLUMN {coluna}",
+            f"ALTER TABLE {tabela} RENAME COLUMN {coluna}_codigo TO {coluna}",
+        ]
+    comandos += [f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} {colunas}" for nome, (tabela, colunas) in indices.items()]
+    for tabela in COLUNAS_RASTREADAS:
+        comandos += _gatilhos_sqlite(tabela)
+    return comandos
+
+
+# Migrações em ordem crescente de versão. Novas alterações do esquema entram no final da lista,
+# nunca alterando uma migração que já foi publicada.
+MIGRACOES = [
+    Migracao(1, "Tabelas iniciais", mysql=TABELAS_MYSQL, sqlite=TABELAS_SQLITE),
+    Migracao(2, "Colunas de status e prioridade como ENUM", mysql=_enums_mysql, sqlite=[]),
+    Migracao(
+        3, "Índices secundários",
+        mysql=_indices_mysql,
+        sqlite=[f"CREATE INDEX IF NOT EXISTS {nome} ON {tabela} {colunas}"
+                for tabela, indices in INDICES.items() for nome, colunas in indices.items()]
+    ),
+    Migracao(4, "Tabelas de arquivo", mysql=TABELAS_ARQUIVO_MYSQL, sqlite=TABELAS_ARQUIVO_SQLITE),
+    Migracao(5, "Sequência de alterações", mysql=_sequencia_mysql, sqlite=_sequencia_sqlite()),
+    Migracao(6, "Colunas de estado como códigos inteiros", mysql=_codigos_mysql, sqlite=_codigos_sqlite),
+]
+
+VERSAO_ATUAL = MIGRACOES[-1].versao
+
+
+def versao_do_esquema(cursor):
+    """
+    Retorna a versão do esquema registrada no banco de dados.
+
+    Args:
+        cursor: Cursor da conexão em uso.
+
+    Returns:
+        int: Última versão aplicada, ou 0 se o banco ainda não tiver a tabela SchemaVersion.
+    """
+    try:
+        cursor.execute("SELECT MAX(versao) FROM SchemaVersion")
+    except ERROS_SQL:
+        return 0
+    linha = cursor.fetchone()
+    return (linha[0] or 0) if linha else 0
+
+
+def aplicar_migracoes(backend, cursor, migracoes=MIGRACOES):
+    """
+    Aplica, em ordem, as migrações ainda não registradas na tabela SchemaVersion.
+
+    Bancos criados antes do controle de versão passam por todas as migrações, que não alteram o
+    que já existir. Duas estações iniciando ao mesmo tempo não aplicam a mesma migração duas vezes.
+
+    Args:
+        backend (BackendMySQL | BackendSQLite): Backend em uso.
+        cursor: Cursor da conexão em uso.
+        migracoes (list): Migrações em ordem crescente de versão.
+
+    Returns:
+        int: Versão do esquema após as migrações.
+    """
+    backend.bloquear_migracoes(cursor)
+    try:
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS SchemaVersion ("
+            "versao INT PRIMARY KEY, descricao VARCHAR(255), aplicada_em DATETIME)"
+        )
+        # Outra estação pode ter migrado enquanto esta aguardava o bloqueio
+        versao = versao_do_esquema(cursor)
+        for migracao in migracoes:
+            if migracao.versao <= versao:
+                continue
+            migracao.aplicar(backend, cursor)
+            cursor.execute(
+                "INSERT INTO SchemaVersion (versao, descricao, aplicada_em) VALUES (%s, %s, %s)",
+                (migracao.versao, migracao.descricao, datetime.now())
+            )
+            versao = migracao.versao
+            print(f"Migração {migracao.versao} aplicada: {migracao.descricao}")
+    except BaseException:
+        backend.liberar_migracoes(cursor, sucesso=False)
+        raise
+    backend.liberar_migracoes(cursor, sucesso=True)
+    return versao
@@ -1,5 +1,18 @@
 from datetime import datetime
 
+from estados import Urgencia, Transporte, StatusTarefa, StatusSolicitacao
+from relacoes import resolver
+
+# Conversão dos códigos lidos do banco de dados nos rótulos, feita em cada linha montada pelos
+# de_linha: o `get` de um dicionário custa bem menos que Estado.rotulo_de. Valores que não são
+# códigos (rótulos, None) passam sem alteração, como em rotulo_de.
+_URGENCIA = {int(membro): membro.rotulo for membro in Urgencia}.get
+_TRANSPORTE = {int(membro): membro.rotulo for membro in Transporte}.get
+_STATUS_TAREFA = {int(membro): membro.rotulo for membro in StatusTarefa}.get
+_STATUS_SOLICITACAO = {int(membro): membro.rotulo for membro in StatusSolicitacao}.get
+# Os de_linha montam um objeto por linha lida; chamar object.__new__ direto evita a busca por cls.__new__
+_novo = object.__new__
+
 class Usuario:
     """
     Classe usuário no sistema.
@@ -9,6 +22,8 @@ class Usuario:
         nome (str): Nome do usuário.
         tipo (str): Tipo do usuário ('maqueiro' ou 'administrador').
     """
+    __slots__ = ('_id', '_nome', '_tipo')
+
     def __init__(self, id, nome, tipo):
         self._id = id
         self._nome = nome
@@ -53,7 +68,13 @@ class Paciente:
         condicao (str): Condição do paciente.
         transporte (str): Status de transporte do paciente.
         urgencia (str): Nível de urgência do paciente.
+        inicio_transporte (datetime): Início do transporte em andamento, ou None.
+
+    Os modelos usam __slots__: sem um __dict__ por objeto, cada instância ocupa menos memória,
+    o que pesa nas listas de milhares de linhas montadas pelo banco de dados.
     """
+    __slots__ = ('_id', '_nome', '_cpf', '_localizacao', '_condicao', '_transporte', '_urgencia', '_inicio_transporte')
+
     def __init__(self, nome, cpf, localizacao, condicao, transporte, urgencia=None):
         self._id = None
         self._nome = nome
@@ -62,6 +83,35 @@ class Paciente:
         self._condicao = condicao
         self._transporte = transporte
         self._urgencia = urgencia
+        self._inicio_transporte = None
+
+    @classmethod
+    def de_linha(cls, linha):
+        """
+        Monta um paciente a partir de uma linha do banco de dados, sem passar pelo __init__.
+
+        Args:
+            linha (tuple): Valores de id, nome, cpf, localizacao, condicao, transporte e,
+                opcionalmente, urgencia e inicio_transporte. Urgência e transporte podem vir como
+                códigos (ver estados.py) e são convertidos nos rótulos.
+
+        Returns:
+            Paciente: Objeto paciente.
+        """
+        paciente = _novo(cls)
+        # Desempacotar a linha de uma vez é mais rápido que indexar coluna por coluna
+        if len(linha) == 8:
+            paciente._id, paciente._nome, paciente._cpf, paciente._localizacao, paciente._condicao, transporte, urgencia, \
+                paciente._inicio_transporte = linha
+        elif len(linha) == 7:
+            paciente._id, paciente._nome, paciente._cpf, paciente._localizacao, paciente._condicao, transporte, urgencia = linha
+            paciente._inicio_transporte = None
+        else:
+            paciente._id, paciente._nome, paciente._cpf, paciente._localizacao, paciente._condicao, transporte = linha
+            urgencia = paciente._inicio_transporte = None
+        paciente._transporte = _TRANSPORTE(transporte, transporte)
+        paciente._urgencia = _URGENCIA(urgencia, urgencia)
+        return paciente
 
     @property
     def id(self):
@@ -98,6 +148,11 @@ class Paciente:
         """str: Retorna o nível de urgência do paciente."""
         return self._urgencia
 
+    @property
+    def inicio_transporte(self):
+        """datetime: Retorna o início do transporte em andamento, ou None."""
+        return self._inicio_transporte
+
     @id.setter
     def id(self, id):
         self._id = id
@@ -126,6 +181,10 @@ class Paciente:
     def urgencia(self, urgencia):
         self._urgencia = urgencia
 
+    @inicio_transporte.setter
+    def inicio_transporte(self, inicio_transporte):
+        self._inicio_transporte = inicio_transporte
+
     def definir_id(self, id):
         """Define o ID do paciente."""
         self.id = id
@@ -136,12 +195,12 @@ class Paciente:
 
     def iniciar_transporte(self):
         """Inicia o transporte do paciente."""
-        self.transporte = 'Em transporte'
+        self.transporte = Transporte.EM_TRANSPORTE.rotulo
         self._inicio_transporte = datetime.now()
 
     def finalizar_transporte(self):
         """Finaliza o transporte do paciente."""
-        self.transporte = 'Chegou ao destino'
+        self.transporte = Transporte.CHEGOU.rotulo
 
 class Maqueiro(Usuario):
     """
@@ -151,8 +210,12 @@ class Maqueiro(Usuario):
         coren (str): COREN do maqueiro.
         data_nascimento (str): Data de nascimento do maqueiro.
         sexo (str): Sexo do maqueiro.
-        tarefas (list): Lista de tarefas atribuídas ao maqueiro.
+        login (str): Login do maqueiro.
+        senha (str): Senha do maqueiro.
+        tarefas (list): Lista de tarefas atribuídas ao maqueiro, criada no primeiro acesso.
     """
+    __slots__ = ('_coren', '_data_nascimento', '_sexo', '_login', '_senha', '_tarefas')
+
     def __init__(self, id, nome, coren, data_nascimento, sexo):
         super().__init__(id, nome, 'maqueiro')
         self._coren = coren
@@ -160,7 +223,31 @@ class Maqueiro(Usuario):
         self._sexo = sexo
         self._login = None
         self._senha = None
-        self._tarefas = []
+        self._tarefas = None
+
+    @classmethod
+    def de_linha(cls, linha):
+        """
+        Monta um maqueiro a partir de uma linha do banco de dados, sem passar pelo __init__.
+
+        Args:
+            linha (tuple): Valores de id, nome, coren, data_nascimento, sexo, login e, opcionalmente,
+                senha (lida apenas na autenticação).
+
+        Returns:
+            Maqueiro: Objeto maqueiro.
+        """
+        maqueiro = _novo(cls)
+        maqueiro._id = linha[0]
+        maqueiro._nome = linha[1]
+        maqueiro._tipo = 'maqueiro'
+        maqueiro._coren = linha[2]
+        maqueiro._data_nascimento = linha[3]
+        maqueiro._sexo = linha[4]
+        maqueiro._login = linha[5]
+        maqueiro._senha = linha[6] if len(linha) > 6 else None
+        maqueiro._tarefas = None
+        return maqueiro
 
     @property
     def coren(self):
@@ -177,9 +264,21 @@ class Maqueiro(Usuario):
         """str: Retorna o sexo do maqueiro."""
         return self._sexo
 
+    @property
+    def login(self):
+        """str: Retorna o login do maqueiro."""
+        return self._login
+
+    @property
+    def senha(self):
+        """str: Retorna a senha do maqueiro."""
+        return self._senha
+
     @property
     def tarefas(self):
         """list: Retorna a lista de tarefas atribuídas ao maqueiro."""
+        if self._tarefas is None:
+            self._tarefas = []
         return self._tarefas
 
     @coren.setter
@@ -194,6 +293,14 @@ class Maqueiro(Usuario):
     def sexo(self, sexo):
         self._sexo = sexo
 
+    @login.setter
+    def login(self, login):
+        self._login = login
+
+    @senha.setter
+    def senha(self, senha):
+        self._senha = senha
+
     def adicionar_tarefa(self, tarefa):
         """Adiciona uma tarefa à lista de tarefas do maqueiro."""
         self.tarefas.append(tarefa)
@@ -210,16 +317,45 @@ class Tarefa:
         paciente (Paciente): Paciente relacionado à tarefa.
         localizacao (str): Localização da tarefa.
         maqueiro (Maqueiro): Maqueiro atribuído à tarefa.
+
+    Nas listagens preguiçosas, paciente e maqueiro começam como referências (relacoes.Referencia)
+    e só são carregados no primeiro acesso; `paciente_id` e `maqueiro_id` não os carregam.
     """
+    __slots__ = ('_id', '_descricao', '_prioridade', '_status', '_paciente', '_localizacao', '_maqueiro')
+
     def __init__(self, id, descricao, prioridade, paciente, localizacao, maqueiro):
         self._id = id
         self._descricao = descricao
         self._prioridade = prioridade
-        self._status = 'pendente'
+        self._status = StatusTarefa.PENDENTE.rotulo
         self._paciente = paciente
         self._localizacao = localizacao
         self._maqueiro = maqueiro
 
+    @classmethod
+    def de_linha(cls, linha, paciente, maqueiro, status=StatusTarefa.PENDENTE.rotulo):
+        """
+        Monta uma tarefa a partir de uma linha do banco de dados, sem passar pelo __init__.
+
+        Args:
+            linha (tuple): Valores de id, descricao, prioridade e localizacao nas primeiras colunas.
+            paciente (Paciente): Paciente relacionado à tarefa.
+            maqueiro (Maqueiro): Maqueiro atribuído à tarefa.
+            status (str | int): Status da tarefa, como rótulo ou código.
+
+        Returns:
+            Tarefa: Objeto tarefa.
+        """
+        tarefa = _novo(cls)
+        tarefa._id = linha[0]
+        tarefa._descricao = linha[1]
+        tarefa._prioridade = _URGENCIA(linha[2], linha[2])
+        tarefa._localizacao = linha[3]
+        tarefa._status = _STATUS_TAREFA(status, status)
+        tarefa._paciente = paciente
+        tarefa._maqueiro = maqueiro
+        return tarefa
+
     @property
     def id(self):
         """int: Retorna o ID da tarefa."""
@@ -242,9 +378,15 @@ class Tarefa:
 
     @property
     def paciente(self):
-        """Paciente: Retorna o paciente relacionado à tarefa."""
+        """Paciente: Retorna o paciente relacionado à tarefa, carregando-o no primeiro acesso se for uma referência."""
+        self._paciente = resolver(self._paciente)
         return self._paciente
 
+    @property
+    def paciente_id(self):
+        """int: Retorna o ID do paciente, sem carregá-lo."""
+        return self._paciente.id if self._paciente is not None else None
+
     @property
     def localizacao(self):
         """str: Retorna a localização da tarefa."""
@@ -252,9 +394,15 @@ class Tarefa:
 
     @property
     def maqueiro(self):
-        """Maqueiro: Retorna o maqueiro atribuído à tarefa."""
+        """Maqueiro: Retorna o maqueiro atribuído à tarefa, carregando-o no primeiro acesso se for uma referência."""
+        self._maqueiro = resolver(self._maqueiro)
         return self._maqueiro
 
+    @property
+    def maqueiro_id(self):
+        """int: Retorna o ID do maqueiro, sem carregá-lo."""
+        return self._maqueiro.id if self._maqueiro is not None else None
+
     @id.setter
     def id(self, id):
         self._id = id
@@ -294,7 +442,12 @@ class Incidente:
         paciente (Paciente): Paciente relacionado ao incidente.
         data_hora (str): Data e hora do incidente.
         status (str): Status do incidente.
+
+    Nas listagens preguiçosas, maqueiro e paciente começam como referências (relacoes.Referencia)
+    e só são carregados no primeiro acesso; `maqueiro_id` e `paciente_id` não os carregam.
     """
+    __slots__ = ('_id', '_descricao', '_maqueiro', '_paciente', '_data_hora', '_status')
+
     def __init__(self, id, descricao, maqueiro, paciente, data_hora):
         self._id = id
         self._descricao = descricao
@@ -303,6 +456,28 @@ class Incidente:
         self._data_hora = data_hora
         self._status = 'pendente'
 
+    @classmethod
+    def de_linha(cls, linha, maqueiro, paciente):
+        """
+        Monta um incidente a partir de uma linha do banco de dados, sem passar pelo __init__.
+
+        Args:
+            linha (tuple): Valores de id, descricao e data_hora nas primeiras colunas.
+            maqueiro (Maqueiro): Maqueiro envolvido no incidente.
+            paciente (Paciente): Paciente relacionado ao incidente.
+
+        Returns:
+            Incidente: Objeto incidente.
+        """
+        incidente = _novo(cls)
+        incidente._id = linha[0]
+        incidente._descricao = linha[1]
+        incidente._data_hora = linha[2]
+        incidente._maqueiro = maqueiro
+        incidente._paciente = paciente
+        incidente._status = 'pendente'
+        return incidente
+
     @property
     def id(self):
         """int: Retorna o ID do incidente."""
@@ -315,14 +490,26 @@ class Incidente:
 
     @property
     def maqueiro(self):
-        """Maqueiro: Retorna o maqueiro envolvido no incidente."""
+        """Maqueiro: Retorna o maqueiro envolvido no incidente, carregando-o no primeiro acesso se for uma referência."""
+        self._maqueiro = resolver(self._maqueiro)
         return self._maqueiro
 
+    @property
+    def maqueiro_id(self):
+        """int: Retorna o ID do maqueiro, sem carregá-lo."""
+        return self._maqueiro.id if self._maqueiro is not None else None
+
     @property
     def paciente(self):
-        """Paciente: Retorna o paciente relacionado ao incidente."""
+        """Paciente: Retorna o paciente relacionado ao incidente, carregando-o no primeiro acesso se for uma referência."""
+        self._paciente = resolver(self._paciente)
         return self._paciente
 
+    @property
+    def paciente_id(self):
+        """int: Retorna o ID do paciente, sem carregá-lo."""
+        return self._paciente.id if self._paciente is not None else None
+
     @property
     def data_hora(self):
         """str: Retorna a data e hora do incidente."""
@@ -368,14 +555,41 @@ class SolicitacaoTransporte:
         data_hora (str): Data e hora da solicitação.
         maqueiro (Maqueiro): Maqueiro atribuído à solicitação.
         status (str): Status da solicitação.
+
+    Nas listagens preguiçosas, paciente e maqueiro começam como referências (relacoes.Referencia)
+    e só são carregados no primeiro acesso; `paciente_id` e `maqueiro_id` não os carregam.
     """
+    __slots__ = ('_id', '_descricao', '_paciente', '_data_hora', '_maqueiro', '_status')
+
     def __init__(self, id, descricao, paciente, data_hora, maqueiro):
         self._id = id
         self._descricao = descricao
         self._paciente = paciente
         self._data_hora = data_hora
         self._maqueiro = maqueiro
-        self._status = 'pendente'
+        self._status = StatusSolicitacao.PENDENTE.rotulo
+
+    @classmethod
+    def de_linha(cls, linha, paciente, maqueiro):
+        """
+        Monta uma solicitação a partir de uma linha do banco de dados, sem passar pelo __init__.
+
+        Args:
+            linha (tuple): Valores de id, descricao, status (rótulo ou código) e data_hora nas primeiras colunas.
+            paciente (Paciente): Paciente relacionado à solicitação.
+            maqueiro (Maqueiro): Maqueiro atribuído à solicitação.
+
+        Returns:
+            SolicitacaoTransporte: Objeto solicitação de transporte.
+        """
+        solicitacao = _novo(cls)
+        solicitacao._id = linha[0]
+        solicitacao._descricao = linha[1]
+        solicitacao._status = _STATUS_SOLICITACAO(linha[2], linha[2])
+        solicitacao._data_hora = linha[3]
+        solicitacao._paciente = paciente
+        solicitacao._maqueiro = maqueiro
+        return solicitacao
 
     @property
     def id(self):
@@ -389,9 +603,15 @@ class SolicitacaoTransporte:
 
     @property
     def paciente(self):
-        """Paciente: Retorna o paciente relacionado à solicitação."""
+        """Paciente: Retorna o paciente relacionado à solicitação, carregando-o no primeiro acesso se for uma referência."""
+        self._paciente = resolver(self._paciente)
         return self._paciente
 
+    @property
+    def paciente_id(self):
+        """int: Retorna o ID do paciente, sem carregá-lo."""
+        return self._paciente.id if self._paciente is not None else None
+
     @property
     def data_hora(self):
         """str: Retorna a data e hora da solicitação."""
@@ -399,9 +619,15 @@ class SolicitacaoTransporte:
 
     @property
     def maqueiro(self):
-        """Maqueiro: Retorna o maqueiro atribuído à solicitação."""
+        """Maqueiro: Retorna o maqueiro atribuído à solicitação, carregando-o no primeiro acesso se for uma referência."""
+        self._maqueiro = resolver(self._maqueiro)
         return self._maqueiro
 
+    @property
+    def maqueiro_id(self):
+        """int: Retorna o ID do maqueiro, sem carregá-lo."""
+        return self._maqueiro.id if self._maqueiro is not None else None
+
     @property
     def status(self):
         """str: Retorna o status da solicitação de transporte."""
@@ -0,0 +1,436 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+from backends import BackendSQLite
+from database import Database, ERROS_BANCO
+from models import Paciente, Maqueiro, Tarefa, Incidente, SolicitacaoTransporte
+
+
+def _paciente(id):
+    if id is None:
+        return None
+    paciente = Paciente(None, None, None, None, None)
+    paciente.definir_id(id)
+    return paciente
+
+
+def _maqueiro(id):
+    return Maqueiro(id, None, None, None, None) if id is not None else None
+
+
+def _tarefa(dados):
+    tarefa = Tarefa(None, dados["descricao"], dados["prioridade"], _paciente(dados["paciente_id"]),
+                    dados["localizacao"], _maqueiro(dados["maqueiro_id"]))
+    tarefa.status = dados["status"]
+    return tarefa
+
+
+def _solicitacao(dados):
+    solicitacao = SolicitacaoTransporte(None, dados["descricao"], _paciente(dados["paciente_id"]),
+                                        dados["data_hora"], _maqueiro(dados["maqueiro_id"]))
+    solicitacao.status = dados["status"]
+    return solicitacao
+
+
+def _id(objeto):
+    return objeto.id if objeto is not None else None
+
+
+# Inserções aceitas offline: tabela criada (None quando o método não devolve o ID, pois nenhuma
+# outra linha referencia a inserida), como gravar o objeto no diário e como remontá-lo
+INSERCOES = {
+    "insert_paciente": (
+        "Pacientes",
+        lambda p: {"nome": p.nome, "cpf": p.cpf, "localizacao": p.localizacao, "condicao": p.condicao,
+                   "transporte": p.transporte, "urgencia": p.urgencia},
+        lambda d: Paciente(d["nome"], d["cpf"], d["localizacao"], d["condicao"], d["transporte"], d["urgencia"]),
+    ),
+    "insert_tarefa": (
+        "Tarefas",
+        lambda t: {"descricao": t.descricao, "prioridade": t.prioridade, "status": t.status,
+                   "paciente_id": _id(t.paciente), "localizacao": t.localizacao, "maqueiro_id": _id(t.maqueiro)},
+        _tarefa,
+    ),
+    "insert_incidente": (
+        None,
+        lambda i: {"descricao": i.descricao, "maqueiro_id": _id(i.maqueiro), "paciente_id": _id(i.paciente),
+                   "data_hora": i.data_hora},
+        lambda d: Incidente(None, d["descricao"], _maqueiro(d["maqueiro_id"]), _paciente(d["paciente_id"]), d["data_hora"]),
+    ),
+    "insert_solicitacao_transporte": (
+        "SolicitacoesTransporte",
+        lambda s: {"descricao": s.descricao, "paciente_id": _id(s.paciente), "status": s.status,
+                   "maqueiro_id": _id(s.maqueiro), "data_hora": s.data_hora},
+        _solicitacao,
+    ),
+}
+
+# Tabela referenciada por cada campo de ID dos objetos inseridos
+REFERENCIAS = {"paciente_id": "Pacientes", "maqueiro_id": "Maqueiros"}
+
+# Atualizações aceitas offline: tabela do ID no primeiro argumento, colunas cujo valor anterior
+# detecta conflitos (None: o próprio método informa o conflito) e outros argumentos que são IDs
+ATUALIZACOES = {
+    "update_tarefa_status": ("Tarefas", "status", {}),
+    "update_solicitacao_status": ("SolicitacoesTransporte", "status", {2: "Maqueiros"}),
+    "reivindicar_solicitacao": ("SolicitacoesTransporte", None, {1: "Maqueiros"}),
+    "iniciar_transporte_paciente": ("Pacientes", "condicao, transporte", {}),
+    "concluir_transporte_paciente": ("Pacientes", "transporte", {}),
+    "atualizar_transporte_paciente": ("Pacientes", "transporte", {}),
+    "atualizar_localizacao_paciente": ("Pacientes", "localizacao", {}),
+}
+
+
+def _normalizar(linha):
+    # Valores comparados como texto, para que o que foi lido do diário (JSON) e do banco coincidam
+    if linha is None:
+        return None
+    return [None if valor is None else str(valor) for valor in linha]
+
+
+class Conflito(Exception):
+    """
+    Erro levantado quando uma operação do diário offline não pode ser reaplicada no servidor porque
+    o registro foi alterado por outra estação durante a queda.
+    """
+
+
+class ModoOffline:
+    """
+    Classe ModoOffline que mantém o despacho funcionando quando o servidor do banco de dados está inacessível.
+
+    Oferece os mesmos métodos da classe Database. Com o servidor disponível, tudo vai ao banco
+    principal. Quando uma operação falha por falta de conexão, o sistema passa ao modo offline:
+    as leituras vêm do instantâneo local (um arquivo SQLite com a última cópia das tabelas ativas) e
+    as escritas são aplicadas ao instantâneo e registradas em um diário local, somente de acréscimo.
+
+    `sincronizar`, chamado periodicamente, reaplica o diário no servidor em lotes assim que ele volta,
+    na ordem original e com as transações preservadas. Antes de cada atualização, o valor atual do
+    registro no servidor é comparado com o valor que a estação via ao fazer a alteração: se outra
+    estação o alterou nesse meio tempo, a operação (e o restante da sua transação) não é aplicada e
+    fica registrada em `conflitos` e no arquivo `<diario>.conflitos`, para conferência manual.
+
+    Attributes:
+        primario (Database): Banco de dados principal.
+        instantaneo (Database): Cópia local das tabelas ativas, usada no modo offline.
+        caminho_diario (str): Caminho do diário das escritas feitas offline.
+        tamanho_lote (int): Número de transações do diário reaplicadas por lote.
+        online (bool): False enquanto o servidor estiver inacessível ou o diário não tiver sido reaplicado.
+        conflitos (list): Operações não reaplicadas, como dicionários com a operação e o motivo.
+    """
+
+    def __init__(self, primario, caminho_instantaneo, caminho_diario, tamanho_lote=100):
+        """
+        Abre o instantâneo local e verifica se o servidor está disponível.
+
+        Args:
+            primario (Database): Banco de dados principal.
+            caminho_instantaneo (str): Caminho do arquivo SQLite com a cópia local das tabelas.
+            caminho_diario (str): Caminho do diário das escritas feitas offline.
+            tamanho_lote (int): Número de transações do diário reaplicadas por lote.
+        """
+        self.primario = primario
+        self.instantaneo = Database(backend=BackendSQLite(caminho_instantaneo), instrumentar=False)
+        self.instantaneo.create_tables()
+        self.caminho_diario = caminho_diario
+        self.tamanho_lote = tamanho_lote
+        self.conflitos = []
+        self._caminho_ids = f"{caminho_diario}.ids"
+        self._lock_diario = threading.Lock()
+        self._local = threading.local()
+        primario.ao_perder_conexao = self._perdeu_conexao
+        # Com escritas offline ainda não reaplicadas, as leituras continuam no instantâneo até a sincronização
+        self.online = not self._ler_diario() and primario.disponivel()
+        if not self.online:
+            logging.warning("Servidor do banco de dados indisponível ou diário offline pendente: usando o instantâneo local.")
+
+    def __getattr__(self, nome):
+        atributo = getattr(self.primario, nome)
+        if not callable(atributo) or nome.startswith("_"):
+            return atributo
+        if nome in INSERCOES or nome in ATUALIZACOES:
+            return lambda *args: self._escrever(nome, args)
+
+        def ler(*args, **kwargs):
+            if self.online:
+                self._local.perdeu = False
+                try:
+                    resultado = getattr(self.primario, nome)(*args, **kwargs)
+                except ERROS_BANCO:
+                    if not self._local.perdeu:
+                        raise
+                else:
+                    if not self._local.perdeu:
+                        return resultado
+            return getattr(self.instantaneo, nome)(*args, **kwargs)
+        return ler
+
+    @property
+    def pendentes(self):
+        """int: Retorna o número de operações do diário ainda não reaplicadas no servidor."""
+        with self._lock_diario:
+            return len(self._ler_diario())
+
+    def create_tables(self):
+        """
+        Aplica as migrações pendentes no servidor, se ele estiver disponível.
+
+        Returns:
+            int: Versão do esquema do instantâneo (a mesma do servidor).
+        """
+        versao = self.instantaneo.create_tables()
+        if self.online:
+            self._local.perdeu = False
+            try:
+                return self.primario.create_tables()
+            except ERROS_BANCO:
+                if not self._local.perdeu:
+                    raise
+        return versao
+
+    @contextmanager
+    def transaction(self):
+        """
+        Executa várias operações como uma única transação, no servidor ou, offline, no instantâneo.
+
+        As operações de uma transação offline entram no diário juntas, somente após a confirmação
+        no instantâneo, e são reaplicadas no servidor também em uma única transação.
+
+        Yields:
+            ModoOffline: A própria instância.
+        """
+        if getattr(self._local, 'grupo', None) is not None or getattr(self._local, 'em_transacao', False):
+            yield self
+            return
+        if self.online:
+            self._local.em_transacao = True
+            try:
+                with self.primario.transaction():
+                    yield self
+            finally:
+                self._local.em_transacao = False
+            return
+        self._local.grupo = []
+        try:
+            with self.instantaneo.transaction():
+                yield self
+            self._gravar_no_diario(self._local.grupo)
+        finally:
+            self._local.grupo = None
+
+    def sincronizar(self):
+        """
+        Reaplica o diário offline no servidor, se ele estiver disponível, e atualiza o instantâneo.
+
+        Com o diário vazio, o sistema volta ao modo online e o instantâneo é substituído por uma
+        nova cópia das tabelas do servidor.
+
+        Returns:
+            int: Número de operações reaplicadas.
+        """
+        if not self.online and not self.primario.disponivel():
+            return 0
+        reaplicadas = 0
+        while True:
+            with self._lock_diario:
+                entradas = self._ler_diario()
+            if not entradas:
+                break
+            lote, processadas, interrompido = self._reaplicar_lote(entradas)
+            reaplicadas += lote
+            with self._lock_diario:
+                # Entradas acrescentadas durante a reaplicação ficam depois das já processadas
+                self._reescrever_diario(self._ler_diario()[processadas:])
+            if interrompido:
+                return reaplicadas
+        with self._lock_diario:
+            if self._ler_diario():
+                return reaplicadas
+            if not self.online:
+                logging.info("Servidor do banco de dados disponível: diário offline reaplicado, modo online restabelecido.")
+            self.online = True
+            self._salvar_ids({})
+        self._local.perdeu = False
+        try:
+            self.primario.copiar_para(self.instantaneo)
+        except ERROS_BANCO as e:
+            if not self._local.perdeu:
+                logging.error(f"Erro ao atualizar o instantâneo local: {e}")
+        return reaplicadas
+
+    def _perdeu_conexao(self, erro):
+        self._local.perdeu = True
+        if self.online:
+            logging.warning(f"Servidor do banco de dados inacessível, ativando o modo offline: {erro}")
+            self.online = False
+
+    def _escrever(self, nome, args):
+        if self.online:
+            self._local.perdeu = False
+            try:
+                resultado = getattr(self.primario, nome)(*args)
+            except ERROS_BANCO:
+                if not self._local.perdeu or getattr(self._local, 'em_transacao', False):
+                    raise
+            else:
+                # Dentro de uma transação no servidor, a falha desfaz a transação inteira
+                if not self._local.perdeu or getattr(self._local, 'em_transacao', False):
+                    return resultado
+        return self._escrever_offline(nome, args)
+
+    def _escrever_offline(self, nome, args):
+        entrada = {"op": nome}
+        if nome in INSERCOES:
+            tabela, serializar, _ = INSERCOES[nome]
+            resultado = getattr(self.instantaneo, nome)(*args)
+            if resultado is None and tabela is not None:
+                return None
+            entrada.update(dados=serializar(args[0]), id_local=resultado)
+        else:
+            tabela, colunas, _ = ATUALIZACOES[nome]
+            antes = _normalizar(self.instantaneo.valores_atuais(tabela, colunas, args[0])) if colunas else None
+            resultado = getattr(self.instantaneo, nome)(*args)
+            if nome == "reivindicar_solicitacao" and not resultado:
+                return resultado
+            entrada.update(args=list(args), antes=antes)
+        grupo = getattr(self._local, 'grupo', None)
+        if grupo is not None:
+            grupo.append(entrada)
+        else:
+            self._gravar_no_diario([entrada])
+        return resultado
+
+    def _gravar_no_diario(self, entradas):
+        if not entradas:
+            return
+        grupo = uuid.uuid4().hex
+        with self._lock_diario:
+            with open(self.caminho_diario, "a", encoding="utf-8") as diario:
+                for entrada in entradas:
+                    diario.write(json.dumps(dict(entrada, grupo=grupo), default=str) + "\n")
+                diario.flush()
+                os.fsync(diario.fileno())
+
+    def _reaplicar_lote(self, entradas):
+        """
+        Reaplica até `tamanho_lote` transações do diário.
+
+        Returns:
+            tuple: Operações reaplicadas, entradas processadas (reaplicadas ou em conflito) e se a
+                reaplicação foi interrompida pela perda da conexão.
+        """
+        ids = self._ler_ids()
+        reaplicadas = processadas = 0
+        for grupo in self._agrupar(entradas)[:self.tamanho_lote]:
+            novos = {}
+            self._local.perdeu = False
+            try:
+                if len(grupo) > 1:
+                    with self.primario.transaction():
+                        for entrada in grupo:
+                            self._reaplicar(entrada, ids, novos)
+                else:
+                    self._reaplicar(grupo[0], ids, novos)
+            except Conflito as e:
+                self._registrar_conflito(grupo, str(e))
+            except ERROS_BANCO as e:
+                if self._local.perdeu:
+                    self._salvar_ids(ids)
+                    return reaplicadas, processadas, True
+                self._registrar_conflito(grupo, f"Erro do servidor: {e}")
+            else:
+                if self._local.perdeu:
+                    self._salvar_ids(ids)
+                    return reaplicadas, processadas, True
+                ids.update(novos)
+                reaplicadas += len(grupo)
+            processadas += len(grupo)
+        self._salvar_ids(ids)
+        return reaplicadas, processadas, False
+
+    def _reaplicar(self, entrada, ids, novos):
+        nome = entrada["op"]
+        mapear = lambda tabela, id: novos.get(f"{tabela}:{id}", ids.get(f"{tabela}:{id}", id))
+        if nome in INSERCOES:
+            tabela, _, montar = INSERCOES[nome]
+            dados = {chave: mapear(REFERENCIAS[chave], valor) if chave in REFERENCIAS and valor is not None else valor
+                     for chave, valor in entrada["dados"].items()}
+            novo_id = getattr(self.primario, nome)(montar(dados))
+            if tabela is None:
+                return
+            if novo_id is None and not self._local.perdeu:
+                existente = self.primario.buscar_paciente_por_cpf(dados["cpf"]) if nome == "insert_paciente" else None
+                if existente is None:
+                    raise Conflito("Inserção recusada pelo servidor.")
+                # Mesmo CPF cadastrado por outra estação: as operações seguintes usam o paciente existente
+                self._registrar_conflito([entrada], f"CPF {dados['cpf']} já cadastrado no servidor (paciente {existente.id}).")
+                novo_id = existente.id
+            novos[f"{tabela}:{entrada['id_local']}"] = novo_id
+            return
+        tabela, colunas, referencias = ATUALIZACOES[nome]
+        args = list(entrada["args"])
+        args[0] = mapear(tabela, args[0])
+        for indice, tabela_referencia in referencias.items():
+            if args[indice] is not None:
+                args[indice] = mapear(tabela_referencia, args[indice])
+        if colunas:
+            atual = _normalizar(self.primario.valores_atuais(tabela, colunas, args[0]))
+            if atual != entrada["antes"]:
+                raise Conflito(f"{tabela} {args[0]} alterado no servidor: esperado {entrada['antes']}, encontrado {atual}.")
+        resultado = getattr(self.primario, nome)(*args)
+        if nome == "reivindicar_solicitacao" and not resultado and not self._local.perdeu:
+            raise Conflito(f"Solicitação {args[0]} já aceita por outro maqueiro.")
+
+    @staticmethod
+    def _agrupar(entradas):
+        grupos = []
+        for entrada in entradas:
+            if grupos and grupos[-1][0]["grupo"] == entrada["grupo"]:
+                grupos[-1].append(entrada)
+            else:
+                grupos.append([entrada])
+        return grupos
+
+    def _registrar_conflito(self, grupo, motivo):
+        logging.warning(f"Conflito ao reaplicar o diário offline ({', '.join(e['op'] for e in grupo)}): {motivo}")
+        conflito = {"operacoes": grupo, "motivo": motivo}
+        self.conflitos.append(conflito)
+        with open(f"{self.caminho_diario}.conflitos", "a", encoding="utf-8") as arquivo:
+            arquivo.write(json.dumps(conflito, default=str) + "\n")
+
+    def _ler_diario(self):
+        if not os.path.exists(self.caminho_diario):
+            return []
+        entradas = []
+        with open(self.caminho_diario, encoding="utf-8") as diario:
+            for linha in diario:
+                try:
+                    entradas.append(json.loads(linha))
+                except ValueError:
+                    # Linha incompleta de uma execução interrompida durante a escrita no diário
+                    logging.warning(f"Linha do diário offline ignorada: {linha.strip()!r}")
+        return entradas
+
+    def _reescrever_diario(self, entradas):
+        temporario = f"{self.caminho_diario}.tmp"
+        with open(temporario, "w", encoding="utf-8") as diario:
+            for entrada in entradas:
+                diario.write(json.dumps(entrada, default=str) + "\n")
+            diario.flush()
+            os.fsync(diario.fileno())
+        os.replace(temporario, self.caminho_diario)
+
+    def _ler_ids(self):
+        # IDs do servidor das linhas criadas offline, por "tabela:id local", entre lotes e execuções
+        if not os.path.exists(self._caminho_ids):
+            return {}
+        with open(self._caminho_ids, encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+
+    def _salvar_ids(self, ids):
+        with open(self._caminho_ids, "w", encoding="utf-8") as arquivo:
+            json.dump(ids, arquivo)
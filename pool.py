@@ -0,0 +1,243 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class ErroPool(Exception):
+    """
+    Erro levantado quando não é possível obter uma conexão do pool.
+    """
+
+
+class ErroConexao(ErroPool):
+    """
+    Erro levantado quando o servidor do banco de dados não aceita novas conexões.
+    """
+
+
+class PoolDeConexoes:
+    """
+    Classe PoolDeConexoes para gerenciar um conjunto de conexões reutilizáveis com o banco de dados.
+
+    Cada operação retira uma conexão do pool e a devolve ao terminar, permitindo que várias
+    consultas sejam executadas ao mesmo tempo. As conexões são verificadas ao serem retiradas
+    e recriadas automaticamente, com espera exponencial entre as tentativas.
+
+    Attributes:
+        tamanho (int): Número máximo de conexões abertas simultaneamente.
+        tempo_espera (float): Tempo máximo, em segundos, para aguardar uma conexão livre.
+    """
+
+    def __init__(self, fabrica, tamanho=5, tempo_espera=10.0, tentativas=3,
+                 atraso_inicial=0.5, atraso_maximo=8.0, verificar=None):
+        """
+        Inicializa o pool de conexões.
+
+        Args:
+            fabrica (callable): Função sem argumentos que abre e retorna uma nova conexão.
+            tamanho (int): Número máximo de conexões abertas simultaneamente.
+            tempo_espera (float): Tempo máximo, em segundos, para aguardar uma conexão livre.
+            tentativas (int): Número de tentativas de conexão antes de desistir.
+            atraso_inicial (float): Espera, em segundos, após a primeira tentativa que falhar.
+            atraso_maximo (float): Limite da espera entre tentativas.
+            verificar (callable): Função que recebe uma conexão e retorna True se ela estiver ativa.
+        """
+        if tamanho < 1:
+            raise ValueError("O tamanho do pool deve ser pelo menos 1.")
+        self.tamanho = tamanho
+        self.tempo_espera = tempo_espera
+        self._fabrica = fabrica
+        self._tentativas = max(1, tentativas)
+        self._atraso_inicial = atraso_inicial
+        self._atraso_maximo = atraso_maximo
+        self._verificar = verificar
+        self._livres = deque()
+        self._total = 0
+        self._em_uso = 0
+        self._condicao = threading.Condition()
+        self._retiradas = 0
+        self._esperas = 0
+        self._tempo_espera_total = 0.0
+        self._tempo_espera_maximo = 0.0
+        self._esgotamentos = 0
+        self._reconexoes = 0
+        self._falhas_conexao = 0
+        self._descartadas = 0
+
+    def preencher(self, quantidade):
+        """
+        Abre conexões antecipadamente, sem novas tentativas em caso de falha.
+
+        Args:
+            quantidade (int): Número de conexões a abrir, limitado ao tamanho do pool.
+
+        Raises:
+            ErroPool: Se alguma conexão não puder ser aberta.
+        """
+        for _ in range(quantidade):
+            with self._condicao:
+                if self._total >= self.tamanho:
+                    return
+                self._total += 1
+            try:
+                conexao = self._fabrica()
+            except Exception as e:
+                with self._condicao:
+                    self._total -= 1
+                    self._falhas_conexao += 1
+                    self._condicao.notify()
+                raise ErroPool(f"Não foi possível abrir conexão: {e}") from e
+            with self._condicao:
+                self._livres.append(conexao)
+                self._condicao.notify()
+
+    def obter_conexao(self):
+        """
+        Retira uma conexão do pool, aguardando até `tempo_espera` se todas estiverem em uso.
+
+        Returns:
+            object: Conexão ativa com o banco de dados.
+
+        Raises:
+            ErroPool: Se nenhuma conexão ficar livre a tempo ou se não for possível reconectar.
+        """
+        inicio = time.monotonic()
+        prazo = inicio + self.tempo_espera
+        esperou = False
+        with self._condicao:
+            while True:
+                if self._livres:
+                    conexao = self._livres.pop()
+                    break
+                if self._total < self.tamanho:
+                    self._total += 1
+                    conexao = None
+                    break
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    self._esgotamentos += 1
+                    raise ErroPool(f"Nenhuma conexão livre após {self.tempo_espera} segundos.")
+                esperou = True
+                self._condicao.wait(restante)
+            self._em_uso += 1
+            self._retiradas += 1
+            if esperou:
+                espera = time.monotonic() - inicio
+                self._esperas += 1
+                self._tempo_espera_total += espera
+                self._tempo_espera_maximo = max(self._tempo_espera_maximo, espera)
+
+        try:
+            if conexao is not None and not self._saudavel(conexao):
+                self._fechar(conexao)
+                conexao = None
+                with self._condicao:
+                    self._descartadas += 1
+                    self._reconexoes += 1
+            if conexao is None:
+                conexao = self._conectar()
+        except Exception:
+            with self._condicao:
+                self._total -= 1
+                self._em_uso -= 1
+                self._condicao.notify()
+            raise
+        return conexao
+
+    def devolver_conexao(self, conexao, descartar=False):
+        """
+        Devolve uma conexão ao pool.
+
+        Args:
+            conexao (object): Conexão obtida por `obter_conexao`.
+            descartar (bool): Se True, a conexão é fechada em vez de reutilizada.
+        """
+        if descartar:
+            self._fechar(conexao)
+        with self._condicao:
+            self._em_uso -= 1
+            if descartar:
+                self._total -= 1
+                self._descartadas += 1
+            else:
+                self._livres.append(conexao)
+            self._condicao.notify()
+
+    @contextmanager
+    def conexao(self):
+        """
+        Gerenciador de contexto que retira uma conexão e a devolve ao final do bloco.
+
+        Yields:
+            object: Conexão ativa com o banco de dados.
+        """
+        conexao = self.obter_conexao()
+        try:
+            yield conexao
+        finally:
+            self.devolver_conexao(conexao)
+
+    def metricas(self):
+        """
+        Retorna as métricas de uso do pool.
+
+        Returns:
+            dict: Tamanho, conexões abertas, em uso e livres, esperas e reconexões.
+        """
+        with self._condicao:
+            return {
+                "tamanho": self.tamanho,
+                "abertas": self._total,
+                "em_uso": self._em_uso,
+                "livres": len(self._livres),
+                "retiradas": self._retiradas,
+                "esperas": self._esperas,
+                "tempo_espera_total": self._tempo_espera_total,
+                "tempo_espera_maximo": self._tempo_espera_maximo,
+                "esgotamentos": self._esgotamentos,
+                "reconexoes": self._reconexoes,
+                "falhas_conexao": self._falhas_conexao,
+                "descartadas": self._descartadas,
+            }
+
+    def fechar(self):
+        """
+        Fecha todas as conexões livres do pool.
+        """
+        with self._condicao:
+            livres = list(self._livres)
+            self._livres.clear()
+            self._total -= len(livres)
+        for conexao in livres:
+            self._fechar(conexao)
+
+    def _saudavel(self, conexao):
+        if self._verificar is None:
+            return True
+        try:
+            return bool(self._verificar(conexao))
+        except Exception:
+            return False
+
+    def _conectar(self):
+        atraso = self._atraso_inicial
+        ultimo_erro = None
+        for tentativa in range(self._tentativas):
+            try:
+                return self._fabrica()
+            except Exception as e:
+                ultimo_erro = e
+                with self._condicao:
+                    self._falhas_conexao += 1
+                if tentativa < self._tentativas - 1:
+                    time.sleep(atraso)
+                    atraso = min(atraso * 2, self._atraso_maximo)
+        raise ErroConexao(f"Não foi possível conectar após {self._tentativas} tentativas: {ultimo_erro}") from ultimo_erro
+
+    @staticmethod
+    def _fechar(conexao):
+        try:
+            conexao.close()
+        except Exception:
+            pass
@@ -0,0 +1,111 @@
+import threading
+
+
+class Referencia:
+    """
+    Classe Referencia que ocupa o lugar de um paciente ou maqueiro ainda não carregado.
+
+    Guarda apenas a chave estrangeira. Os modelos trocam a referência pelo objeto no primeiro
+    acesso à relação (por exemplo, `tarefa.paciente`), pedindo-o ao carregador que a criou.
+
+    Attributes:
+        id (int): ID do objeto referenciado.
+    """
+    __slots__ = ('id', '_carregador')
+
+    def __init__(self, id, carregador):
+        self.id = id
+        self._carregador = carregador
+
+    def resolver(self):
+        """
+        Carrega o objeto referenciado.
+
+        Returns:
+            object: Objeto com o ID da referência, ou None se ele não existir mais.
+        """
+        return self._carregador.obter(self.id)
+
+
+def resolver(relacao):
+    """
+    Retorna o objeto de uma relação, carregando-o se ela ainda for uma Referencia.
+
+    Args:
+        relacao (object): Objeto, Referencia ou None.
+
+    Returns:
+        object: O objeto relacionado, ou None.
+    """
+    if type(relacao) is Referencia:
+        return relacao.resolver()
+    return relacao
+
+
+class CarregadorEmLote:
+    """
+    Classe CarregadorEmLote que carrega de uma vez os objetos das referências de uma listagem.
+
+    Cada listagem preguiçosa cria um carregador por relação. As referências criadas por ele ficam
+    pendentes até o primeiro acesso a qualquer uma delas, quando todas são carregadas juntas, com
+    uma única chamada à função de busca. Assim, percorrer a lista e ler `tarefa.paciente.nome`
+    custa uma consulta a mais, e não uma por linha.
+
+    Attributes:
+        cargas (int): Número de chamadas feitas à função de busca.
+    """
+
+    def __init__(self, buscar):
+        """
+        Inicializa um carregador sem referências.
+
+        Args:
+            buscar (callable): Função que recebe uma lista de IDs e retorna um dicionário
+                {id: objeto} com os objetos encontrados.
+        """
+        self.cargas = 0
+        self._buscar = buscar
+        self._pendentes = set()
+        self._carregados = {}
+        self._lock = threading.Lock()
+
+    def referencia(self, id):
+        """
+        Cria uma referência ao objeto com o ID informado, sem consultar o banco.
+
+        Args:
+            id (int): ID do objeto, ou None para uma relação vazia.
+
+        Returns:
+            Referencia: Referência pendente, ou None se o ID for nulo.
+        """
+        if id is None:
+            return None
+        with self._lock:
+            if id not in self._carregados:
+                self._pendentes.add(id)
+        return Referencia(id, self)
+
+    def obter(self, id):
+        """
+        Retorna o objeto com o ID informado, carregando antes todas as referências pendentes.
+
+        Args:
+            id (int): ID do objeto.
+
+        Returns:
+            object: Objeto carregado, ou None se ele não existir.
+
+        Raises:
+            Exception: O erro da função de busca. Nenhum ID é registrado como carregado, e todos
+                continuam pendentes para a próxima tentativa.
+        """
+        with self._lock:
+            if id not in self._carregados:
+                ids = sorted(self._pendentes | {id})
+                self.cargas += 1
+                encontrados = self._buscar(ids)
+                # IDs sem objeto também são registrados, para não voltar ao banco a cada acesso
+                self._carregados.update({id: encontrados.get(id) for id in ids})
+                self._pendentes.difference_update(ids)
+            return self._carregados[id]
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import Counter
+
+# Tipos de ajuste aplicados aos contadores
+SOLICITACOES = "solicitacoes"
+TRANSPORTE = "transporte"
+TAREFAS = "tarefas"
+
+# Valor padrão das consultas por chave: None é uma chave válida (paciente sem urgência, tarefa sem
+# maqueiro), e omitir a chave pede o total
+_TOTAL = object()
+
+
+class ResumoDespacho:
+    """
+    Classe ResumoDespacho com os contadores do despacho mantidos em memória.
+
+    Os contadores são carregados do banco de dados por `carregar` e atualizados a cada escrita da
+    própria estação com `aplicar`, de modo que consultá-los não acessa o banco. As escritas de outras
+    estações entram na próxima recarga periódica.
+
+    Attributes:
+        carregado_em (float): Horário (time.time()) da última recarga, ou None se nunca foi carregado.
+    """
+
+    def __init__(self):
+        self.carregado_em = None
+        self._solicitacoes = Counter()
+        self._tarefas = Counter()
+        self._em_transporte = 0
+        self._lock = threading.Lock()
+
+    @property
+    def carregado(self):
+        """bool: Retorna True se os contadores já foram carregados do banco de dados."""
+        return self.carregado_em is not None
+
+    def carregar(self, solicitacoes, em_transporte, tarefas):
+        """
+        Substitui todos os contadores pelos valores lidos do banco de dados.
+
+        Args:
+            solicitacoes (dict): Solicitações pendentes por urgência do paciente.
+            em_transporte (int): Número de pacientes em transporte.
+            tarefas (dict): Tarefas pendentes por ID do maqueiro.
+        """
+        with self._lock:
+            self._solicitacoes = Counter(solicitacoes)
+            self._tarefas = Counter(tarefas)
+            self._em_transporte = em_transporte
+            self.carregado_em = time.time()
+
+    def aplicar(self, ajustes):
+        """
+        Aplica ajustes incrementais aos contadores.
+
+        Args:
+            ajustes (iterable): Tuplas (tipo, chave, delta), em que o tipo é SOLICITACOES (chave = urgência),
+                TRANSPORTE (chave ignorada) ou TAREFAS (chave = ID do maqueiro).
+        """
+        with self._lock:
+            for tipo, chave, delta in ajustes:
+                if tipo == TRANSPORTE:
+                    self._em_transporte = max(0, self._em_transporte + delta)
+                    continue
+                contador = self._solicitacoes if tipo == SOLICITACOES else self._tarefas
+                contador[chave] += delta
+                if contador[chave] <= 0:
+                    del contador[chave]
+
+    def solicitacoes_pendentes(self, urgencia=_TOTAL):
+        """
+        Args:
+            urgencia (str): Nível de urgência do paciente, None para os pacientes sem urgência, ou
+                omitido para o total.
+
+        Returns:
+            int: Número de solicitações pendentes.
+        """
+        with self._lock:
+            if urgencia is _TOTAL:
+                return sum(self._solicitacoes.values())
+            return self._solicitacoes.get(urgencia, 0)
+
+    def pacientes_em_transporte(self):
+        """int: Retorna o número de pacientes em transporte."""
+        return self._em_transporte
+
+    def tarefas_abertas(self, maqueiro_id=_TOTAL):
+        """
+        Args:
+            maqueiro_id (int): ID do maqueiro, None para as tarefas sem maqueiro, ou omitido para o total.
+
+        Returns:
+            int: Número de tarefas pendentes.
+        """
+        with self._lock:
+            if maqueiro_id is _TOTAL:
+                return sum(self._tarefas.values())
+            return self._tarefas.get(maqueiro_id, 0)
+
+    def como_dict(self):
+        """
+        Returns:
+            dict: Solicitações pendentes por urgência, pacientes em transporte e tarefas abertas por maqueiro.
+        """
+        with self._lock:
+            return {
+                "solicitacoes_pendentes": dict(self._solicitacoes),
+                "pacientes_em_transporte": self._em_transporte,
+                "tarefas_abertas": dict(self._tarefas),
+                "carregado_em": self.carregado_em,
+            }
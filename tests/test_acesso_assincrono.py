@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from acesso_assincrono import AcessoAssincrono
+
+class RootFalso:
+    """Substitui tk.Tk, guardando as funções agendadas por after()."""
+
+    def __init__(self):
+        self.agendadas = []
+
+    def after(self, ms, funcao):
+        self.agendadas.append(funcao)
+
+    def processar(self, acesso, timeout=2.0):
+        prazo = time.monotonic() + timeout
+        while acesso.pendentes and time.monotonic() < prazo:
+            agendadas, self.agendadas = self.agendadas, []
+            for funcao in agendadas:
+                funcao()
+            time.sleep(0.005)
+
+class TestAcessoAssincrono(unittest.TestCase):
+
+    def setUp(self):
+        self.root = RootFalso()
+        self.carregamento = []
+        self.acesso = AcessoAssincrono(self.root, max_workers=2, intervalo_ms=1,
+                                       ao_mudar_carregamento=self.carregamento.append)
+
+    def tearDown(self):
+        self.acesso.encerrar(aguardar=True)
+
+    def test_resultado_entregue_na_thread_da_interface(self):
+        threads = []
+        resultados = []
+        self.acesso.executar(lambda x: x * 2, 21,
+                             ao_concluir=lambda r: (resultados.append(r), threads.append(threading.current_thread())))
+        self.assertTrue(self.acesso.carregando)
+        self.root.processar(self.acesso)
+
+        self.assertEqual(resultados, [42])
+        self.assertIs(threads[0], threading.main_thread())
+        self.assertEqual(self.carregamento, [True, False])
+
+    def test_erro_entregue_a_ao_falhar(self):
+        erros = []
+        def falhar():
+            raise ValueError("falhou")
+        self.acesso.executar(falhar, ao_concluir=lambda r: self.fail("não deveria concluir"), ao_falhar=erros.append)
+        self.root.processar(self.acesso)
+
+        self.assertIsInstance(erros[0], ValueError)
+
+    def test_chamada_obsoleta_descartada(self):
+        liberar = threading.Event()
+        resultados = []
+        def lenta():
+            liberar.wait(2)
+            return "antiga"
+        self.acesso.executar(lenta, chave="tela", ao_concluir=resultados.append)
+        self.acesso.executar(lambda: "nova", chave="tela", ao_concluir=resultados.append)
+        liberar.set()
+        self.root.processar(self.acesso)
+
+        self.assertEqual(resultados, ["nova"])
+        self.assertFalse(self.acesso.carregando)
+
+    def test_limite_de_concorrencia(self):
+        ativas = []
+        maximo = []
+        lock = threading.Lock()
+        def tarefa():
+            with lock:
+                ativas.append(1)
+                maximo.append(len(ativas))
+            time.sleep(0.02)
+            with lock:
+                ativas.pop()
+        for _ in range(6):
+            self.acesso.executar(tarefa)
+        self.root.processar(self.acesso)
+
+        self.assertLessEqual(max(maximo), 2)
+        self.assertEqual(len(maximo), 6)
+
+if __name__ == '__main__':
+    unittest.main()
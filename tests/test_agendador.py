@@ -0,0 +1,39 @@
+import unittest
+import sys
+import os
+import threading
+from unittest.mock import MagicMock
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from agendador import VarreduraPeriodica
+
+class TestVarreduraPeriodica(unittest.TestCase):
+
+    def test_executar_agora_registra_resultado(self):
+        ao_concluir = MagicMock()
+        varredura = VarreduraPeriodica(lambda: 3, ao_concluir=ao_concluir)
+        execucao = varredura.executar_agora()
+        self.assertEqual(execucao["linhas"], 3)
+        self.assertIs(varredura.ultima_execucao, execucao)
+        ao_concluir.assert_called_once_with(3, execucao["duracao"])
+
+    def test_erro_na_tarefa_nao_interrompe(self):
+        varredura = VarreduraPeriodica(MagicMock(side_effect=RuntimeError("falha")))
+        self.assertEqual(varredura.executar_agora()["linhas"], 0)
+
+    def test_executa_em_segundo_plano(self):
+        execucoes = threading.Semaphore(0)
+        varredura = VarreduraPeriodica(lambda: 1, intervalo=0.01, ao_concluir=lambda linhas, duracao: execucoes.release())
+        varredura.iniciar()
+        try:
+            self.assertTrue(execucoes.acquire(timeout=1))
+            self.assertTrue(execucoes.acquire(timeout=1))
+            self.assertTrue(varredura.ativa)
+        finally:
+            varredura.parar(timeout=1)
+        self.assertFalse(varredura.ativa)
+
+if __name__ == '__main__':
+    unittest.main()
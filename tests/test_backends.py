@@ -0,0 +1,368 @@
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from backends import BackendSQLite
+from database import Database, ErroTransacao
+from models import Paciente, Maqueiro, Tarefa, Incidente, SolicitacaoTransporte
+from estados import StatusSolicitacao
+
+def criar_banco(caminho=":memory:", **kwargs):
+    db = Database(backend=BackendSQLite(caminho), **kwargs)
+    db.create_tables()
+    with db._cursor(commit=True) as cursor:
+        cursor.execute("INSERT INTO Maqueiros (nome, coren, data_nascimento, sexo, login, senha) VALUES (%s, %s, %s, %s, %s, %s)",
+                       ("Carlos", "123456", "1980-01-01", "M", "carlos", "senha123"))
+    return db
+
+class TestBackendSQLite(unittest.TestCase):
+
+    def setUp(self):
+        self.db = criar_banco()
+        self.maqueiro = self.db.buscar_maqueiro_por_login("carlos")
+        self.paciente = Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta")
+        self.paciente.definir_id(self.db.insert_paciente(self.paciente))
+
+    def test_create_tables_idempotente(self):
+        self.db.create_tables()
+        self.assertIsNotNone(self.db.buscar_paciente_por_cpf("12345678901"))
+
+    def test_pacientes(self):
+        urgente = Paciente("Maria", "98765432100", "UTI", "Grave", "Aguardando Transporte", "Emergência")
+        self.db.insert_paciente(urgente)
+        pacientes = self.db.listar_pacientes()
+        self.assertEqual([p.nome for p in pacientes], ["Maria", "João Silva"])
+        self.assertEqual(self.db.buscar_paciente_por_id(self.paciente.id).cpf, "12345678901")
+        self.assertEqual(self.maqueiro.nome, "Carlos")
+        # A senha só é lida na autenticação
+        self.assertIsNone(self.maqueiro.senha)
+        self.assertIs(self.db.autenticar("carlos", "senha123"), self.maqueiro)
+        self.assertIsNone(self.db.autenticar("carlos", "errada"))
+        self.assertIsNone(self.db.autenticar("ninguem", "senha123"))
+
+    def test_tarefas(self):
+        tarefa = Tarefa(None, "Mover paciente", "Alta", self.paciente, "Sala 101", self.maqueiro)
+        tarefa_id = self.db.insert_tarefa(tarefa)
+        self.assertEqual([t.id for t in self.db.listar_tarefas_pendentes()], [tarefa_id])
+        self.db.update_tarefa_status(tarefa_id, 'concluída')
+        self.assertEqual(self.db.listar_tarefas_pendentes(), [])
+
+    def test_reivindicacao_por_urgencia(self):
+        sem_urgencia = Paciente("Sem urgência", "11111111111", "Sala 1", "Estável", "Aguardando transporte")
+        sem_urgencia.definir_id(self.db.insert_paciente(sem_urgencia))
+        urgente = Paciente("Maria", "98765432100", "UTI", "Grave", "Aguardando transporte", "Emergência")
+        urgente.definir_id(self.db.insert_paciente(urgente))
+        for i, paciente in enumerate((sem_urgencia, self.paciente, urgente)):
+            self.db.insert_solicitacao_transporte(SolicitacaoTransporte(None, paciente.nome, paciente, datetime(2024, 1, 1, 8, i), None))
+
+        # A mais urgente primeiro, mesmo sendo a mais recente; sem urgência definida, por último
+        recebidas = [self.db.reivindicar_proxima_solicitacao(self.maqueiro.id) for _ in range(4)]
+        self.assertEqual([s.descricao for s in recebidas[:3]], ["Maria", "João Silva", "Sem urgência"])
+        self.assertIsNone(recebidas[3])
+
+    def test_incidentes(self):
+        self.db.insert_incidente(Incidente(None, "Queda", self.maqueiro, self.paciente, "2023-06-10 14:30:00"))
+        self.db.insert_incidente(Incidente(None, "Atraso", self.maqueiro, self.paciente, "2023-06-11 09:00:00"))
+        incidentes = self.db.listar_incidentes()
+        self.assertEqual([i.descricao for i in incidentes], ["Atraso", "Queda"])
+        self.assertEqual(incidentes[0].maqueiro.nome, "Carlos")
+        self.assertEqual(incidentes[0].data_hora, datetime(2023, 6, 11, 9, 0))
+
+    def test_fluxo_de_transporte(self):
+        solicitacao = SolicitacaoTransporte(None, "Raio-x", self.paciente, datetime.now(), self.maqueiro)
+        solicitacao_id = self.db.insert_solicitacao_transporte(solicitacao)
+        self.assertEqual([s.id for s in self.db.listar_solicitacoes_pendentes()], [solicitacao_id])
+
+        with self.db.transaction():
+            self.db.update_solicitacao_status(solicitacao_id, 'aceita', self.maqueiro.id)
+            self.db.iniciar_transporte_paciente(self.paciente.id)
+        self.assertEqual(self.db.listar_solicitacoes_pendentes(), [])
+
+        with self.db.transaction():
+            self.db.concluir_transporte_paciente(self.paciente.id)
+            self.db.atualizar_localizacao_paciente(self.paciente.id, "Raio-x")
+        paciente = self.db.buscar_paciente_por_id(self.paciente.id)
+        self.assertEqual(paciente.transporte, "Chegou ao destino")
+        self.assertEqual(paciente.localizacao, "Raio-x")
+
+    def test_transacao_desfeita(self):
+        with self.assertRaises(ErroTransacao):
+            with self.db.transaction():
+                self.db.atualizar_localizacao_paciente(self.paciente.id, "Raio-x")
+                self.db.atualizar_transporte_paciente(self.paciente.id, "Status inválido")
+        self.assertEqual(self.db.buscar_paciente_por_id(self.paciente.id).localizacao, "Sala 101")
+
+    def test_atualizar_status_transporte(self):
+        self.db.iniciar_transporte_paciente(self.paciente.id)
+        self.assertEqual(self.db.atualizar_status_transporte(), 0)
+        with self.db._cursor(commit=True) as cursor:
+            cursor.execute("UPDATE Pacientes SET inicio_transporte = %s WHERE id = %s",
+                           (datetime.now() - timedelta(hours=2), self.paciente.id))
+        self.assertEqual(self.db.atualizar_status_transporte(), 1)
+        self.assertEqual(self.db.buscar_paciente_por_id(self.paciente.id).transporte, "Chegou ao destino")
+
+    def test_insert_pacientes_bulk(self):
+        pacientes = [Paciente(f"Paciente {i}", f"{i:011d}", "Sala", "Estável", "Aguardando transporte", "Baixa") for i in range(5)]
+        pacientes.append(Paciente("Duplicado", "12345678901", "Sala", "Estável", "Aguardando transporte", "Baixa"))
+        resultado = self.db.insert_pacientes_bulk(pacientes, tamanho_lote=2)
+        self.assertEqual(resultado.inseridos, 5)
+        self.assertEqual(resultado.falhas[0][0], 5)
+        for paciente, paciente_id in zip(pacientes, resultado.ids[:5]):
+            self.assertEqual(self.db.buscar_paciente_por_id(paciente_id).cpf, paciente.cpf)
+
+    def test_censo_em_cache_invalidado_por_escrita(self):
+        self.db.listar_pacientes()
+        self.db.listar_pacientes()
+        self.assertEqual(self.db.metricas_censo()["acertos"], 1)
+
+        self.db.atualizar_localizacao_paciente(self.paciente.id, "Sala 202")
+        self.assertEqual(self.db.listar_pacientes()[0].localizacao, "Sala 202")
+        self.db.insert_paciente(Paciente("Maria Souza", "98765432100", "Sala 1", "Estável", "Aguardando transporte", "Baixa"))
+        self.assertEqual(len(self.db.listar_pacientes()), 2)
+
+    def test_paginacao_por_chave(self):
+        urgencias = ["Baixa", "Emergência", None, "Média", "Alta"]
+        self.db.insert_pacientes_bulk(Paciente(f"Paciente {i}", f"{i:011d}", "Sala", "Estável", "Aguardando transporte", urgencias[i % 5]) for i in range(25))
+        esperado = [p.id for p in self.db.listar_pacientes()]
+        paginas, proxima = [], None
+        while True:
+            pacientes, proxima = self.db.listar_pacientes_pagina(limite=7, apos=proxima)
+            paginas.extend(p.id for p in pacientes)
+            if proxima is None:
+                break
+        self.assertEqual(sorted(paginas), sorted(esperado))
+        self.assertEqual(len(paginas), len(set(paginas)))
+        self.assertEqual([p.id for p in self.db.iterar_pacientes(tamanho_lote=4)], paginas)
+        self.assertEqual([p.urgencia for p in self.db.listar_pacientes_pagina(limite=6)[0]], [None] * 5 + ["Emergência"])
+
+    def test_paginacao_usa_indice_de_urgencia(self):
+        # A chave e a ordenação usam as colunas do índice, sem ordenação temporária
+        for condicao in ("", " WHERE urgencia IS NULL AND id > 5", " WHERE urgencia >= 2 AND (urgencia > 2 OR id > 5)"):
+            with self.db._cursor() as cursor:
+                cursor.execute(f"EXPLAIN QUERY PLAN SELECT id, nome FROM Pacientes{condicao} ORDER BY urgencia, id LIMIT 10")
+                plano = " ".join(row[-1] for row in cursor.fetchall())
+            self.assertIn("idx_pacientes_urgencia", plano)
+            self.assertNotIn("TEMP B-TREE", plano)
+
+    def test_paginacao_de_incidentes(self):
+        for dia in range(1, 6):
+            self.db.insert_incidente(Incidente(None, f"Dia {dia}", self.maqueiro, self.paciente, datetime(2023, 6, dia, 8, 0)))
+        primeira, proxima = self.db.listar_incidentes_pagina(limite=3)
+        segunda, fim = self.db.listar_incidentes_pagina(limite=3, apos=proxima)
+        self.assertEqual([i.descricao for i in primeira + segunda], [f"Dia {dia}" for dia in range(5, 0, -1)])
+        self.assertIsNone(fim)
+        self.assertEqual([i.descricao for i in self.db.iterar_incidentes(tamanho_lote=2)], [f"Dia {dia}" for dia in range(5, 0, -1)])
+
+    def test_paginacao_de_incidentes_sem_data(self):
+        for dia in range(1, 4):
+            self.db.insert_incidente(Incidente(None, f"Dia {dia}", self.maqueiro, self.paciente, datetime(2023, 6, dia, 8, 0)))
+        for n in range(1, 4):
+            self.db.insert_incidente(Incidente(None, f"Sem data {n}", self.maqueiro, self.paciente, None))
+        esperado = [f"Dia {dia}" for dia in range(3, 0, -1)] + [f"Sem data {n}" for n in range(3, 0, -1)]
+        for incluir_arquivo in (False, True):
+            paginas, proxima = [], None
+            while True:
+                incidentes, proxima = self.db.listar_incidentes_pagina(limite=2, apos=proxima, incluir_arquivo=incluir_arquivo)
+                paginas.extend(i.descricao for i in incidentes)
+                if proxima is None:
+                    break
+            self.assertEqual(paginas, esperado)
+
+    def test_arquivamento_em_lotes(self):
+        for dia in range(1, 6):
+            self.db.insert_incidente(Incidente(None, f"Dia {dia}", self.maqueiro, self.paciente, datetime(2023, 6, dia, 8, 0)))
+        self.db.insert_incidente(Incidente(None, "Hoje", self.maqueiro, self.paciente, datetime.now()))
+        concluida = self.db.insert_solicitacao_transporte(SolicitacaoTransporte(None, "Raio-x", self.paciente, datetime(2023, 5, 2, 9, 0), None))
+        self.db.concluir_transporte_paciente(self.paciente.id)
+        pendente = self.db.insert_solicitacao_transporte(SolicitacaoTransporte(None, "Retorno", self.paciente, datetime.now(), None))
+
+        self.assertEqual(self.db.arquivar(dias_incidentes=30, tamanho_lote=2), 6)
+        self.assertEqual(self.db.arquivar(dias_incidentes=30, tamanho_lote=2), 0)
+
+        self.assertEqual([i.descricao for i in self.db.listar_incidentes()], ["Hoje"])
+        esperado = ["Hoje"] + [f"Dia {dia}" for dia in range(5, 0, -1)]
+        self.assertEqual([i.descricao for i in self.db.listar_incidentes(incluir_arquivo=True)], esperado)
+        self.assertEqual([i.descricao for i in self.db.iterar_incidentes(tamanho_lote=2, incluir_arquivo=True)], esperado)
+        paginas, proxima = [], None
+        while True:
+            incidentes, proxima = self.db.listar_incidentes_pagina(limite=4, apos=proxima, incluir_arquivo=True)
+            paginas.extend(i.descricao for i in incidentes)
+            if proxima is None:
+                break
+        self.assertEqual(paginas, esperado)
+
+        self.assertEqual([s.id for s in self.db.historico_solicitacoes(self.paciente.id)], [pendente])
+        historico = self.db.historico_solicitacoes(self.paciente.id, incluir_arquivo=True)
+        self.assertEqual([(s.id, s.status) for s in historico], [(pendente, "pendente"), (concluida, "concluída")])
+        with self.db._cursor() as cursor:
+            cursor.execute("SELECT DISTINCT mes FROM IncidentesArquivo")
+            self.assertEqual(cursor.fetchall(), [(202306,)])
+
+    def test_alteracoes_desde_marca(self):
+        marca = self.db.marca_alteracoes()
+        self.assertEqual(len(self.db.alteracoes_desde(marca)), 0)
+
+        solicitacao_id = self.db.insert_solicitacao_transporte(SolicitacaoTransporte(None, "Raio-x", self.paciente, datetime.now(), None))
+        tarefa_id = self.db.insert_tarefa(Tarefa(None, "Mover paciente", "Alta", self.paciente, "Sala 101", self.maqueiro))
+        self.db.atualizar_localizacao_paciente(self.paciente.id, "Raio-X")
+        self.db.update_solicitacao_status(solicitacao_id, 'aceita', self.maqueiro.id)
+
+        alteracoes = self.db.alteracoes_desde(marca)
+        self.assertTrue(alteracoes.completo)
+        self.assertEqual([(p.id, p.localizacao) for p in alteracoes.pacientes], [(self.paciente.id, "Raio-X")])
+        self.assertEqual([(t.id, t.status) for t in alteracoes.tarefas], [(tarefa_id, "pendente")])
+        self.assertEqual([(s.id, s.status) for s in alteracoes.solicitacoes], [(solicitacao_id, "aceita")])
+        self.assertEqual(alteracoes.marca, self.db.marca_alteracoes())
+        self.assertEqual(len(self.db.alteracoes_desde(alteracoes.marca)), 0)
+
+    def test_alteracoes_em_varias_consultas(self):
+        marca = self.db.marca_alteracoes()
+        for i in range(5):
+            self.db.insert_paciente(Paciente(f"Paciente {i}", f"9876543210{i}", "Sala 1", "Estável", "Aguardando transporte", "Baixa"))
+            self.db.insert_solicitacao_transporte(SolicitacaoTransporte(None, f"Pedido {i}", self.paciente, datetime.now(), None))
+
+        pacientes, solicitacoes = [], []
+        while True:
+            alteracoes = self.db.alteracoes_desde(marca, limite=2)
+            pacientes += [p.nome for p in alteracoes.pacientes]
+            solicitacoes += [s.descricao for s in alteracoes.solicitacoes]
+            marca = alteracoes.marca
+            if alteracoes.completo:
+                break
+        self.assertEqual(pacientes, [f"Paciente {i}" for i in range(5)])
+        self.assertEqual(solicitacoes, [f"Pedido {i}" for i in range(5)])
+
+    def test_alteracoes_param_na_lacuna_recente(self):
+        marca = self.db.marca_alteracoes()
+        self.db.insert_paciente(Paciente("Primeiro", "98765432100", "Sala 1", "Estável", "Aguardando transporte", "Baixa"))
+        self.db.insert_paciente(Paciente("Segundo", "98765432101", "Sala 2", "Estável", "Aguardando transporte", "Baixa"))
+        # Sem a linha do primeiro, o registro parece ter uma transação ainda aberta com a seq dele
+        with self.db._cursor(commit=True) as cursor:
+            cursor.execute("DELETE FROM RegistroAlteracoes WHERE seq = %s", (marca + 1,))
+        alteracoes = self.db.alteracoes_desde(marca)
+        self.assertEqual((len(alteracoes), alteracoes.marca), (0, marca))
+        self.assertEqual(self.db.marca_alteracoes(), marca)
+
+        # Uma lacuna antiga é uma transação desfeita e não segura mais a marca
+        with self.db._cursor(commit=True) as cursor:
+            cursor.execute("UPDATE RegistroAlteracoes SET registrada_em = '2024-01-01 08:00:00' WHERE seq = %s", (marca + 2,))
+        alteracoes = self.db.alteracoes_desde(marca)
+        self.assertEqual([p.nome for p in alteracoes.pacientes], ["Primeiro", "Segundo"])
+        self.assertEqual(alteracoes.marca, marca + 2)
+
+class TestBackendSQLiteArquivo(unittest.TestCase):
+
+    def test_operacoes_concorrentes(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            db = criar_banco(os.path.join(diretorio, "macas.db"), tamanho_pool=4)
+            erros = []
+
+            def cadastrar(inicio):
+                for i in range(inicio, inicio + 10):
+                    if db.insert_paciente(Paciente(f"Paciente {i}", f"{i:011d}", "Sala", "Estável", "Aguardando transporte", "Baixa")) is None:
+                        erros.append(i)
+
+            threads = [threading.Thread(target=cadastrar, args=(n * 10,)) for n in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(erros, [])
+            self.assertEqual(len(db.listar_pacientes()), 40)
+            self.assertGreaterEqual(db.metricas_pool()["abertas"], 1)
+            db.fechar()
+
+    def test_reivindicacao_concorrente(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            db = criar_banco(os.path.join(diretorio, "macas.db"), tamanho_pool=4, manter_resumo=True)
+            paciente = Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta")
+            paciente.definir_id(db.insert_paciente(paciente))
+            maqueiros = []
+            with db._cursor(commit=True) as cursor:
+                for n in range(8):
+                    cursor.execute("INSERT INTO Maqueiros (nome, coren, data_nascimento, sexo, login, senha) VALUES (%s, %s, %s, %s, %s, %s)",
+                                   (f"Maqueiro {n}", f"C{n}", "1980-01-01", "M", f"m{n}", "senha"))
+                    maqueiros.append(cursor.lastrowid)
+            ids = [db.insert_solicitacao_transporte(SolicitacaoTransporte(None, f"Pedido {i}", paciente, datetime(2024, 1, 1, 8, i), None))
+                   for i in range(40)]
+            disputada = ids.pop()
+            recebidas = {maqueiro_id: [] for maqueiro_id in maqueiros}
+            vencedores = []
+            inicio = threading.Barrier(len(maqueiros))
+
+            def trabalhar(maqueiro_id):
+                inicio.wait()
+                if db.reivindicar_solicitacao(disputada, maqueiro_id):
+                    vencedores.append(maqueiro_id)
+                while True:
+                    solicitacao = db.reivindicar_proxima_solicitacao(maqueiro_id)
+                    if solicitacao is None:
+                        break
+                    recebidas[maqueiro_id].append(solicitacao.id)
+
+            threads = [threading.Thread(target=trabalhar, args=(maqueiro_id,)) for maqueiro_id in maqueiros]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            # Cada solicitação foi entregue a exatamente um maqueiro, e o banco registra esse maqueiro
+            self.assertEqual(len(vencedores), 1)
+            entregues = [id for lista in recebidas.values() for id in lista]
+            self.assertEqual(sorted(entregues), sorted(ids))
+            with db._cursor() as cursor:
+                cursor.execute("SELECT id, maqueiro_id, status FROM SolicitacoesTransporte")
+                registrado = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+            self.assertEqual(registrado[disputada], (vencedores[0], StatusSolicitacao.ACEITA))
+            for maqueiro_id, lista in recebidas.items():
+                for id in lista:
+                    self.assertEqual(registrado[id], (maqueiro_id, StatusSolicitacao.ACEITA))
+            self.assertEqual(db.resumo.solicitacoes_pendentes(), 0)
+            self.assertFalse(db.reivindicar_solicitacao(disputada, maqueiros[0]))
+            db.fechar()
+
+class TestReplicasDeLeitura(unittest.TestCase):
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho_primario = os.path.join(self.diretorio.name, "primario.db")
+        caminho_replica = os.path.join(self.diretorio.name, "replica.db")
+        # A réplica é um segundo banco independente, para que se saiba de onde veio cada leitura
+        replica = criar_banco(caminho_replica)
+        replica.insert_paciente(Paciente("Na réplica", "22222222222", "Sala 2", "Estável", "Aguardando transporte", "Baixa"))
+        replica.fechar()
+        self.replica = BackendSQLite(caminho_replica)
+
+    def tearDown(self):
+        self.db.fechar()
+        self.diretorio.cleanup()
+
+    def test_leituras_vao_para_a_replica(self):
+        self.db = criar_banco(self.caminho_primario, replicas=[self.replica], janela_leitura_propria=0)
+        self.db.insert_paciente(Paciente("No primário", "11111111111", "Sala 1", "Estável", "Aguardando transporte", "Alta"))
+
+        self.assertEqual([p.nome for p in self.db.listar_pacientes()], ["Na réplica"])
+        self.assertGreaterEqual(self.db.replicas[0].metricas()["retiradas"], 1)
+
+    def test_leitura_propria_apos_escrita(self):
+        self.db = criar_banco(self.caminho_primario, replicas=[self.replica], janela_leitura_propria=60)
+        self.db.insert_paciente(Paciente("No primário", "11111111111", "Sala 1", "Estável", "Aguardando transporte", "Alta"))
+
+        self.assertEqual([p.nome for p in self.db.listar_pacientes()], ["No primário"])
+        self.assertEqual(self.db.replicas[0].metricas()["retiradas"], 0)
+
+    def test_replica_indisponivel_usa_primario(self):
+        inexistente = BackendSQLite(os.path.join(self.diretorio.name, "nao", "existe.db"))
+        self.db = criar_banco(self.caminho_primario, replicas=[inexistente], janela_leitura_propria=0)
+        self.db.insert_paciente(Paciente("No primário", "11111111111", "Sala 1", "Estável", "Aguardando transporte", "Alta"))
+
+        self.assertEqual([p.nome for p in self.db.listar_pacientes()], ["No primário"])
+
+if __name__ == '__main__':
+    unittest.main()
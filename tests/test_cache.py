@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import time
+import threading
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from cache import MapaIdentidade, CacheDeResultados
+from models import Paciente
+
+def criar_paciente(id, cpf):
+    paciente = Paciente("João Silva", cpf, "Sala 101", "Estável", "Aguardando transporte", "Alta")
+    paciente.definir_id(id)
+    return paciente
+
+class TestMapaIdentidade(unittest.TestCase):
+
+    def test_busca_por_id_e_chave_secundaria(self):
+        mapa = MapaIdentidade(chaves=('cpf',))
+        paciente = mapa.guardar(criar_paciente(1, "12345678901"))
+        self.assertIs(mapa.obter(1), paciente)
+        self.assertIs(mapa.obter_por('cpf', "12345678901"), paciente)
+        self.assertEqual(mapa.acertos, 2)
+
+    def test_descarta_menos_usado(self):
+        mapa = MapaIdentidade(capacidade=2, chaves=('cpf',))
+        mapa.guardar(criar_paciente(1, "11111111111"))
+        mapa.guardar(criar_paciente(2, "22222222222"))
+        mapa.obter(1)
+        mapa.guardar(criar_paciente(3, "33333333333"))
+        self.assertIsNone(mapa.obter(2))
+        self.assertIsNone(mapa.obter_por('cpf', "22222222222"))
+        self.assertIsNotNone(mapa.obter(1))
+
+    def test_invalidar(self):
+        mapa = MapaIdentidade(chaves=('cpf',))
+        mapa.guardar(criar_paciente(1, "12345678901"))
+        mapa.invalidar(1)
+        self.assertIsNone(mapa.obter(1))
+        self.assertIsNone(mapa.obter_por('cpf', "12345678901"))
+
+    def test_expiracao(self):
+        mapa = MapaIdentidade(ttl=0.01)
+        mapa.guardar(criar_paciente(1, "12345678901"))
+        time.sleep(0.02)
+        self.assertIsNone(mapa.obter(1))
+
+class TestCacheDeResultados(unittest.TestCase):
+
+    def test_acertos_falhas_e_ttl(self):
+        cache = CacheDeResultados(ttl=0.05)
+        chamadas = []
+        calcular = lambda: chamadas.append(1) or len(chamadas)
+
+        self.assertEqual(cache.obter_ou_calcular(("censo",), calcular), 1)
+        self.assertEqual(cache.obter_ou_calcular(("censo",), calcular), 1)
+        time.sleep(0.06)
+        self.assertEqual(cache.obter_ou_calcular(("censo",), calcular), 2)
+        self.assertEqual((cache.acertos, cache.falhas), (1, 2))
+
+    def test_invalidar(self):
+        cache = CacheDeResultados(ttl=60)
+        cache.obter_ou_calcular(("censo",), lambda: "antigo")
+        cache.invalidar()
+
+        self.assertEqual(cache.obter_ou_calcular(("censo",), lambda: "novo"), "novo")
+        self.assertEqual(cache.metricas()["invalidacoes"], 1)
+
+    def test_escrita_durante_o_calculo_nao_guarda_resultado(self):
+        cache = CacheDeResultados(ttl=60)
+        def calcular():
+            cache.invalidar()
+            return "desatualizado"
+
+        cache.obter_ou_calcular(("censo",), calcular)
+        self.assertEqual(cache.obter_ou_calcular(("censo",), lambda: "atual"), "atual")
+
+    def test_consultas_simultaneas_calculam_uma_vez(self):
+        cache = CacheDeResultados(ttl=60)
+        chamadas = []
+        def calcular():
+            chamadas.append(1)
+            time.sleep(0.05)
+            return "censo"
+        resultados = []
+        threads = [threading.Thread(target=lambda: resultados.append(cache.obter_ou_calcular(("censo",), calcular)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(resultados, ["censo"] * 5)
+        self.assertEqual(len(chamadas), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from censo import CensoColunar, np
+from database import Database
+from backends import BackendSQLite
+from models import Paciente
+
+@unittest.skipIf(np is None, "NumPy não instalado")
+class TestCensoColunar(unittest.TestCase):
+
+    def setUp(self):
+        self.db = Database(backend=BackendSQLite())
+        self.db.create_tables()
+        dados = [
+            ("Ana", "Sala 1", "Estável", "Aguardando transporte", "Alta"),
+            ("Bruno", "Sala 1", "Estável", "Aguardando transporte", "Emergência"),
+            ("Carla", "UTI", "Estável", "Aguardando transporte", "Alta"),
+            ("Davi", "UTI", "Estável", "Chegou ao destino", "Baixa"),
+        ]
+        self.ids = []
+        for i, (nome, localizacao, condicao, transporte, urgencia) in enumerate(dados):
+            self.ids.append(self.db.insert_paciente(Paciente(nome, f"1234567890{i}", localizacao, condicao, transporte, urgencia)))
+        self.agora = datetime(2024, 1, 1, 12, 0, 0)
+        with self.db._cursor(commit=True) as cursor:
+            cursor.execute("UPDATE Pacientes SET transporte = 2, inicio_transporte = %s WHERE id = %s",
+                           (self.agora - timedelta(minutes=10), self.ids[0]))
+            cursor.execute("UPDATE Pacientes SET transporte = 2, inicio_transporte = %s WHERE id = %s",
+                           (self.agora - timedelta(minutes=30), self.ids[2]))
+        self.db.limpar_cache()
+        self.censo = CensoColunar.de_pacientes(self.db.listar_pacientes())
+
+    def test_contagens(self):
+        self.assertEqual(len(self.censo), 4)
+        self.assertEqual(self.censo.contagem_por_urgencia(), {"Emergência": 1, "Alta": 2, "Baixa": 1})
+        self.assertEqual(self.censo.contagem_por_localizacao(), {"Sala 1": 2, "UTI": 2})
+        self.assertEqual(self.censo.contagem_por_transporte(),
+                         {"Aguardando transporte": 1, "Em transporte": 2, "Chegou ao destino": 1})
+        matriz = self.censo.urgencia_por_localizacao()
+        self.assertEqual(matriz[self.censo.localizacoes.index("UTI")].tolist(), [0, 1, 0, 1])
+
+    def test_filtros_combinados(self):
+        mascara = self.censo.com_urgencia("Alta") & self.censo.na_localizacao("UTI")
+        filtrado = self.censo.filtrar(mascara)
+        self.assertEqual(filtrado.ids.tolist(), [self.ids[2]])
+        self.assertEqual(len(self.censo.filtrar(self.censo.na_localizacao("Centro cirúrgico"))), 0)
+
+    def test_tempo_em_transporte(self):
+        em_transporte = self.censo.filtrar(self.censo.com_transporte("em transporte"))
+        self.assertEqual(sorted(em_transporte.tempo_em_transporte(self.agora).tolist()), [600.0, 1800.0])
+        self.assertEqual(int(np.isnan(self.censo.tempo_em_transporte(self.agora)).sum()), 2)
+        contagens, _ = self.censo.histograma_tempo_transporte([0, 900, 3600], self.agora)
+        self.assertEqual(contagens.tolist(), [1, 1])
+        self.assertEqual(self.censo.tempo_medio_por_localizacao(self.agora), {"Sala 1": 600.0, "UTI": 1800.0})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,13 +2,15 @@ import unittest
 import sys
 import os
 from unittest.mock import MagicMock
+from mysql.connector import IntegrityError
 from datetime import datetime
 
 # Adiciona o diretório raiz do projeto ao sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from database import Database
+from database import Database, ErroTransacao
 from models import Paciente, Maqueiro, Tarefa, Incidente, SolicitacaoTransporte
+from estados import Urgencia, Transporte, StatusTarefa
 
 class TestDatabase(unittest.TestCase):
 
@@ -17,6 +19,9 @@ class TestDatabase(unittest.TestCase):
         self.db = Database('localhost', 'root', '', 'projeto_macas')
         self.db.cursor = MagicMock()
         self.db.connection = MagicMock()
+        self.db.connection.cursor.return_value = self.db.cursor
+        self.db.pool = MagicMock()
+        self.db.pool.obter_conexao.return_value = self.db.connection
 
     def test_insert_paciente(self):
         # Teste de inserção de paciente
@@ -24,7 +29,7 @@ class TestDatabase(unittest.TestCase):
         self.db.insert_paciente(paciente)
         self.db.cursor.execute.assert_called_once_with(
             "INSERT INTO Pacientes (nome, cpf, localizacao, condicao, urgencia, transporte) VALUES (%s, %s, %s, %s, %s, %s)",
-            (paciente.nome, paciente.cpf, paciente.localizacao, paciente.condicao, paciente.urgencia, paciente.transporte)
+            (paciente.nome, paciente.cpf, paciente.localizacao, paciente.condicao, Urgencia.ALTA, Transporte.AGUARDANDO)
         )
         self.db.connection.commit.assert_called_once()
 
@@ -36,7 +41,7 @@ class TestDatabase(unittest.TestCase):
         self.db.insert_tarefa(tarefa)
         self.db.cursor.execute.assert_called_once_with(
             "INSERT INTO Tarefas (descricao, prioridade, status, paciente_id, localizacao, maqueiro_id) VALUES (%s, %s, %s, %s, %s, %s)",
-            (tarefa.descricao, tarefa.prioridade, tarefa.status, tarefa.paciente.id, tarefa.localizacao, tarefa.maqueiro.id)
+            (tarefa.descricao, Urgencia.ALTA, StatusTarefa.PENDENTE, tarefa.paciente.id, tarefa.localizacao, tarefa.maqueiro.id)
         )
         self.db.connection.commit.assert_called_once()
 
@@ -65,21 +70,151 @@ class TestDatabase(unittest.TestCase):
         self.db.connection.commit.assert_called_once()
 
     def test_listar_incidentes(self):
-        # Teste de listagem de incidentes
+        # Teste de listagem de incidentes com maqueiro e paciente carregados por JOIN
         self.db.cursor.fetchall.return_value = [
-            (1, "Queda do paciente", 1, 1, "2023-06-10 14:30:00")
+            (1, "Queda do paciente", "2023-06-10 14:30:00",
+             1, "Carlos", "123456", "1980-01-01", "M", "carlos",
+             1, "João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte")
         ]
-        self.db.buscar_maqueiro_por_id = MagicMock(return_value=Maqueiro(1, "Carlos", "123456", "1980-01-01", "M"))
-        self.db.buscar_paciente_por_id = MagicMock(return_value=Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta"))
 
         incidentes = self.db.listar_incidentes()
         self.assertEqual(len(incidentes), 1)
         self.assertEqual(incidentes[0].descricao, "Queda do paciente")
         self.assertEqual(incidentes[0].maqueiro.nome, "Carlos")
         self.assertEqual(incidentes[0].paciente.nome, "João Silva")
-        self.db.cursor.execute.assert_called_once_with(
-            "SELECT id, descricao, maqueiro_id, paciente_id, data_hora FROM Incidentes ORDER BY data_hora DESC"
-        )
+        self.assertEqual(incidentes[0].data_hora, "2023-06-10 14:30:00")
+        self.db.cursor.execute.assert_called_once()
+
+    def test_listar_tarefas_pendentes_consulta_unica(self):
+        # Teste de que a quantidade de consultas não depende do número de tarefas
+        linha_paciente = (1, "João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte")
+        self.db.cursor.fetchall.return_value = [
+            (i, "Mover paciente", "Alta", "Sala 101") + linha_paciente + (None,) * 6
+            for i in range(50)
+        ]
+
+        tarefas = self.db.listar_tarefas_pendentes()
+        self.assertEqual(len(tarefas), 50)
+        self.assertEqual(tarefas[0].paciente.nome, "João Silva")
+        self.assertIsNone(tarefas[0].maqueiro)
+        self.db.cursor.execute.assert_called_once()
+
+    def test_listar_solicitacoes_pendentes(self):
+        # Teste de listagem de solicitações com paciente e maqueiro carregados por JOIN
+        self.db.cursor.fetchall.return_value = [
+            (1, "Levar ao raio-x", "recusada", "2023-06-10 14:30:00",
+             1, "João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte",
+             1, "Carlos", "123456", "1980-01-01", "M", "carlos")
+        ]
+
+        solicitacoes = self.db.listar_solicitacoes_pendentes()
+        self.assertEqual(len(solicitacoes), 1)
+        self.assertEqual(solicitacoes[0].status, "recusada")
+        self.assertEqual(solicitacoes[0].paciente.id, 1)
+        self.assertEqual(solicitacoes[0].maqueiro.login, "carlos")
+        self.db.cursor.execute.assert_called_once()
+
+    def test_buscar_paciente_por_cpf_usa_cache(self):
+        # Teste de que buscas repetidas não voltam ao banco de dados
+        cpf = "12345678901"
+        self.db.cursor.fetchone.return_value = (1, "João Silva", cpf, "Sala 101", "Estável", "Aguardando transporte")
+        paciente = self.db.buscar_paciente_por_cpf(cpf)
+        self.assertIs(self.db.buscar_paciente_por_cpf(cpf), paciente)
+        self.assertIs(self.db.buscar_paciente_por_id(1), paciente)
+        self.db.cursor.execute.assert_called_once()
+
+    def test_atualizacao_invalida_cache(self):
+        # Teste de que atualizar o paciente descarta a versão guardada em memória
+        self.db.cursor.fetchone.return_value = (1, "João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte")
+        self.db.buscar_paciente_por_id(1)
+        self.db.atualizar_localizacao_paciente(1, "Sala 202")
+        self.db.cursor.fetchone.return_value = (1, "João Silva", "12345678901", "Sala 202", "Estável", "Aguardando transporte")
+        paciente = self.db.buscar_paciente_por_id(1)
+        self.assertEqual(paciente.localizacao, "Sala 202")
+        self.assertEqual(self.db.cursor.execute.call_count, 3)
+
+    def test_insert_pacientes_bulk(self):
+        # Teste de inserção em lote com CPF repetido e CPF já cadastrado
+        pacientes = [
+            Paciente("Ana", "11111111111", "Sala 1", "Estável", "Aguardando transporte", "Alta"),
+            Paciente("Bruno", "22222222222", "Sala 2", "Estável", "Aguardando transporte", "Baixa"),
+            Paciente("Ana", "11111111111", "Sala 1", "Estável", "Aguardando transporte", "Alta"),
+            Paciente("Carla", "33333333333", "Sala 3", "Grave", "Aguardando transporte", "Emergência"),
+        ]
+        self.db.cursor.fetchall.return_value = [("22222222222",)]
+        self.db.cursor.lastrowid = 10
+
+        resultado = self.db.insert_pacientes_bulk(pacientes)
+        self.assertEqual(resultado.ids, [10, None, None, 11])
+        self.assertEqual([indice for indice, _ in resultado.falhas], [1, 2])
+        self.assertEqual(len(self.db.cursor.executemany.call_args[0][1]), 2)
+        self.db.connection.start_transaction.assert_called_once()
+        self.db.connection.commit.assert_called_once()
+
+    def test_insert_tarefas_bulk_isola_linha_com_falha(self):
+        # Teste de que uma linha inválida não interrompe o restante do lote
+        paciente = Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta")
+        paciente.definir_id(1)
+        tarefas = [Tarefa(None, f"Tarefa {i}", "Alta", paciente, "Sala 101", None) for i in range(3)]
+        self.db.cursor.executemany.side_effect = IntegrityError("falha no lote")
+        ids = iter([5, 6])
+
+        def executar(sql, valores=None):
+            if sql.startswith("INSERT") and valores[0] == "Tarefa 1":
+                raise IntegrityError("paciente inexistente")
+            if sql.startswith("INSERT"):
+                self.db.cursor.lastrowid = next(ids)
+
+        self.db.cursor.execute.side_effect = executar
+        resultado = self.db.insert_tarefas_bulk(tarefas)
+        self.assertEqual(resultado.ids, [5, None, 6])
+        self.assertEqual(resultado.falhas[0][0], 1)
+        self.db.cursor.execute.assert_any_call("ROLLBACK TO SAVEPOINT lote")
+        self.db.connection.commit.assert_called_once()
+
+    def test_atualizar_status_transporte_em_um_comando(self):
+        # Teste de que a varredura de transporte usa um único UPDATE no servidor
+        self.db.cursor.rowcount = 4
+        self.assertEqual(self.db.atualizar_status_transporte(), 4)
+        self.db.cursor.execute.assert_called_once()
+        self.assertTrue(self.db.cursor.execute.call_args[0][0].startswith("UPDATE Pacientes"))
+        self.db.connection.commit.assert_called_once()
+
+    def test_transaction_confirma_uma_vez(self):
+        # Teste de que operações compostas usam uma única conexão e um único commit
+        with self.db.transaction():
+            self.db.concluir_transporte_paciente(1)
+            self.db.atualizar_localizacao_paciente(1, "Sala 202")
+        self.assertEqual(self.db.cursor.execute.call_count, 3)
+        self.db.pool.obter_conexao.assert_called_once()
+        self.db.connection.start_transaction.assert_called_once()
+        self.db.connection.commit.assert_called_once()
+
+    def test_transaction_desfaz_em_caso_de_falha(self):
+        # Teste de que a falha de uma operação desfaz toda a transação
+        self.db.cursor.execute.side_effect = [None, IntegrityError("falha")]
+        with self.assertRaises(ErroTransacao):
+            with self.db.transaction():
+                self.db.update_solicitacao_status(1, 'aceita', 1)
+                self.db.iniciar_transporte_paciente(1)
+        self.db.connection.commit.assert_not_called()
+        self.db.connection.rollback.assert_called_once()
+        self.db.pool.devolver_conexao.assert_called_once_with(self.db.connection, descartar=False)
+
+    def test_comandos_preparados_reaproveitados(self):
+        # Teste de que cada SQL é preparado uma única vez por conexão
+        self.db.cursor.fetchone.return_value = None
+        self.db.buscar_paciente_por_id(1)
+        self.db.buscar_paciente_por_id(2)
+        self.db.connection.cursor.assert_called_once_with(prepared=True)
+        self.assertEqual(self.db.cursor.execute.call_count, 2)
+
+    def test_comandos_preparados_desativados(self):
+        # Teste de que o protocolo de texto pode ser usado para comparação
+        self.db.usar_preparados = False
+        self.db.cursor.fetchone.return_value = None
+        self.db.buscar_paciente_por_id(1)
+        self.db.connection.cursor.assert_called_once_with(buffered=True)
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import time
+from datetime import datetime
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from escrita_adiada import EscritaAdiada
+from database import Database
+from backends import BackendSQLite
+from models import Paciente, Incidente
+
+SQL = "INSERT INTO Incidentes (descricao, maqueiro_id, paciente_id, data_hora) VALUES (%s, %s, %s, %s)"
+
+class TestEscritaAdiada(unittest.TestCase):
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.caminho = os.path.join(self.diretorio.name, "diario.jsonl")
+        self.lotes = []
+
+    def tearDown(self):
+        self.diretorio.cleanup()
+
+    def gravar(self, escritas):
+        self.lotes.append(list(escritas))
+
+    def test_lote_cheio_dispara_gravacao(self):
+        escritas = EscritaAdiada(self.gravar, tamanho_lote=3, intervalo=60)
+        escritas.iniciar()
+        for i in range(3):
+            escritas.adicionar(SQL, (f"Incidente {i}", 1, 1, datetime(2024, 1, 1, 8, i)))
+
+        limite = time.monotonic() + 5
+        while escritas.gravadas < 3 and time.monotonic() < limite:
+            time.sleep(0.01)
+        escritas.encerrar()
+        self.assertEqual([len(lote) for lote in self.lotes], [3])
+        self.assertEqual(escritas.pendentes, 0)
+
+    def test_falha_mantem_escritas_no_diario(self):
+        def falhar(escritas):
+            raise ConnectionError("servidor indisponível")
+
+        escritas = EscritaAdiada(falhar, self.caminho, intervalo=60)
+        escritas.adicionar(SQL, ("Queda", 1, 1, datetime(2024, 1, 1, 8, 0)))
+        escritas.adicionar(SQL, ("Atraso", 1, 1, "2024-01-01 09:00:00"))
+        escritas.encerrar()
+        self.assertEqual(escritas.falhas, 1)
+
+        # Uma nova execução carrega o diário e grava o que ficou pendente
+        reaberta = EscritaAdiada(self.gravar, self.caminho, intervalo=60)
+        self.assertEqual(reaberta.pendentes, 2)
+        self.assertEqual(reaberta.descarregar(), 2)
+        self.assertEqual(self.lotes[0][0], (SQL, ("Queda", 1, 1, "2024-01-01 08:00:00")))
+        reaberta.encerrar()
+        self.assertEqual(os.path.getsize(self.caminho), 0)
+
+    def test_escrita_recusada_vai_para_rejeitadas(self):
+        def gravar(escritas):
+            self.lotes.append(list(escritas))
+            return [(1, "chave estrangeira inexistente")]
+
+        escritas = EscritaAdiada(gravar, self.caminho, intervalo=60)
+        escritas.adicionar(SQL, ("Queda", 1, 1, "2024-01-01 08:00:00"))
+        escritas.adicionar(SQL, ("Atraso", 1, 99, "2024-01-01 09:00:00"))
+        with self.assertLogs(level="ERROR"):
+            self.assertEqual(escritas.descarregar(), 1)
+        escritas.encerrar()
+        self.assertEqual((escritas.gravadas, escritas.rejeitadas, escritas.pendentes), (1, 1, 0))
+        self.assertEqual(os.path.getsize(self.caminho), 0)
+
+        with open(self.caminho + ".rejeitadas", encoding="utf-8") as arquivo:
+            registros = [json.loads(linha) for linha in arquivo]
+        self.assertEqual([(r["valores"], r["erro"]) for r in registros],
+                         [(["Atraso", 1, 99, "2024-01-01 09:00:00"], "chave estrangeira inexistente")])
+
+class TestEscritaAdiadaDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.db = Database(backend=BackendSQLite())
+        self.db.create_tables()
+        with self.db._cursor(commit=True) as cursor:
+            cursor.execute("INSERT INTO Maqueiros (nome, coren, data_nascimento, sexo, login, senha) VALUES (%s, %s, %s, %s, %s, %s)",
+                           ("Carlos", "123456", "1980-01-01", "M", "carlos", "senha123"))
+        self.maqueiro = self.db.buscar_maqueiro_por_login("carlos")
+        self.paciente = Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta")
+        self.paciente.definir_id(self.db.insert_paciente(self.paciente))
+
+    def contar_incidentes(self):
+        with self.db._cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM Incidentes")
+            return cursor.fetchone()[0]
+
+    def test_incidentes_gravados_em_lote(self):
+        self.db.ativar_escrita_adiada(tamanho_lote=100, intervalo=60)
+        for i in range(5):
+            self.db.insert_incidente(Incidente(None, f"Incidente {i}", self.maqueiro, self.paciente, datetime(2024, 1, 1, 8, i)))
+        self.assertEqual(self.contar_incidentes(), 0)
+
+        # O relatório grava antes as escritas pendentes da própria estação
+        self.assertEqual(len(self.db.listar_incidentes()), 5)
+        self.db.insert_incidente(Incidente(None, "Último", self.maqueiro, self.paciente, datetime(2024, 1, 1, 9, 0)))
+        self.db.fechar()
+        self.assertEqual(self.contar_incidentes(), 6)
+
+    def test_linha_invalida_nao_bloqueia_o_lote(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho = os.path.join(diretorio, "diario.jsonl")
+            escritas = self.db.ativar_escrita_adiada(caminho, tamanho_lote=100, intervalo=60)
+            self.db.insert_incidente(Incidente(None, "Válido", self.maqueiro, self.paciente, datetime(2024, 1, 1, 8, 0)))
+            inexistente = Paciente("Ninguém", "00000000000", "Sala 0", "Estável", "Aguardando transporte", "Baixa")
+            inexistente.definir_id(9999)
+            self.db.insert_incidente(Incidente(None, "Inválido", self.maqueiro, inexistente, datetime(2024, 1, 1, 8, 1)))
+
+            with self.assertLogs(level="ERROR"):
+                self.assertEqual([i.descricao for i in self.db.listar_incidentes()], ["Válido"])
+            self.assertEqual((escritas.gravadas, escritas.rejeitadas, escritas.pendentes), (1, 1, 0))
+            with open(caminho + ".rejeitadas", encoding="utf-8") as arquivo:
+                self.assertEqual(len(arquivo.readlines()), 1)
+            self.db.fechar()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from estados import (Urgencia, Transporte, StatusTarefa, StatusSolicitacao, TransicaoInvalida,
+                     transicao_valida, validar_transicao, origens)
+from database import Database
+from backends import BackendSQLite
+from models import Paciente, Maqueiro, Tarefa, SolicitacaoTransporte
+
+class TestEstados(unittest.TestCase):
+
+    def test_rotulos_e_codigos(self):
+        self.assertEqual(Urgencia.de("alta"), Urgencia.ALTA)
+        self.assertEqual(Urgencia.codigo("Emergência"), 1)
+        self.assertEqual(Urgencia.codigo(3), 3)
+        self.assertIsNone(Urgencia.codigo(None))
+        self.assertEqual(Transporte.de("Aguardando Transporte"), Transporte.AGUARDANDO)
+        self.assertEqual(Transporte.rotulo_de(3), "Chegou ao destino")
+        # Valores que já são texto passam sem alteração
+        self.assertEqual(Transporte.rotulo_de("Em transporte"), "Em transporte")
+        self.assertEqual(str(StatusSolicitacao.ACEITA), "aceita")
+        self.assertEqual(StatusSolicitacao.de("concluído"), StatusSolicitacao.CONCLUIDA)
+        with self.assertRaises(ValueError):
+            Urgencia.de("Urgentíssima")
+
+    def test_transicoes(self):
+        self.assertTrue(transicao_valida(StatusTarefa.PENDENTE, StatusTarefa.CONCLUIDA))
+        self.assertFalse(transicao_valida(StatusTarefa.CONCLUIDA, StatusTarefa.PENDENTE))
+        self.assertTrue(transicao_valida(StatusSolicitacao.RECUSADA, StatusSolicitacao.ACEITA))
+        with self.assertRaises(TransicaoInvalida):
+            validar_transicao(StatusSolicitacao.CONCLUIDA, StatusSolicitacao.PENDENTE)
+        self.assertEqual(origens(StatusSolicitacao.ACEITA), "0, 2")
+        self.assertEqual(origens(StatusTarefa.PENDENTE), "NULL")
+
+class TestTransicoesNoBanco(unittest.TestCase):
+
+    def setUp(self):
+        self.db = Database(backend=BackendSQLite())
+        self.db.create_tables()
+        with self.db._cursor(commit=True) as cursor:
+            cursor.execute("INSERT INTO Maqueiros (nome, coren, data_nascimento, sexo, login, senha) VALUES (%s, %s, %s, %s, %s, %s)",
+                           ("Carlos", "123456", "1980-01-01", "M", "carlos", "senha123"))
+        self.maqueiro = self.db.buscar_maqueiro_por_login("carlos")
+        self.paciente = Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta")
+        self.paciente.definir_id(self.db.insert_paciente(self.paciente))
+
+    def test_colunas_guardam_codigos(self):
+        self.assertEqual(self.db.valores_atuais("Pacientes", "urgencia, transporte", self.paciente.id),
+                         (Urgencia.ALTA, Transporte.AGUARDANDO))
+        paciente = self.db.listar_pacientes()[0]
+        self.assertEqual((paciente.urgencia, paciente.transporte), ("Alta", "Aguardando transporte"))
+
+    def test_transicao_invalida_rejeitada(self):
+        tarefa_id = self.db.insert_tarefa(Tarefa(None, "Levar ao raio-X", "Alta", self.paciente, "Sala 101", self.maqueiro))
+        self.assertTrue(self.db.update_tarefa_status(tarefa_id, "concluída"))
+        self.assertFalse(self.db.update_tarefa_status(tarefa_id, "pendente"))
+        self.assertEqual(self.db.valores_atuais("Tarefas", "status", tarefa_id), (StatusTarefa.CONCLUIDA,))
+
+        solicitacao_id = self.db.insert_solicitacao_transporte(
+            SolicitacaoTransporte(None, "Levar ao raio-X", self.paciente, datetime.now(), None))
+        self.assertTrue(self.db.update_solicitacao_status(solicitacao_id, "aceita", self.maqueiro.id))
+        self.assertFalse(self.db.update_solicitacao_status(solicitacao_id, "recusada", self.maqueiro.id))
+        self.assertFalse(self.db.reivindicar_solicitacao(solicitacao_id, self.maqueiro.id))
+        self.assertFalse(self.db.update_solicitacao_status(solicitacao_id, "Status inválido", self.maqueiro.id))
+        self.assertEqual(self.db.valores_atuais("SolicitacoesTransporte", "status", solicitacao_id), (StatusSolicitacao.ACEITA,))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,8 +17,10 @@ from funcoes_menu import (
     solicitar_transporte,
     ver_solicitacoes_transporte,
     aceitar_ou_recusar_solicitacao,
-    exibir_detalhes_transporte
+    exibir_detalhes_transporte,
+    sincronizar_solicitacoes
 )
+from database import Alteracoes, ErroTransacao
 from models import Paciente, Maqueiro, Tarefa, Incidente, SolicitacaoTransporte
 from validations import validar_cpf, obter_nivel_urgencia, obter_status_transporte
 
@@ -52,13 +54,13 @@ class TestFuncoesMenu(unittest.TestCase):
     @patch('tkinter.Scrollbar')
     @patch('tkinter.Frame')
     def test_ver_status_pacientes(self, mock_frame, mock_scrollbar, mock_canvas, mock_toplevel):
-        self.db.listar_pacientes.return_value = [
+        self.db.listar_pacientes_pagina.return_value = ([
             Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta")
-        ]
+        ], None)
         
         ver_status_pacientes(self.db)
         
-        self.db.listar_pacientes.assert_called_once()
+        self.db.listar_pacientes_pagina.assert_called_once()
         mock_toplevel.assert_called_once()
 
     @patch('tkinter.messagebox.showinfo')
@@ -101,12 +103,39 @@ class TestFuncoesMenu(unittest.TestCase):
         
         aceitar_ou_recusar_solicitacao(self.db, self.solicitacoes_transporte, self.maqueiro_logado)
         
-        self.db.update_solicitacao_status.assert_called_once_with(1, 'aceita', 1)
+        self.db.reivindicar_solicitacao.assert_called_once_with(1, 1)
         self.db.iniciar_transporte_paciente.assert_called_once_with(solicitacao.paciente.id)
         mock_showinfo.assert_any_call("Sucesso", f"Transporte do paciente {solicitacao.paciente.nome} concluído com sucesso.", parent=unittest.mock.ANY)
         mock_showinfo.assert_any_call("Sucesso", "Solicitação 1 aceita com sucesso.", parent=None)
         self.assertEqual(solicitacao.status, 'aceita')
 
+    @patch('funcoes_menu.obter_input', side_effect=["1", "A"])
+    @patch('tkinter.messagebox.showerror')
+    def test_aceitar_solicitacao_ja_aceita_por_outro(self, mock_showerror, mock_obter_input):
+        solicitacao = SolicitacaoTransporte(1, "Solicitação de transporte", Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta"), "2023-06-10 14:30:00", self.maqueiro_logado)
+        self.solicitacoes_transporte.append(solicitacao)
+        self.db.reivindicar_solicitacao.return_value = False
+
+        aceitar_ou_recusar_solicitacao(self.db, self.solicitacoes_transporte, self.maqueiro_logado)
+
+        self.db.iniciar_transporte_paciente.assert_not_called()
+        mock_showerror.assert_called_once_with("Erro", "A solicitação 1 já foi aceita por outro maqueiro.", parent=None)
+        self.assertEqual(self.solicitacoes_transporte, [])
+
+    @patch('funcoes_menu.obter_input', side_effect=["1", "A"])
+    @patch('tkinter.messagebox.showerror')
+    def test_aceitar_solicitacao_com_falha_no_banco(self, mock_showerror, mock_obter_input):
+        solicitacao = SolicitacaoTransporte(1, "Solicitação de transporte", Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta"), "2023-06-10 14:30:00", self.maqueiro_logado)
+        self.solicitacoes_transporte.append(solicitacao)
+        self.db.reivindicar_solicitacao.side_effect = ErroTransacao("Transação desfeita: conexão perdida")
+
+        with self.assertLogs(level="ERROR"):
+            aceitar_ou_recusar_solicitacao(self.db, self.solicitacoes_transporte, self.maqueiro_logado)
+
+        mock_showerror.assert_called_once_with("Erro", "Não foi possível aceitar a solicitação. Tente novamente.", parent=None)
+        self.assertEqual(self.solicitacoes_transporte, [solicitacao])
+        self.assertEqual(solicitacao.status, 'pendente')
+
     @patch('funcoes_menu.obter_input', side_effect=["1", "R"])
     @patch('tkinter.messagebox.showinfo')
     def test_aceitar_ou_recusar_solicitacao_recusar(self, mock_showinfo, mock_obter_input):
@@ -119,5 +148,35 @@ class TestFuncoesMenu(unittest.TestCase):
         mock_showinfo.assert_called_once_with("Sucesso", "Solicitação 1 recusada com sucesso.", parent=None)
         self.assertEqual(solicitacao.status, 'recusada')
 
+    @patch('funcoes_menu.obter_input', side_effect=["1", "R"])
+    @patch('tkinter.messagebox.showerror')
+    def test_recusar_solicitacao_sem_transicao_valida(self, mock_showerror, mock_obter_input):
+        solicitacao = SolicitacaoTransporte(1, "Solicitação de transporte", Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta"), "2023-06-10 14:30:00", self.maqueiro_logado)
+        self.solicitacoes_transporte.append(solicitacao)
+        self.db.update_solicitacao_status.return_value = False
+
+        aceitar_ou_recusar_solicitacao(self.db, self.solicitacoes_transporte, self.maqueiro_logado)
+
+        mock_showerror.assert_called_once_with("Erro", "Não foi possível recusar a solicitação. Tente novamente.", parent=None)
+        self.assertEqual(solicitacao.status, 'pendente')
+
+    def test_sincronizar_solicitacoes(self):
+        paciente = Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta")
+        antiga = SolicitacaoTransporte(1, "Raio-x", paciente, "2023-06-10 14:30:00", None)
+        aceita = SolicitacaoTransporte(1, "Raio-x", paciente, "2023-06-10 14:30:00", self.maqueiro_logado)
+        aceita.status = 'aceita'
+        nova = SolicitacaoTransporte(2, "Tomografia", paciente, "2023-06-10 15:00:00", None)
+        self.solicitacoes_transporte.append(antiga)
+        self.db.alteracoes_desde.side_effect = [
+            Alteracoes(7, solicitacoes=[aceita], completo=False),
+            Alteracoes(9, solicitacoes=[nova]),
+        ]
+
+        marca = sincronizar_solicitacoes(self.db, self.solicitacoes_transporte, 5)
+
+        self.assertEqual(marca, 9)
+        self.assertEqual([s.id for s in self.solicitacoes_transporte], [2])
+        self.assertEqual([chamada.args[0] for chamada in self.db.alteracoes_desde.call_args_list], [5, 7])
+
 if __name__ == '__main__':
     unittest.main()
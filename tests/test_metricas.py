@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from metricas import Instrumentacao, normalizar_sql
+from database import Database
+from backends import BackendSQLite
+from models import Paciente
+
+class TestInstrumentacao(unittest.TestCase):
+
+    def test_normalizar_sql_agrupa_listas_de_parametros(self):
+        self.assertEqual(normalizar_sql("SELECT cpf FROM Pacientes WHERE cpf IN (%s, %s,\n %s)"),
+                         "SELECT cpf FROM Pacientes WHERE cpf IN (%s, ...)")
+        self.assertEqual(normalizar_sql("INSERT INTO T (a, b) VALUES (%s, %s), (%s, %s)"),
+                         normalizar_sql("INSERT INTO T (a, b) VALUES (%s, %s)"))
+
+    def test_medir_soma_linhas_e_histograma(self):
+        instrumentacao = Instrumentacao(limite_lento=None)
+        def metodo():
+            instrumentacao.registrar_comando("SELECT 1", 0.002)
+            instrumentacao.registrar_linhas("SELECT 1", 3)
+            return "ok"
+
+        self.assertEqual(instrumentacao.medir("metodo", metodo), "ok")
+        relatorio = instrumentacao.relatorio()
+        self.assertEqual(relatorio["metodos"]["metodo"]["chamadas"], 1)
+        self.assertEqual(relatorio["metodos"]["metodo"]["linhas"], 3)
+        self.assertEqual(relatorio["comandos"]["SELECT 1"]["linhas"], 3)
+        self.assertEqual(relatorio["comandos"]["SELECT 1"]["histograma"]["<=5ms"], 1)
+
+    def test_consulta_lenta_registrada_no_log(self):
+        instrumentacao = Instrumentacao(limite_lento=0.1)
+        with self.assertLogs(level="WARNING") as logs:
+            instrumentacao.registrar_comando("SELECT * FROM Pacientes", 0.25)
+        instrumentacao.registrar_comando("SELECT 1", 0.01)
+
+        self.assertIn("SELECT * FROM Pacientes", logs.output[0])
+        self.assertEqual([c["nome"] for c in instrumentacao.consultas_lentas], ["SELECT * FROM Pacientes"])
+
+class TestInstrumentacaoDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.db = Database(backend=BackendSQLite(), limite_consulta_lenta=None)
+        self.db.create_tables()
+
+    def test_metricas_por_metodo_e_comando(self):
+        for i in range(3):
+            self.db.insert_paciente(Paciente(f"Paciente {i}", f"1234567890{i}", "Sala 1", "Estável", "Aguardando transporte", "Alta"))
+        self.db.listar_pacientes()
+
+        metricas = self.db.metricas_consultas()
+        self.assertEqual(metricas["metodos"]["insert_paciente"]["chamadas"], 3)
+        self.assertEqual(metricas["metodos"]["listar_pacientes"]["linhas"], 3)
+        self.assertTrue(any(sql.startswith("SELECT") and estatistica["linhas"] == 3
+                            for sql, estatistica in metricas["comandos"].items()))
+
+    def test_exportar_metricas(self):
+        self.db.listar_pacientes()
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "metricas.json")
+            self.db.exportar_metricas(caminho)
+            with open(caminho, encoding="utf-8") as arquivo:
+                relatorio = json.load(arquivo)
+
+        self.assertIn("listar_pacientes", relatorio["metodos"])
+        self.assertIn("pool", relatorio)
+
+    def test_instrumentacao_desativada(self):
+        db = Database(backend=BackendSQLite(), instrumentar=False)
+        db.create_tables()
+        db.listar_pacientes()
+
+        self.assertEqual(db.metricas_consultas(), {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import sys
+import os
+from unittest.mock import MagicMock
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import Database
+from backends import BackendMySQL, BackendSQLite
+from migracoes import (Migracao, MIGRACOES, TABELAS_SQLITE, VERSAO_ATUAL, ErroMigracao, aplicar_migracoes,
+                       COLUNAS_RASTREADAS, versao_do_esquema, _enums_mysql, _codigos_mysql)
+from models import Paciente
+
+class TestMigracoes(unittest.TestCase):
+
+    def setUp(self):
+        self.db = Database(backend=BackendSQLite(), limite_consulta_lenta=None)
+
+    def test_banco_novo_recebe_todas_as_migracoes(self):
+        self.assertEqual(self.db.create_tables(), VERSAO_ATUAL)
+        with self.db._cursor() as cursor:
+            cursor.execute("SELECT versao FROM SchemaVersion ORDER BY versao")
+            versoes = [linha[0] for linha in cursor.fetchall()]
+
+        self.assertEqual(versoes, [migracao.versao for migracao in MIGRACOES])
+
+    def test_esquema_atual_nao_envia_ddl(self):
+        self.db.create_tables()
+        self.db.instrumentacao.zerar()
+
+        self.db.create_tables()
+        comandos = self.db.metricas_consultas()["comandos"]
+        self.assertEqual(list(comandos), ["SELECT MAX(versao) FROM SchemaVersion"])
+
+    def test_banco_anterior_ao_controle_de_versao(self):
+        with self.db._cursor(commit=True) as cursor:
+            for sql in TABELAS_SQLITE:
+                cursor.execute(sql)
+            # O esquema anterior guarda os estados como rótulos
+            cursor.execute("INSERT INTO Pacientes (nome, cpf, localizacao, condicao, urgencia, transporte) VALUES (%s, %s, %s, %s, %s, %s)",
+                           ("João Silva", "12345678901", "Sala 101", "Estável", "Alta", "Aguardando transporte"))
+
+        self.assertEqual(self.db.create_tables(), VERSAO_ATUAL)
+        paciente = self.db.buscar_paciente_por_cpf("12345678901")
+        self.assertEqual(paciente.transporte, "Aguardando transporte")
+        self.assertEqual(self.db.valores_atuais("Pacientes", "urgencia, transporte", paciente.id), (2, 1))
+
+    def test_rotulo_desconhecido_interrompe_a_codificacao(self):
+        with self.db._cursor(commit=True) as cursor:
+            for sql in TABELAS_SQLITE:
+                cursor.execute(sql)
+            # Valores gravados antes do CHECK da coluna
+            cursor.execute("PRAGMA ignore_check_constraints = ON")
+            for cpf, urgencia in (("12345678901", "media "), ("12345678902", "Urgentíssima")):
+                cursor.execute("INSERT INTO Pacientes (nome, cpf, localizacao, condicao, urgencia, transporte) VALUES (%s, %s, %s, %s, %s, %s)",
+                               ("João Silva", cpf, "Sala 101", "Estável", urgencia, "Aguardando transporte"))
+            desconhecido = cursor.lastrowid
+            cursor.execute("PRAGMA ignore_check_constraints = OFF")
+
+        with self.assertRaisesRegex(ErroMigracao, f"Pacientes.urgencia .*'Urgentíssima' nos IDs {desconhecido}"):
+            self.db.create_tables()
+        with self.db._cursor() as cursor:
+            self.assertLess(versao_do_esquema(cursor), 6)
+            cursor.execute("SELECT urgencia FROM Pacientes WHERE id = %s", (desconhecido,))
+            self.assertEqual(cursor.fetchone(), ("Urgentíssima",))
+
+        # Corrigido o valor, a migração continua de onde parou
+        with self.db._cursor(commit=True) as cursor:
+            cursor.execute("UPDATE Pacientes SET urgencia = 'Emergência' WHERE id = %s", (desconhecido,))
+        self.assertEqual(self.db.create_tables(), VERSAO_ATUAL)
+        with self.db._cursor() as cursor:
+            cursor.execute("SELECT urgencia FROM Pacientes ORDER BY id")
+            self.assertEqual(cursor.fetchall(), [(3,), (1,)])
+
+    def test_migracao_com_erro_e_desfeita(self):
+        self.db.create_tables()
+        migracoes = MIGRACOES + [
+            Migracao(VERSAO_ATUAL + 1, "Coluna nova", sqlite=["ALTER TABLE Pacientes ADD COLUMN leito VARCHAR(10)"]),
+            Migracao(VERSAO_ATUAL + 2, "Com erro", sqlite=["ALTER TABLE TabelaInexistente ADD COLUMN x INT"]),
+        ]
+        with self.assertRaises(Exception):
+            with self.db._cursor(commit=True) as cursor:
+                aplicar_migracoes(self.db.backend, cursor, migracoes)
+
+        with self.db._cursor() as cursor:
+            self.assertEqual(versao_do_esquema(cursor), VERSAO_ATUAL)
+            cursor.execute("SELECT * FROM Pacientes")
+            self.assertNotIn("leito", [coluna[0] for coluna in cursor.description])
+
+    def test_mysql_usa_bloqueio_nomeado(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = (VERSAO_ATUAL,)
+        backend = BackendMySQL('localhost', 'root', '', 'projeto_macas')
+
+        self.assertEqual(aplicar_migracoes(backend, cursor), VERSAO_ATUAL)
+        comandos = [chamada.args[0] for chamada in cursor.execute.call_args_list]
+        self.assertEqual(comandos[0], "SELECT GET_LOCK('macas_migracoes', 60)")
+        self.assertEqual(comandos[-1], "SELECT RELEASE_LOCK('macas_migracoes')")
+        self.assertFalse(any(sql.startswith("ALTER") or "CREATE INDEX" in sql for sql in comandos))
+
+    def test_enum_mysql_converte_grafias_livres(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ("varchar",)
+        cursor.fetchall.return_value = []
+        _enums_mysql(cursor)
+        comandos = [chamada.args[0] for chamada in cursor.execute.call_args_list]
+        update = next(sql for sql in comandos if sql.startswith("UPDATE Tarefas SET prioridade"))
+        self.assertIn("WHEN 'media' THEN 'Média'", update)
+        self.assertIn("WHEN 'concluida' THEN 'concluído'",
+                      next(sql for sql in comandos if sql.startswith("UPDATE SolicitacoesTransporte SET status")))
+        self.assertNotIn("= NULL", " ".join(comandos))
+
+        # A mesma expressão, avaliada no SQLite, traduz as grafias antigas para os rótulos do ENUM
+        expressao = update[len("UPDATE Tarefas SET prioridade = "):update.index(" WHERE")]
+        with self.db._cursor() as consulta:
+            consulta.execute(f"SELECT {expressao} FROM (SELECT ' media ' AS prioridade UNION ALL SELECT 'ALTA' UNION ALL SELECT 'Emergencia')")
+            self.assertEqual([row[0] for row in consulta.fetchall()], ["Média", "Alta", "Emergência"])
+
+    def test_enum_mysql_interrompe_com_valores_desconhecidos(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ("varchar",)
+        cursor.fetchall.return_value = [(7, "Urgentíssima"), (9, "Urgentíssima"), (12, "amanhã")]
+        with self.assertRaisesRegex(ErroMigracao, "'Urgentíssima' nos IDs 7, 9; 'amanhã' nos IDs 12"):
+            _enums_mysql(cursor)
+        comandos = [chamada.args[0] for chamada in cursor.execute.call_args_list]
+        self.assertFalse(any(sql.startswith(("UPDATE", "ALTER")) for sql in comandos))
+
+    def test_codigos_mysql_converte_sem_os_gatilhos_de_sequencia(self):
+        cursor = MagicMock()
+        cursor.fetchone.return_value = ("enum",)
+        cursor.fetchall.return_value = []
+        _codigos_mysql(cursor)
+        comandos = [chamada.args[0] for chamada in cursor.execute.call_args_list]
+        updates = [i for i, sql in enumerate(comandos) if sql.startswith("UPDATE")]
+        remocoes = [i for i, sql in enumerate(comandos) if sql.startswith("DROP TRIGGER")]
+        criacoes = [i for i, sql in enumerate(comandos) if sql.startswith("CREATE TRIGGER")]
+        self.assertEqual(len(remocoes), 2 * len(COLUNAS_RASTREADAS))
+        self.assertEqual(len(criacoes), 2 * len(COLUNAS_RASTREADAS))
+        # Nenhuma linha convertida passa pelos gatilhos, que voltam ao final
+        self.assertLess(max(remocoes), min(updates))
+        self.assertGreater(min(criacoes), max(updates))
+
+if __name__ == '__main__':
+    unittest.main()
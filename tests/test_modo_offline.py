@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modo_offline import ModoOffline
+from database import Database
+from backends import BackendSQLite
+from pool import ErroConexao
+from models import Paciente, Tarefa, SolicitacaoTransporte
+from estados import Transporte, StatusSolicitacao
+from mysql.connector.errors import OperationalError
+
+class ConexaoCaida:
+    """Conexão com uma réplica que cai no primeiro comando."""
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+
+    def cursor(self, **kwargs):
+        return self
+
+    def execute(self, *args):
+        raise OperationalError("Lost connection to MySQL server during query")
+
+    def rollback(self):
+        self.conexao.rollback()
+
+    def close(self):
+        self.conexao.close()
+
+class TestModoOffline(unittest.TestCase):
+
+    def setUp(self):
+        self.diretorio = tempfile.TemporaryDirectory()
+        self.primario = Database(backend=BackendSQLite(os.path.join(self.diretorio.name, "servidor.db")))
+        self.primario.create_tables()
+        with self.primario._cursor(commit=True) as cursor:
+            cursor.execute("INSERT INTO Maqueiros (nome, coren, data_nascimento, sexo, login, senha) VALUES (%s, %s, %s, %s, %s, %s)",
+                           ("Carlos", "123456", "1980-01-01", "M", "carlos", "senha123"))
+        self.maqueiro = self.primario.buscar_maqueiro_por_login("carlos")
+        self.paciente = Paciente("João Silva", "12345678901", "Sala 101", "Estável", "Aguardando transporte", "Alta")
+        self.paciente.definir_id(self.primario.insert_paciente(self.paciente))
+        self.solicitacao_id = self.primario.insert_solicitacao_transporte(
+            SolicitacaoTransporte(None, "Levar ao raio-X", self.paciente, "2024-01-01 10:00:00", None))
+
+        self.caminho_diario = os.path.join(self.diretorio.name, "diario.jsonl")
+        self.db = ModoOffline(self.primario, os.path.join(self.diretorio.name, "instantaneo.db"), self.caminho_diario)
+        self.db.create_tables()
+        self.assertTrue(self.db.online)
+        self.db.sincronizar()
+
+    def tearDown(self):
+        self.primario.fechar()
+        self.db.instantaneo.fechar()
+        self.diretorio.cleanup()
+
+    def derrubar_servidor(self):
+        def recusar():
+            raise ErroConexao("servidor indisponível")
+        self.primario.pool.obter_conexao = recusar
+
+    def restabelecer_servidor(self):
+        del self.primario.pool.obter_conexao
+
+    def test_escritas_offline_reaplicadas_ao_voltar(self):
+        self.derrubar_servidor()
+        self.assertEqual(len(self.db.listar_pacientes()), 1)
+        self.assertFalse(self.db.online)
+
+        novo = Paciente("Maria Souza", "98765432100", "Sala 202", "Estável", "Aguardando transporte", "Média")
+        with self.db.transaction():
+            novo.definir_id(self.db.insert_paciente(novo))
+            self.db.insert_tarefa(Tarefa(None, "Levar à tomografia", "Média", novo, "Sala 202", self.maqueiro))
+        self.assertTrue(self.db.reivindicar_solicitacao(self.solicitacao_id, self.maqueiro.id))
+        # As leituras vêm do instantâneo, que já inclui as escritas offline
+        self.assertEqual(len(self.db.listar_pacientes()), 2)
+        self.assertEqual(self.db.listar_solicitacoes_pendentes(), [])
+        self.assertEqual(self.db.pendentes, 3)
+        self.assertEqual(self.db.sincronizar(), 0)
+
+        self.restabelecer_servidor()
+        self.assertEqual(self.db.sincronizar(), 3)
+        self.assertTrue(self.db.online)
+        self.assertEqual(self.db.pendentes, 0)
+        self.assertEqual(self.db.conflitos, [])
+        tarefas = self.primario.listar_tarefas_pendentes()
+        self.assertEqual([t.paciente.id for t in tarefas], [self.primario.buscar_paciente_por_cpf("98765432100").id])
+        self.assertEqual(self.primario.valores_atuais("SolicitacoesTransporte", "status", self.solicitacao_id), (StatusSolicitacao.ACEITA,))
+
+    def test_conflito_nao_sobrescreve_o_servidor(self):
+        self.derrubar_servidor()
+        self.db.atualizar_localizacao_paciente(self.paciente.id, "Sala 303")
+        self.db.update_solicitacao_status(self.solicitacao_id, 'recusada', self.maqueiro.id)
+        self.restabelecer_servidor()
+        # Durante a queda, outra estação alterou a localização do mesmo paciente
+        self.primario.atualizar_localizacao_paciente(self.paciente.id, "UTI")
+
+        self.assertEqual(self.db.sincronizar(), 1)
+        self.assertEqual(len(self.db.conflitos), 1)
+        self.assertEqual(self.db.conflitos[0]["operacoes"][0]["op"], "atualizar_localizacao_paciente")
+        self.assertTrue(os.path.exists(f"{self.caminho_diario}.conflitos"))
+        self.assertEqual(self.primario.valores_atuais("Pacientes", "localizacao", self.paciente.id), ("UTI",))
+        self.assertEqual(self.primario.valores_atuais("SolicitacoesTransporte", "status", self.solicitacao_id), (StatusSolicitacao.RECUSADA,))
+        # O instantâneo é atualizado com o estado do servidor
+        self.assertEqual(self.db.instantaneo.valores_atuais("Pacientes", "localizacao", self.paciente.id), ("UTI",))
+
+    def test_diario_pendente_sobrevive_ao_reinicio(self):
+        self.derrubar_servidor()
+        self.db.concluir_transporte_paciente(self.paciente.id)
+        self.restabelecer_servidor()
+
+        reaberto = ModoOffline(self.primario, os.path.join(self.diretorio.name, "instantaneo.db"), self.caminho_diario)
+        self.assertFalse(reaberto.online)
+        self.assertEqual(reaberto.pendentes, 1)
+        self.assertEqual(reaberto.sincronizar(), 1)
+        self.assertTrue(reaberto.online)
+        self.assertEqual(self.primario.valores_atuais("Pacientes", "transporte", self.paciente.id), (Transporte.CHEGOU,))
+        reaberto.instantaneo.fechar()
+
+    def test_queda_da_replica_nao_ativa_o_modo_offline(self):
+        caminho_servidor = os.path.join(self.diretorio.name, "servidor.db")
+        primario = Database(backend=BackendSQLite(caminho_servidor), replicas=[BackendSQLite(caminho_servidor)],
+                            janela_leitura_propria=0)
+        db = ModoOffline(primario, os.path.join(self.diretorio.name, "instantaneo2.db"),
+                         os.path.join(self.diretorio.name, "diario2.jsonl"))
+        replica = primario.replicas[0]
+        obter_conexao = replica.obter_conexao
+        replica.obter_conexao = lambda: ConexaoCaida(obter_conexao())
+
+        # A leitura é repetida no primário e a réplica sai do rodízio, sem passar ao instantâneo
+        self.assertEqual([p.nome for p in db.listar_pacientes()], ["João Silva"])
+        self.assertTrue(db.online)
+        self.assertIn(0, primario._replica_indisponivel_ate)
+        self.assertEqual(replica.metricas()["retiradas"], 1)
+        primario.fechar()
+        db.instantaneo.fechar()
+
+if __name__ == '__main__':
+    unittest.main()
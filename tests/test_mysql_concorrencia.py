@@ -0,0 +1,155 @@
+import unittest
+import sys
+import os
+import io
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import Database, ERROS_BANCO
+from models import Paciente, SolicitacaoTransporte
+from estados import StatusSolicitacao
+
+# Os testes usam um servidor MySQL de verdade e apagam as tabelas do banco informado: use um banco
+# descartável. Sem MACAS_TESTE_MYSQL_HOST, ou com o servidor fora do ar, eles são pulados.
+HOST = os.environ.get('MACAS_TESTE_MYSQL_HOST')
+USUARIO = os.environ.get('MACAS_TESTE_MYSQL_USUARIO', 'root')
+SENHA = os.environ.get('MACAS_TESTE_MYSQL_SENHA', '')
+BANCO = os.environ.get('MACAS_TESTE_MYSQL_BANCO', 'projeto_macas_teste')
+
+MAQUEIROS = 8
+
+@unittest.skipUnless(HOST, "defina MACAS_TESTE_MYSQL_HOST para testar com um servidor MySQL")
+class TestConcorrenciaMySQL(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = Database(HOST, USUARIO, SENHA, BANCO, tamanho_pool=MAQUEIROS + 4, ttl_cache=0, ttl_censo=0)
+        try:
+            cls.db.create_tables()
+        except ERROS_BANCO as e:
+            raise unittest.SkipTest(f"servidor MySQL indisponível: {e}")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.fechar()
+
+    def setUp(self):
+        with self.db._cursor(commit=True) as cursor:
+            for tabela in ("Incidentes", "Tarefas", "SolicitacoesTransporte", "Pacientes", "Maqueiros"):
+                cursor.execute(f"DELETE FROM {tabela}")
+            self.maqueiros = []
+            for n in range(MAQUEIROS):
+                cursor.execute("INSERT INTO Maqueiros (nome, coren, data_nascimento, sexo, login, senha) VALUES (%s, %s, %s, %s, %s, %s)",
+                               (f"Maqueiro {n}", f"C{n}", "1980-01-01", "M", f"m{n}", "senha"))
+                self.maqueiros.append(cursor.lastrowid)
+        self.db.limpar_cache()
+
+    def criar_solicitacoes(self, pacientes, por_paciente, primeiro=0):
+        ids = {}
+        for i in range(primeiro, primeiro + pacientes):
+            paciente = Paciente(f"Paciente {i}", f"{i:011d}", f"Sala {i}", "Estável", "Aguardando transporte", "Alta")
+            paciente.definir_id(self.db.insert_paciente(paciente))
+            ids[paciente.id] = [self.db.insert_solicitacao_transporte(
+                SolicitacaoTransporte(None, f"Pedido {i}.{j}", paciente, datetime(2024, 1, 1, 8, j % 60), None))
+                for j in range(por_paciente)]
+        return ids
+
+    def reivindicar(self, maqueiros, recebidas, inicio):
+        def trabalhar(maqueiro_id):
+            inicio.wait()
+            while True:
+                solicitacao = self.db.reivindicar_proxima_solicitacao(maqueiro_id)
+                if solicitacao is None:
+                    break
+                recebidas.append((solicitacao.id, maqueiro_id))
+        return [threading.Thread(target=trabalhar, args=(maqueiro_id,)) for maqueiro_id in maqueiros]
+
+    def cronometrar(self, maqueiros):
+        recebidas = []
+        threads = self.reivindicar(maqueiros, recebidas, threading.Barrier(len(maqueiros)))
+        antes = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return len(recebidas) / (time.perf_counter() - antes)
+
+    def test_reivindicacoes_e_conclusoes_sem_deadlock(self):
+        solicitacoes = self.criar_solicitacoes(pacientes=20, por_paciente=20)
+        pacientes = list(solicitacoes)
+        recebidas = []
+        inicio = threading.Barrier(MAQUEIROS + 2)
+        threads = self.reivindicar(self.maqueiros, recebidas, inicio)
+
+        # Em paralelo, outras estações alteram e concluem os transportes dos mesmos pacientes, travando
+        # o paciente antes das solicitações, na ordem inversa à das reivindicações
+        def alterar(metade):
+            inicio.wait()
+            for paciente_id in metade:
+                self.db.atualizar_localizacao_paciente(paciente_id, "Raio-X")
+                self.db.iniciar_transporte_paciente(paciente_id)
+                self.db.concluir_transporte_paciente(paciente_id)
+        threads += [threading.Thread(target=alterar, args=(pacientes[n::2],)) for n in range(2)]
+
+        saida = io.StringIO()
+        with redirect_stdout(saida):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Nenhuma transação falhou (deadlock ou tempo de espera de bloqueio esgotado)
+        self.assertEqual(saida.getvalue(), "")
+        entregues = [id for id, _ in recebidas]
+        self.assertEqual(len(entregues), len(set(entregues)))
+        with self.db._cursor() as cursor:
+            cursor.execute("SELECT id, status, maqueiro_id FROM SolicitacoesTransporte")
+            registrado = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+        self.assertNotIn(StatusSolicitacao.PENDENTE, {status for status, _ in registrado.values()})
+        for id, maqueiro_id in recebidas:
+            self.assertEqual(registrado[id][1], maqueiro_id)
+
+        # O registro de alterações entrega cada solicitação com o estado final
+        alteracoes = self.db.alteracoes_desde(0, limite=100000)
+        self.assertEqual({s.id: s.status for s in alteracoes.solicitacoes},
+                         {id: StatusSolicitacao.rotulo_de(status) for id, (status, _) in registrado.items()})
+
+    def test_transacao_aberta_segura_a_marca(self):
+        paciente = Paciente("Aberto", "00000000001", "Sala 1", "Estável", "Aguardando transporte", "Alta")
+        paciente.definir_id(self.db.insert_paciente(paciente))
+        marca = self.db.marca_alteracoes()
+        conexao = self.db.pool.obter_conexao()
+        try:
+            # A transação aberta reserva uma seq; a inserção seguinte é confirmada com uma seq maior
+            conexao.start_transaction()
+            cursor = conexao.cursor()
+            cursor.execute("UPDATE Pacientes SET localizacao = %s WHERE id = %s", ("UTI", paciente.id))
+            novo = Paciente("Confirmado", "00000000002", "Sala 2", "Estável", "Aguardando transporte", "Alta")
+            novo_id = self.db.insert_paciente(novo)
+            alteracoes = self.db.alteracoes_desde(marca)
+            self.assertEqual((len(alteracoes), alteracoes.marca), (0, marca))
+            conexao.rollback()
+            cursor.close()
+        finally:
+            self.db.pool.devolver_conexao(conexao)
+
+        # Desfeita a transação, a lacuna é encerrada sem esperar ESPERA_LACUNA (a margem é de 1 s)
+        time.sleep(2.1)
+        alteracoes = self.db.alteracoes_desde(marca)
+        self.assertEqual([p.id for p in alteracoes.pacientes], [novo_id])
+
+    def test_vazao_cresce_com_maqueiros_simultaneos(self):
+        self.criar_solicitacoes(pacientes=10, por_paciente=30)
+        sozinho = self.cronometrar(self.maqueiros[:1])
+        self.criar_solicitacoes(pacientes=10, por_paciente=30, primeiro=10)
+        simultaneos = self.cronometrar(self.maqueiros)
+        # Com SKIP LOCKED e sem contador compartilhado, os maqueiros não esperam uns pelos outros
+        self.assertGreater(simultaneos, sozinho)
+
+if __name__ == '__main__':
+    unittest.main()
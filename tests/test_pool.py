@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+import threading
+from unittest.mock import MagicMock
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pool import PoolDeConexoes, ErroPool
+
+class TestPoolDeConexoes(unittest.TestCase):
+
+    def test_reutiliza_conexao_devolvida(self):
+        fabrica = MagicMock(side_effect=lambda: MagicMock())
+        pool = PoolDeConexoes(fabrica, tamanho=2)
+        conexao = pool.obter_conexao()
+        pool.devolver_conexao(conexao)
+        self.assertIs(pool.obter_conexao(), conexao)
+        self.assertEqual(fabrica.call_count, 1)
+
+    def test_esgotamento_do_pool(self):
+        pool = PoolDeConexoes(MagicMock, tamanho=1, tempo_espera=0.05)
+        pool.obter_conexao()
+        with self.assertRaises(ErroPool):
+            pool.obter_conexao()
+        self.assertEqual(pool.metricas()["esgotamentos"], 1)
+
+    def test_aguarda_conexao_liberada(self):
+        pool = PoolDeConexoes(MagicMock, tamanho=1, tempo_espera=2)
+        conexao = pool.obter_conexao()
+        threading.Timer(0.05, pool.devolver_conexao, args=(conexao,)).start()
+        self.assertIs(pool.obter_conexao(), conexao)
+        self.assertEqual(pool.metricas()["esperas"], 1)
+
+    def test_verificacao_recria_conexao_inativa(self):
+        inativa = MagicMock()
+        inativa.ativa = False
+        nova = MagicMock()
+        nova.ativa = True
+        pool = PoolDeConexoes(MagicMock(side_effect=[inativa, nova]), verificar=lambda c: c.ativa)
+        pool.devolver_conexao(pool.obter_conexao())
+        self.assertIs(pool.obter_conexao(), nova)
+        inativa.close.assert_called_once()
+        self.assertEqual(pool.metricas()["reconexoes"], 1)
+
+    def test_reconexao_com_espera(self):
+        conexao = MagicMock()
+        fabrica = MagicMock(side_effect=[ConnectionError("fora do ar"), conexao])
+        pool = PoolDeConexoes(fabrica, tentativas=2, atraso_inicial=0.01)
+        self.assertIs(pool.obter_conexao(), conexao)
+        self.assertEqual(pool.metricas()["falhas_conexao"], 1)
+
+    def test_falha_apos_tentativas(self):
+        pool = PoolDeConexoes(MagicMock(side_effect=ConnectionError("fora do ar")), tentativas=2, atraso_inicial=0.01)
+        with self.assertRaises(ErroPool):
+            pool.obter_conexao()
+        metricas = pool.metricas()
+        self.assertEqual(metricas["abertas"], 0)
+        self.assertEqual(metricas["em_uso"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
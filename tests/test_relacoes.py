@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+import sqlite3
+from datetime import datetime
+from unittest.mock import patch
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from relacoes import CarregadorEmLote, Referencia
+from database import Database
+from backends import BackendSQLite
+from models import Paciente, Tarefa, Incidente, SolicitacaoTransporte
+
+class TestCarregadorEmLote(unittest.TestCase):
+
+    def test_referencias_carregadas_juntas(self):
+        chamadas = []
+
+        def buscar(ids):
+            chamadas.append(ids)
+            return {id: f"objeto {id}" for id in ids if id != 3}
+
+        carregador = CarregadorEmLote(buscar)
+        referencias = [carregador.referencia(id) for id in (1, 2, 3)]
+        self.assertIsNone(carregador.referencia(None))
+        self.assertEqual(chamadas, [])
+
+        self.assertEqual(referencias[1].resolver(), "objeto 2")
+        self.assertEqual(chamadas, [[1, 2, 3]])
+        self.assertEqual(referencias[0].resolver(), "objeto 1")
+        # Um ID sem objeto também não volta ao banco
+        self.assertIsNone(referencias[2].resolver())
+        self.assertEqual(carregador.cargas, 1)
+
+    def test_falha_na_busca_nao_e_guardada(self):
+        chamadas = []
+
+        def buscar(ids):
+            chamadas.append(ids)
+            if len(chamadas) == 1:
+                raise ConnectionError("servidor indisponível")
+            return {id: f"objeto {id}" for id in ids}
+
+        carregador = CarregadorEmLote(buscar)
+        referencias = [carregador.referencia(id) for id in (1, 2)]
+        with self.assertRaises(ConnectionError):
+            referencias[0].resolver()
+        # A nova tentativa carrega de novo todas as referências pendentes
+        self.assertEqual(referencias[1].resolver(), "objeto 2")
+        self.assertEqual(referencias[0].resolver(), "objeto 1")
+        self.assertEqual(chamadas, [[1, 2], [1, 2]])
+
+class TestRelacoesPreguicosas(unittest.TestCase):
+
+    def setUp(self):
+        self.db = Database(backend=BackendSQLite(), ttl_censo=0)
+        self.db.create_tables()
+        with self.db._cursor(commit=True) as cursor:
+            cursor.execute("INSERT INTO Maqueiros (nome, coren, data_nascimento, sexo, login, senha) VALUES (%s, %s, %s, %s, %s, %s)",
+                           ("Carlos", "123456", "1980-01-01", "M", "carlos", "senha123"))
+        maqueiro = self.db.buscar_maqueiro_por_login("carlos")
+        self.pacientes = []
+        for i in range(3):
+            paciente = Paciente(f"Paciente {i}", f"1234567890{i}", f"Sala {i}", "Estável", "Aguardando transporte", "Alta")
+            paciente.definir_id(self.db.insert_paciente(paciente))
+            self.pacientes.append(paciente)
+            self.db.insert_tarefa(Tarefa(None, f"Tarefa {i}", "Alta", paciente, f"Sala {i}", maqueiro))
+            self.db.insert_solicitacao_transporte(SolicitacaoTransporte(None, f"Solicitação {i}", paciente, datetime.now(), None))
+            self.db.insert_incidente(Incidente(None, f"Incidente {i}", maqueiro, paciente, datetime(2024, 1, 1, 10, i)))
+        self.maqueiro_id = maqueiro.id
+        self.db.limpar_cache()
+
+    def consultas(self, inicio):
+        comandos = self.db.metricas_consultas()["comandos"]
+        return sum(estatisticas["chamadas"] for sql, estatisticas in comandos.items() if sql.startswith(inicio))
+
+    def test_tarefas_carregam_relacoes_em_lote(self):
+        self.db.instrumentacao.zerar()
+        tarefas = self.db.listar_tarefas_pendentes(preguicoso=True)
+        self.assertEqual([t.paciente_id for t in tarefas], [p.id for p in self.pacientes])
+        self.assertTrue(all(type(t._paciente) is Referencia for t in tarefas))
+        self.assertEqual(self.consultas("SELECT id, nome, cpf"), 0)
+
+        self.assertEqual([t.paciente.nome for t in tarefas], ["Paciente 0", "Paciente 1", "Paciente 2"])
+        self.assertEqual({t.maqueiro.nome for t in tarefas}, {"Carlos"})
+        # Uma consulta por relação, não uma por tarefa
+        self.assertEqual(self.consultas("SELECT id, nome, cpf, localizacao, condicao, transporte FROM Pacientes WHERE id IN"), 1)
+        self.assertEqual(self.consultas("SELECT id, nome, coren, data_nascimento, sexo, login FROM Maqueiros WHERE id IN"), 1)
+        # Os objetos completos entram no mapa de identidade
+        self.assertIs(self.db.buscar_paciente_por_id(self.pacientes[0].id), tarefas[0].paciente)
+
+    def test_erro_do_banco_nao_deixa_relacao_vazia(self):
+        tarefas = self.db.listar_tarefas_pendentes(preguicoso=True)
+        with patch.object(self.db, "_cursor", side_effect=sqlite3.OperationalError("database is locked")):
+            with self.assertRaises(sqlite3.OperationalError):
+                tarefas[0].paciente
+        self.assertEqual(tarefas[0].paciente_id, self.pacientes[0].id)
+        self.assertEqual([t.paciente.nome for t in tarefas], ["Paciente 0", "Paciente 1", "Paciente 2"])
+
+    def test_apenas_colunas_pedidas(self):
+        solicitacoes = self.db.listar_solicitacoes_pendentes(colunas={"paciente": ("nome",), "maqueiro": ()})
+        self.assertEqual([s.paciente.nome for s in solicitacoes], ["Paciente 0", "Paciente 1", "Paciente 2"])
+        self.assertIsNone(solicitacoes[0].paciente.cpf)
+        self.assertIsNone(solicitacoes[0].maqueiro)
+        # Objetos incompletos não são guardados: a busca lê o paciente completo
+        self.assertEqual(self.db.buscar_paciente_por_id(self.pacientes[0].id).cpf, "12345678900")
+
+        self.db.limpar_cache()
+        incidentes = self.db.listar_incidentes(preguicoso=True, colunas={"paciente": ("nome", "localizacao")})
+        self.assertEqual([(i.paciente.nome, i.paciente.localizacao) for i in incidentes],
+                         [("Paciente 2", "Sala 2"), ("Paciente 1", "Sala 1"), ("Paciente 0", "Sala 0")])
+        self.assertEqual(incidentes[0].maqueiro.login, "carlos")
+        self.assertIsNone(incidentes[0].maqueiro.senha)
+        with self.assertRaises(ValueError):
+            self.db.listar_tarefas_pendentes(colunas={"maqueiro": ("senha",)})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import sys
+import os
+
+# Adiciona o diretório raiz do projeto ao sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from resumo import ResumoDespacho, SOLICITACOES, TRANSPORTE, TAREFAS
+from database import Database
+from backends import BackendSQLite
+from models import Paciente, Tarefa, SolicitacaoTransporte
+
+class TestResumoDespacho(unittest.TestCase):
+
+    def test_ajustes_incrementais(self):
+        resumo = ResumoDespacho()
+        resumo.carregar({"Alta": 2}, 1, {7: 1})
+        resumo.aplicar([(SOLICITACOES, "Alta", -1), (SOLICITACOES, "Emergência", 1), (TRANSPORTE, None, 1), (TAREFAS, 7, -1)])
+
+        self.assertEqual(resumo.solicitacoes_pendentes("Alta"), 1)
+        self.assertEqual(resumo.solicitacoes_pendentes(), 2)
+        self.assertEqual(resumo.pacientes_em_transporte(), 2)
+        self.assertEqual(resumo.tarefas_abertas(7), 0)
+        self.assertEqual(resumo.como_dict()["tarefas_abertas"], {})
+
+    def test_chave_none_separada_do_total(self):
+        resumo = ResumoDespacho()
+        resumo.carregar({"Alta": 2, None: 1}, 0, {7: 2, None: 3})
+
+        self.assertEqual(resumo.tarefas_abertas(None), 3)
+        self.assertEqual(resumo.tarefas_abertas(), 5)
+        self.assertEqual(resumo.solicitacoes_pendentes(None), 1)
+        self.assertEqual(resumo.solicitacoes_pendentes(), 3)
+
+class TestResumoDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.db = Database(backend=BackendSQLite(), manter_resumo=True)
+        self.db.create_tables()
+        with self.db._cursor(commit=True) as cursor:
+            cursor.execute("INSERT INTO Maqueiros (nome, coren, data_nascimento, sexo, login, senha) VALUES (%s, %s, %s, %s, %s, %s)",
+                           ("Carlos", "123456", "1980-01-01", "M", "carlos", "senha123"))
+        self.maqueiro = self.db.buscar_maqueiro_por_login("carlos")
+        self.pacientes = []
+        for i, urgencia in enumerate(["Alta", "Emergência"]):
+            paciente = Paciente(f"Paciente {i}", f"1234567890{i}", "Sala 1", "Estável", "Aguardando transporte", urgencia)
+            paciente.definir_id(self.db.insert_paciente(paciente))
+            self.pacientes.append(paciente)
+        self.assertEqual(self.db.resumo_despacho()["pacientes_em_transporte"], 0)
+
+    def assertResumoIgualAoBanco(self):
+        incremental = self.db.resumo_despacho()
+        self.db.recarregar_resumo()
+        recalculado = self.db.resumo_despacho()
+        for chave in ("solicitacoes_pendentes", "pacientes_em_transporte", "tarefas_abertas"):
+            self.assertEqual(incremental[chave], recalculado[chave])
+        return recalculado
+
+    def test_contadores_acompanham_as_escritas(self):
+        ids = [self.db.insert_solicitacao_transporte(SolicitacaoTransporte(None, "Levar ao raio-X", paciente, "2024-01-01 10:00:00", None))
+               for paciente in self.pacientes]
+        tarefa_id = self.db.insert_tarefa(Tarefa(None, "Mover paciente", "Alta", self.pacientes[0], "Sala 1", self.maqueiro))
+        self.assertEqual(self.db.resumo_despacho()["solicitacoes_pendentes"], {"Alta": 1, "Emergência": 1})
+        self.assertEqual(self.db.resumo.tarefas_abertas(self.maqueiro.id), 1)
+
+        with self.db.transaction():
+            self.db.update_solicitacao_status(ids[0], 'aceita', self.maqueiro.id)
+            self.db.iniciar_transporte_paciente(self.pacientes[0].id)
+        self.db.update_tarefa_status(tarefa_id, 'concluída')
+        resumo = self.assertResumoIgualAoBanco()
+        self.assertEqual(resumo["pacientes_em_transporte"], 1)
+        self.assertEqual(resumo["solicitacoes_pendentes"], {"Emergência": 1})
+
+        self.db.concluir_transporte_paciente(self.pacientes[0].id)
+        self.db.concluir_transporte_paciente(self.pacientes[1].id)
+        resumo = self.assertResumoIgualAoBanco()
+        self.assertEqual(resumo["pacientes_em_transporte"], 0)
+        self.assertEqual(resumo["solicitacoes_pendentes"], {})
+
+    def test_transacao_desfeita_nao_altera_contadores(self):
+        with self.assertRaises(Exception):
+            with self.db.transaction():
+                self.db.iniciar_transporte_paciente(self.pacientes[0].id)
+                raise RuntimeError("falha no meio da operação")
+
+        self.assertEqual(self.db.resumo.pacientes_em_transporte(), 0)
+        self.assertResumoIgualAoBanco()
+
+if __name__ == '__main__':
+    unittest.main()